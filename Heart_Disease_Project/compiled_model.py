@@ -0,0 +1,381 @@
+"""NumPy-only predictor compiled from the saved sklearn pipeline.
+
+    python compiled_model.py                       # export models/final_model.npz and check it
+    python compiled_model.py --model other.pkl --output other.npz
+
+Scoring one patient through the sklearn Pipeline goes through pandas
+column selection, input validation and a Python call per transformer. The
+export step reads the fitted parameters out of the pipeline instead:
+imputation values, scaler means and scales, one-hot category positions,
+and either the linear model's coefficients or every tree of the ensemble
+flattened into a few node arrays. CompiledPredictor then needs only NumPy
+to reproduce predict_proba:
+
+    from compiled_model import CompiledPredictor
+    predictor = CompiledPredictor.load("models/final_model.npz")
+    probability, prediction = predictor.predict_one(row)  # row in predictor.columns order
+
+Supported: a ColumnTransformer of SimpleImputer/StandardScaler and
+SimpleImputer/OneHotEncoder pipelines (as notebook 01 builds it) in front
+of LogisticRegression, DecisionTreeClassifier, RandomForestClassifier or
+ExtraTreesClassifier. Anything else is rejected at export time.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+PROJECT_DIR = Path(__file__).resolve().parent
+MODEL_PATH = PROJECT_DIR / "models" / "final_model.pkl"
+COMPILED_PATH = PROJECT_DIR / "models" / "final_model.npz"
+# Largest allowed gap between compiled and sklearn probabilities
+TOLERANCE = 1e-6
+TIMING_CALLS = 200
+
+
+class CompiledPredictor:
+    """predict_proba for a compiled pipeline, using only NumPy."""
+
+    def __init__(self, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.meta = meta
+        self.arrays = arrays
+        self.columns: List[str] = meta["columns"]
+        self.classes = np.asarray(meta["classes"])
+        self.kind: str = meta["kind"]
+        self.num_index = arrays["num_index"]
+        self.num_fill = arrays["num_fill"]
+        self.num_mean = arrays["num_mean"]
+        self.num_scale = arrays["num_scale"]
+        # Whether StandardScaler casts its mean and scale to float32 for float32 input
+        self.scaler_float32 = bool(meta["scaler_float32"])
+        self.cat_index = arrays["cat_index"]
+        self.cat_fill = meta["cat_fill"]
+        # Output position of every known category, per categorical column
+        self.cat_positions = [
+            {value: offset + i for i, value in enumerate(values)}
+            for offset, values in zip(meta["cat_offsets"], meta["cat_values"])
+        ]
+        self.n_outputs = len(self.num_index) + sum(len(values) for values in meta["cat_values"])
+        if self.kind == "linear":
+            self.coef = arrays["coef"]
+            self.intercept = arrays["intercept"]
+        else:
+            self.feature = arrays["feature"]
+            self.threshold = arrays["threshold"]
+            self.left = arrays["left"]
+            self.right = arrays["right"]
+            self.value = arrays["value"]
+            self.roots = arrays["roots"]
+            self.depth = int(meta["depth"])
+
+    def save(self, path: Path) -> None:
+        np.savez(path, meta=np.array(json.dumps(self.meta)), **self.arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "CompiledPredictor":
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files if name != "meta"}
+            meta = json.loads(str(data["meta"]))
+        return cls(meta, arrays)
+
+    def numeric_dtype(self, X) -> np.dtype:
+        """The dtype sklearn would impute and scale X's numeric columns in.
+
+        float32 for a DataFrame whose numeric columns are all compact
+        (int8/int16/float32, as dataset.py loads them) or a float32 array;
+        float64 for anything else, such as a list or a CSV read as is.
+        """
+        dtypes = getattr(X, "dtypes", None)
+        if dtypes is not None:
+            try:
+                found = np.result_type(*[dtypes.iloc[i] for i in self.num_index]) if len(self.num_index) else None
+            except TypeError:
+                found = None
+        else:
+            found = getattr(X, "dtype", None)
+        return np.dtype(np.float32 if found == np.float32 else np.float64)
+
+    def transform(self, X: Sequence) -> np.ndarray:
+        """The ColumnTransformer's output for rows given in self.columns order."""
+        dtype = self.numeric_dtype(X)
+        X = np.asarray(X, dtype=object if self.cat_positions else np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        num = X[:, self.num_index]
+        if num.dtype == object:
+            num = np.where(num == None, np.nan, num).astype(np.float64)  # noqa: E711
+        num = num.astype(dtype)
+        num = np.where(np.isnan(num), self.num_fill.astype(dtype), num)
+        mean, scale = self.num_mean, self.num_scale
+        if dtype == np.float32 and self.scaler_float32:
+            mean, scale = mean.astype(np.float32), scale.astype(np.float32)
+        Xt = np.zeros((X.shape[0], self.n_outputs))
+        # Same operations, order and rounding as StandardScaler.transform, so
+        # tree splits see bit-identical features
+        Xt[:, :len(self.num_index)] = ((num - mean).astype(dtype) / scale).astype(dtype)
+        for column, positions, fill in zip(self.cat_index, self.cat_positions, self.cat_fill):
+            for row, value in enumerate(X[:, column]):
+                if value is None or (isinstance(value, float) and np.isnan(value)):
+                    value = fill
+                position = positions.get(value)
+                # Unknown categories encode as all zeros (handle_unknown="ignore")
+                if position is not None:
+                    Xt[row, position] = 1.0
+        return Xt
+
+    def predict_proba(self, X: Sequence) -> np.ndarray:
+        Xt = self.transform(X)
+        if self.kind == "linear":
+            scores = Xt @ self.coef.T + self.intercept
+            if scores.shape[1] == 1:
+                positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+                return np.column_stack([1.0 - positive, positive])
+            if self.meta["multi_class"] == "ovr":
+                proba = 1.0 / (1.0 + np.exp(-scores))
+                return proba / proba.sum(axis=1, keepdims=True)
+            scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+            return scores / scores.sum(axis=1, keepdims=True)
+
+        # Trees compare float32 features against float64 thresholds, as sklearn does
+        Xt = Xt.astype(np.float32)
+        rows = np.arange(Xt.shape[0])[:, None]
+        node = np.repeat(self.roots[None, :], Xt.shape[0], axis=0)
+        # Every tree steps down one level per pass; leaves point back at themselves
+        for _ in range(self.depth):
+            go_left = Xt[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].mean(axis=1)
+
+    def predict(self, X: Sequence) -> np.ndarray:
+        return self.classes[self.predict_proba(X).argmax(axis=1)]
+
+    def predict_one(self, row: Sequence) -> Tuple[float, Any]:
+        """(probability of the positive class, predicted class) for one row."""
+        proba = self.predict_proba(row)[0]
+        return float(proba[1]), self.classes[proba.argmax()].item()
+
+
+def scales_in_float32(scaler) -> bool:
+    """Whether StandardScaler casts its mean and scale to float32 for float32 input.
+
+    Older scikit-learn releases subtract and divide in float64 and round the
+    result; newer ones cast the parameters first. Which one is installed
+    decides the last bit of every feature, and so which side of a split it
+    falls on.
+    """
+    mean = np.asarray(scaler.mean_ if scaler.with_mean else 0.0, dtype=np.float64)
+    scale = np.asarray(scaler.scale_ if scaler.with_std else 1.0, dtype=np.float64)
+    probe = (mean + np.linspace(-3, 3, 61)[:, None] * scale).astype(np.float32)
+    expected = (probe - mean.astype(np.float32)) / scale.astype(np.float32)
+    return bool(np.array_equal(scaler.transform(probe), expected))
+
+
+def compile_preprocessor(preprocessor, columns: List[str]) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    from sklearn.compose import ColumnTransformer
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise ValueError(f"Expected a ColumnTransformer, got {type(preprocessor).__name__}")
+    num_columns: List[str] = []
+    num_fill, num_mean, num_scale = [], [], []
+    cat_columns: List[str] = []
+    cat_fill, cat_values = [], []
+    scaler_float32 = False
+    order = []
+    for name, transformer, selected in preprocessor.transformers_:
+        if transformer == "drop" or len(selected) == 0:
+            continue
+        if name == "remainder" or transformer == "passthrough":
+            raise ValueError("Passthrough columns are not supported")
+        steps = transformer.steps if isinstance(transformer, Pipeline) else [(name, transformer)]
+        selected = list(selected)
+        imputer = next((step for _, step in steps if isinstance(step, SimpleImputer)), None)
+        encoder = next((step for _, step in steps if isinstance(step, OneHotEncoder)), None)
+        scaler = next((step for _, step in steps if isinstance(step, StandardScaler)), None)
+        unknown = [type(step).__name__ for _, step in steps if step not in (imputer, encoder, scaler)]
+        if unknown:
+            raise ValueError(f"Unsupported transformer step(s): {', '.join(unknown)}")
+        if imputer is not None and imputer.add_indicator:
+            raise ValueError("SimpleImputer(add_indicator=True) is not supported")
+        if imputer is not None and steps[0][1] is not imputer:
+            raise ValueError("SimpleImputer must be the first step of its pipeline")
+        if encoder is not None:
+            if scaler is not None or encoder.drop is not None or getattr(encoder, "infrequent_categories_", None):
+                raise ValueError("Only plain one-hot encoding (no drop, no infrequent categories) is supported")
+            if encoder.handle_unknown != "ignore":
+                raise ValueError("OneHotEncoder must use handle_unknown='ignore'")
+            for i, column in enumerate(selected):
+                cat_columns.append(column)
+                cat_fill.append(np.asarray(imputer.statistics_).tolist()[i] if imputer is not None else None)
+                cat_values.append(np.asarray(encoder.categories_[i]).tolist())
+            order.append("cat")
+        else:
+            count = len(selected)
+            num_columns.extend(selected)
+            num_fill.extend(imputer.statistics_ if imputer is not None else np.full(count, np.nan))
+            mean = scaler.mean_ if scaler is not None and scaler.mean_ is not None and scaler.with_mean else None
+            scale = scaler.scale_ if scaler is not None and scaler.scale_ is not None else None
+            num_mean.extend(mean if mean is not None else np.zeros(count))
+            num_scale.extend(scale if scale is not None else np.ones(count))
+            # Only matters for float32 input, such as the compact frames dataset.py loads
+            if scaler is not None and scales_in_float32(scaler):
+                scaler_float32 = True
+            order.append("num")
+    # The compiled transform writes numeric outputs first, then categorical ones
+    if order != sorted(order, key=lambda kind: kind != "num"):
+        raise ValueError("Numeric transformers must come before categorical ones")
+
+    offsets = np.cumsum([len(num_columns)] + [len(values) for values in cat_values])[:-1].tolist()
+    meta = {
+        "columns": columns,
+        "cat_fill": cat_fill,
+        "cat_values": cat_values,
+        "cat_offsets": offsets,
+        "scaler_float32": scaler_float32,
+    }
+    arrays = {
+        "num_index": np.array([columns.index(c) for c in num_columns], dtype=np.intp),
+        "num_fill": np.array(num_fill, dtype=np.float64),
+        "num_mean": np.array(num_mean, dtype=np.float64),
+        "num_scale": np.array(num_scale, dtype=np.float64),
+        "cat_index": np.array([columns.index(c) for c in cat_columns], dtype=np.intp),
+    }
+    return meta, arrays
+
+
+def flatten_trees(estimators) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Concatenate fitted trees into node arrays indexed by global node id."""
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    depth = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        nodes = np.arange(tree.node_count)
+        leaf = tree.children_left == -1
+        # Leaves loop back to themselves so extra passes leave them in place
+        features.append(np.where(leaf, 0, tree.feature).astype(np.intp))
+        thresholds.append(np.where(leaf, 0.0, tree.threshold))
+        lefts.append(np.where(leaf, nodes, tree.children_left).astype(np.intp) + offset)
+        rights.append(np.where(leaf, nodes, tree.children_right).astype(np.intp) + offset)
+        value = tree.value[:, 0, :]
+        values.append(value / value.sum(axis=1, keepdims=True))
+        roots.append(offset)
+        offset += tree.node_count
+        depth = max(depth, tree.max_depth)
+    arrays = {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+        "roots": np.array(roots, dtype=np.intp),
+    }
+    return {"depth": depth}, arrays
+
+
+def compile_pipeline(pipeline) -> CompiledPredictor:
+    """Build a CompiledPredictor from a fitted Pipeline(pre, clf)."""
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.tree import DecisionTreeClassifier
+
+    if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+        raise ValueError("Expected a fitted Pipeline of a preprocessor and a classifier")
+    preprocessor, clf = pipeline.steps[0][1], pipeline.steps[1][1]
+    meta, arrays = compile_preprocessor(preprocessor, list(pipeline.feature_names_in_))
+    meta["classes"] = clf.classes_.tolist()
+    if isinstance(clf, LogisticRegression):
+        meta["kind"] = "linear"
+        meta["multi_class"] = getattr(clf, "multi_class", "auto")
+        arrays["coef"] = clf.coef_.astype(np.float64)
+        arrays["intercept"] = clf.intercept_.astype(np.float64)
+    elif isinstance(clf, DecisionTreeClassifier):
+        meta["kind"] = "trees"
+        tree_meta, tree_arrays = flatten_trees([clf])
+        meta.update(tree_meta)
+        arrays.update(tree_arrays)
+    elif isinstance(clf, (RandomForestClassifier, ExtraTreesClassifier)):
+        meta["kind"] = "trees"
+        tree_meta, tree_arrays = flatten_trees(clf.estimators_)
+        meta.update(tree_meta)
+        arrays.update(tree_arrays)
+    else:
+        raise ValueError(f"Cannot compile {type(clf).__name__}; use a linear or tree-ensemble model")
+    if getattr(clf, "n_outputs_", 1) != 1:
+        raise ValueError("Multi-output classifiers are not supported")
+    return CompiledPredictor(meta, arrays)
+
+
+def time_per_call(fn, calls: int = TIMING_CALLS) -> float:
+    """Median seconds per call of fn()."""
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return float(np.median(samples))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compile the saved model into a NumPy-only predictor")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH, help=f"pipeline to compile (default: {MODEL_PATH})")
+    parser.add_argument("--output", type=Path, default=COMPILED_PATH,
+                        help=f"where to write the compiled predictor (default: {COMPILED_PATH})")
+    args = parser.parse_args()
+
+    from joblib import load
+
+    import dataset
+
+    if not args.model.exists():
+        print(f"Model not found at {args.model}; run pipeline.py or the notebooks first")
+        return 1
+    pipeline = load(args.model)
+    try:
+        compiled = compile_pipeline(pipeline)
+    except ValueError as exc:
+        print(f"Could not compile {args.model}: {exc}")
+        return 1
+    compiled.save(args.output)
+    compiled = CompiledPredictor.load(args.output)
+    print(f"Compiled {type(pipeline.steps[-1][1]).__name__} to {args.output}")
+
+    if not dataset.DATA_PATH.exists():
+        print("Dataset not found; skipping the comparison with sklearn")
+        return 0
+    X, _ = dataset.load_xy()
+    X = X[compiled.columns]
+    # Rows from the UI form, serve.py's JSON or a list are float64, unlike the
+    # compact frame the model was trained on, and sklearn scores them in float64
+    wide = X.astype({column: np.float64 for column in X.columns if X[column].dtype.kind in "iuf"})
+    rows = wide.to_numpy(dtype=object if compiled.cat_positions else np.float64)
+    gap = 0.0
+    for label, frame, given in (("compact", X, X), ("float64", wide, rows)):
+        expected = pipeline.predict_proba(frame)
+        actual = compiled.predict_proba(given)
+        gap = max(gap, float(np.abs(expected - actual).max()))
+        agree = float((compiled.classes[actual.argmax(axis=1)] == pipeline.predict(frame)).mean())
+        print(f"Max probability difference over {len(X)} {label} rows: "
+              f"{np.abs(expected - actual).max():.2e} (class agreement {agree:.1%})")
+
+    single_frame, single_row = wide.iloc[[0]], rows[0]
+    sklearn_s = time_per_call(lambda: pipeline.predict_proba(single_frame))
+    compiled_s = time_per_call(lambda: compiled.predict_proba(single_row))
+    print(f"Single row: sklearn {sklearn_s * 1e6:,.0f} us, compiled {compiled_s * 1e6:,.1f} us "
+          f"({sklearn_s / compiled_s:,.0f}x faster)")
+    if gap > TOLERANCE:
+        print(f"Compiled predictor differs from sklearn by more than {TOLERANCE}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,196 @@
+"""Shared, cached loading of the heart disease dataset.
+
+The CSV is parsed and normalized once (lower-case column names,
+``heartdisease`` renamed to ``target``, compact dtypes) and cached as an
+uncompressed Feather file keyed by the SHA-256 of the source CSV, together
+with the stratified train/test split indices. Later loads memory-map the
+cache instead of reparsing and resplitting; editing or replacing the CSV
+changes its hash, so stale caches are never used.
+
+    from dataset import load_split
+    X_train, X_test, y_train, y_test = load_split()
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+
+PROJECT_DIR = Path(__file__).resolve().parent
+DATA_PATH = PROJECT_DIR / "data" / "heart_disease.csv"
+CACHE_DIR = PROJECT_DIR / "data" / "cache"
+TARGET = "target"
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+# Bump when the normalization below changes so existing caches are rebuilt
+CACHE_VERSION = 1
+
+# Compact dtypes for the UCI (Cleveland) columns; columns with missing
+# values fall back to float32 and text columns become categories
+DTYPES: Dict[str, str] = {
+    "age": "int8",
+    "sex": "int8",
+    "cp": "int8",
+    "trestbps": "int16",
+    "chol": "int16",
+    "fbs": "int8",
+    "restecg": "int8",
+    "thalach": "int16",
+    "exang": "int8",
+    "oldpeak": "float32",
+    "slope": "int8",
+    "ca": "int8",
+    "thal": "int8",
+    "target": "int8",
+}
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(path: Path) -> str:
+    """Cache file prefix for a source CSV."""
+    return f"heart_v{CACHE_VERSION}_{file_digest(path)[:16]}"
+
+
+def feather_available() -> bool:
+    """Whether pyarrow, needed for Feather files, is installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def normalize(raw: pd.DataFrame) -> pd.DataFrame:
+    """Lower-case column names, name the label ``target`` and shrink dtypes."""
+    frame = raw.copy()
+    frame.columns = frame.columns.str.lower().str.strip()
+    if "heartdisease" in frame.columns and TARGET not in frame.columns:
+        frame = frame.rename(columns={"heartdisease": TARGET})
+    for column in frame.columns:
+        series = frame[column]
+        if pd.api.types.is_object_dtype(series):
+            frame[column] = series.astype("category")
+        elif column in DTYPES and not (series.isna().any() and DTYPES[column].startswith("int")):
+            frame[column] = series.astype(DTYPES[column])
+        elif pd.api.types.is_float_dtype(series):
+            frame[column] = series.astype("float32")
+        elif pd.api.types.is_integer_dtype(series):
+            frame[column] = pd.to_numeric(series, downcast="integer")
+    return frame
+
+
+def write_atomic(path: Path, write) -> None:
+    """Write a cache file via a temporary name so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_array(path: Path, array: np.ndarray) -> None:
+    # np.save would append ".npy" to a path that lacks it, so hand it a file
+    with path.open("wb") as f:
+        np.save(f, array)
+
+
+def load_dataset(path: Path = DATA_PATH, use_cache: bool = True) -> pd.DataFrame:
+    """Return the normalized dataset, from the cache when it is up to date."""
+    path = Path(path)
+    if not use_cache or not feather_available():
+        return normalize(pd.read_csv(path))
+
+    cache_path = CACHE_DIR / f"{cache_key(path)}.feather"
+    if cache_path.exists():
+        import pyarrow.feather as feather
+        return feather.read_table(cache_path, memory_map=True).to_pandas()
+
+    frame = normalize(pd.read_csv(path))
+    # Uncompressed so the cache can be memory-mapped instead of decoded
+    write_atomic(cache_path, lambda tmp: frame.reset_index(drop=True).to_feather(tmp, compression="uncompressed"))
+    return frame
+
+
+def load_xy(path: Path = DATA_PATH, use_cache: bool = True) -> Tuple[pd.DataFrame, pd.Series]:
+    """Return features and target of the whole dataset."""
+    frame = load_dataset(path, use_cache)
+    return frame.drop(columns=[TARGET]), frame[TARGET]
+
+
+def split_indices(
+    y: pd.Series,
+    test_size: float = TEST_SIZE,
+    random_state: int = RANDOM_STATE,
+    path: Optional[Path] = DATA_PATH,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Row positions of the stratified train/test split, cached next to the dataset.
+
+    Splitting positions gives the same rows, in the same order, as
+    ``train_test_split(X, y, stratify=y)`` with the same arguments.
+    """
+    positions = np.arange(len(y))
+    if path is None:
+        train, test = train_test_split(positions, test_size=test_size, random_state=random_state, stratify=y)
+        return train, test
+
+    prefix = CACHE_DIR / f"{cache_key(Path(path))}_split_{test_size}_{random_state}"
+    train_path, test_path = Path(f"{prefix}_train.npy"), Path(f"{prefix}_test.npy")
+    if train_path.exists() and test_path.exists():
+        return np.load(train_path, mmap_mode="r"), np.load(test_path, mmap_mode="r")
+
+    train, test = train_test_split(positions, test_size=test_size, random_state=random_state, stratify=y)
+    write_atomic(train_path, lambda tmp: save_array(tmp, train))
+    write_atomic(test_path, lambda tmp: save_array(tmp, test))
+    return train, test
+
+
+def load_split(
+    path: Path = DATA_PATH,
+    test_size: float = TEST_SIZE,
+    random_state: int = RANDOM_STATE,
+    use_cache: bool = True,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+    """Return X_train, X_test, y_train, y_test as the notebooks have always split them."""
+    X, y = load_xy(path, use_cache)
+    train, test = split_indices(y, test_size, random_state, path if use_cache else None)
+    return X.iloc[train], X.iloc[test], y.iloc[train], y.iloc[test]
+
+
+def clear_cache() -> int:
+    """Delete every cached dataset and split, returning the number of files removed."""
+    removed = 0
+    if CACHE_DIR.exists():
+        for cache_file in CACHE_DIR.iterdir():
+            if cache_file.name.startswith("heart_"):
+                cache_file.unlink()
+                removed += 1
+    return removed
+
+
+def main() -> int:
+    if not DATA_PATH.exists():
+        print(f"Dataset not found at {DATA_PATH}; run download_data.py first")
+        return 1
+    if not feather_available():
+        print("pyarrow is not installed; the dataset will be parsed on every load")
+    X_train, X_test, y_train, y_test = load_split()
+    print(f"Cached {len(X_train) + len(X_test)} rows ({len(X_train)} train / {len(X_test)} test) in {CACHE_DIR}")
+    print(X_train.dtypes.to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+"""Load-test a running serve.py with concurrent single-row requests.
+
+    python serve.py --max-batch 64 --max-wait-ms 2 &
+    python loadtest.py --concurrency 32 --duration 10
+
+Each client keeps one connection open and sends patients drawn from the
+dataset back to back. Client-side latency percentiles and throughput are
+printed along with the server's own /metrics, which show how many rows each
+model call scored. Rerun the server with --max-batch 1 to compare against
+scoring every request on its own.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+import dataset
+from serve import percentile
+
+
+DEFAULT_PATIENT = {
+    "age": 57, "sex": 1, "cp": 2, "trestbps": 130, "chol": 250, "fbs": 0, "restecg": 1,
+    "thalach": 150, "exang": 0, "oldpeak": 1.0, "slope": 2, "ca": 0, "thal": 2,
+}
+SAMPLE_ROWS = 1000
+
+
+def sample_patients(count: int = SAMPLE_ROWS, seed: int = 42) -> List[dict]:
+    """Patients from the dataset, or the UI's default patient when it is missing."""
+    if not dataset.DATA_PATH.exists():
+        return [DEFAULT_PATIENT]
+    X, _ = dataset.load_xy()
+    # to_json turns NaN into null and numpy scalars into plain numbers
+    return json.loads(X.sample(n=min(count, len(X)), random_state=seed).to_json(orient="records"))
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str,
+                  payload=None) -> Tuple[int, bytes]:
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write((
+        f"{method} {path} HTTP/1.1\r\nHost: loadtest\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode("latin-1") + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Server closed the connection")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(host: str, port: int, patients: List[dict], deadline: float, seed: int,
+                 latencies: List[float], errors: List[str]) -> None:
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status, body = await request(reader, writer, "POST", "/predict", rng.choice(patients))
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(body.decode("utf-8", "replace"))
+    finally:
+        writer.close()
+
+
+async def fetch_metrics(host: str, port: int) -> Optional[Dict]:
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        return None
+    try:
+        status, body = await request(reader, writer, "GET", "/metrics")
+        return json.loads(body) if status == 200 else None
+    finally:
+        writer.close()
+
+
+async def run_load(host: str, port: int, concurrency: int, duration: float) -> dict:
+    patients = sample_patients()
+    latencies: List[float] = []
+    errors: List[str] = []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        client(host, port, patients, deadline, seed, latencies, errors) for seed in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "server": await fetch_metrics(host, port),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Send concurrent single-row requests to serve.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=32, help="simultaneous clients (default: 32)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run (default: 10)")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    try:
+        summary = asyncio.run(run_load(args.host, args.port, max(1, args.concurrency), args.duration))
+    except OSError as exc:
+        print(f"Could not reach the server at {args.host}:{args.port}: {exc}")
+        return 1
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    print(f"{summary['requests']} requests in {summary['elapsed_s']} s "
+          f"({summary['requests_per_sec']} req/s) from {args.concurrency} clients")
+    print(f"Client latency: p50 {summary['p50_ms']} ms, p99 {summary['p99_ms']} ms")
+    if summary["errors"]:
+        print(f"Errors: {summary['errors']} (first: {summary['first_error']})")
+    server = summary["server"]
+    if server:
+        print(f"Server latency: p50 {server['latency_ms']['p50']} ms, p99 {server['latency_ms']['p99']} ms; "
+              f"{server['rows_per_batch']} rows per model call over {server['batches']} calls")
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
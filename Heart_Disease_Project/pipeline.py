@@ -0,0 +1,504 @@
+"""Run the notebook workflow end to end as a DAG of cached stages.
+
+    python pipeline.py                  # run every stage
+    python pipeline.py supervised tune  # run these stages and what they depend on
+    python pipeline.py --status         # show which stages are cached
+    python pipeline.py --force pca      # recompute a stage even if it is cached
+
+Each stage is cached under data/cache/pipeline/<stage>/<key>/. The key hashes
+the stage's code, its parameters, the dataset and the outputs of the stages
+it reads. After an edit only the stages whose key changed are recomputed. A
+stage that reproduces identical outputs leaves everything downstream
+cached. Stages whose inputs are ready run in parallel processes. Their
+outputs are then copied into models/ and results/, where the notebooks and
+the Streamlit app expect them.
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from joblib import dump, load
+from scipy.cluster.hierarchy import dendrogram, fcluster, linkage
+from scipy.stats import randint
+from sklearn.cluster import KMeans
+from sklearn.compose import ColumnTransformer
+from sklearn.decomposition import PCA
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_selection import RFE, chi2
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score, roc_curve
+from sklearn.metrics import silhouette_score
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+
+import dataset
+
+
+PROJECT_DIR = dataset.PROJECT_DIR
+PIPELINE_CACHE_DIR = dataset.CACHE_DIR / "pipeline"
+MANIFEST = "manifest.json"
+# Stage output folders, copied over the project's own when the run finishes
+OUTPUT_DIRS = ("models", "results")
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable[[Dict[str, Path], Path, dict], dict]
+    deps: List[str]
+    params: dict
+
+
+def save_figure(path: Path) -> None:
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close()
+
+
+def load_preprocessor(inputs: Dict[str, Path]) -> dict:
+    return load(inputs["preprocess"] / "models" / "preprocessor.pkl")
+
+
+def run_preprocess(inputs: Dict[str, Path], out: Path, params: dict) -> dict:
+    X_train, X_test, y_train, y_test = dataset.load_split()
+    num_features = [c for c in X_train.columns if pd.api.types.is_numeric_dtype(X_train[c])]
+    cat_features = [c for c in X_train.columns if not pd.api.types.is_numeric_dtype(X_train[c])]
+    numeric_transformer = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="median")),
+        ("scaler", StandardScaler()),
+    ])
+    categorical_transformer = Pipeline(steps=[
+        ("imputer", SimpleImputer(strategy="most_frequent")),
+        ("onehot", OneHotEncoder(handle_unknown="ignore")),
+    ])
+    preprocessor = ColumnTransformer(transformers=[
+        ("num", numeric_transformer, num_features),
+        ("cat", categorical_transformer, cat_features),
+    ])
+    preprocessor.fit(X_train)
+    dump({
+        "preprocessor": preprocessor,
+        "feature_names": list(X_train.columns),
+        "target_name": dataset.TARGET,
+    }, out / "models" / "preprocessor.pkl")
+    return {"numeric_features": num_features, "categorical_features": cat_features}
+
+
+def run_eda(inputs: Dict[str, Path], out: Path, params: dict) -> dict:
+    raw = dataset.load_dataset()
+    num_cols = [c for c in raw.columns if pd.api.types.is_numeric_dtype(raw[c]) and c != dataset.TARGET]
+    raw[num_cols].hist(figsize=(12, 10))
+    save_figure(out / "results" / "eda_histograms.png")
+    plt.figure(figsize=(12, 8))
+    sns.boxplot(data=raw[num_cols])
+    plt.xticks(rotation=45)
+    save_figure(out / "results" / "eda_boxplots.png")
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(raw.corr(numeric_only=True), annot=False, cmap="coolwarm")
+    save_figure(out / "results" / "eda_corr_heatmap.png")
+    return {"rows": len(raw), "columns": len(raw.columns)}
+
+
+def run_pca(inputs: Dict[str, Path], out: Path, params: dict) -> dict:
+    pre = load_preprocessor(inputs)
+    X_train, X_test, y_train, y_test = dataset.load_split()
+    Xt = pre["preprocessor"].transform(X_train)
+    pca = PCA(n_components=None, random_state=params["random_state"])
+    Xt_pca = pca.fit_transform(Xt)
+    cum = pca.explained_variance_ratio_.cumsum()
+
+    plt.figure(figsize=(8, 4))
+    plt.plot(range(1, len(cum) + 1), cum, marker="o")
+    plt.axhline(params["variance"], color="r", linestyle="--")
+    plt.xlabel("Number of components")
+    plt.ylabel("Cumulative explained variance")
+    plt.title("PCA Cumulative Explained Variance")
+    save_figure(out / "results" / "pca_cumulative_variance.png")
+
+    plt.figure(figsize=(6, 5))
+    plt.scatter(Xt_pca[:, 0], Xt_pca[:, 1], c=y_train, cmap="coolwarm", s=25, alpha=0.8)
+    plt.xlabel("PC1")
+    plt.ylabel("PC2")
+    plt.title("PCA Scatter (train)")
+    save_figure(out / "results" / "pca_scatter.png")
+    return {
+        "components_for_variance": int((cum >= params["variance"]).argmax() + 1),
+        "explained_variance_ratio": pca.explained_variance_ratio_.round(4).tolist(),
+    }
+
+
+def run_features(inputs: Dict[str, Path], out: Path, params: dict) -> dict:
+    pre = load_preprocessor(inputs)
+    X_train, X_test, y_train, y_test = dataset.load_split()
+    Xt = pre["preprocessor"].fit_transform(X_train)
+    # chi2 needs non-negative inputs and the features are standardized
+    chi2_scores, pvals = chi2(np.abs(Xt), y_train)
+
+    rf = RandomForestClassifier(n_estimators=200, random_state=params["random_state"])
+    rf.fit(Xt, y_train)
+    rf_importances = rf.feature_importances_
+
+    rfe = RFE(
+        estimator=RandomForestClassifier(n_estimators=100, random_state=params["random_state"]),
+        n_features_to_select=min(params["rfe_features"], Xt.shape[1]),
+    )
+    rfe.fit(Xt, y_train)
+
+    plt.figure(figsize=(8, 4))
+    plt.bar(range(len(rf_importances)), rf_importances)
+    plt.title("RandomForest Importances (transformed features)")
+    save_figure(out / "results" / "feature_importance_rf.png")
+    return {
+        "top_rf_features": np.argsort(rf_importances)[-10:][::-1].tolist(),
+        "rfe_support": rfe.support_.tolist(),
+        "chi2_scores": np.nan_to_num(chi2_scores).round(4).tolist(),
+    }
+
+
+def run_supervised(inputs: Dict[str, Path], out: Path, params: dict) -> dict:
+    pre = load_preprocessor(inputs)
+    X, y = dataset.load_xy()
+    train_idx, test_idx = dataset.split_indices(y)
+    X_train, X_test, y_train, y_test = X.iloc[train_idx], X.iloc[test_idx], y.iloc[train_idx], y.iloc[test_idx]
+    random_state = params["random_state"]
+    models = {
+        "log_reg": LogisticRegression(max_iter=1000),
+        "decision_tree": DecisionTreeClassifier(random_state=random_state),
+        "random_forest": RandomForestClassifier(n_estimators=300, random_state=random_state),
+        "svm": SVC(probability=True, kernel="rbf", random_state=random_state),
+    }
+
+    results = {}
+    plt.figure(figsize=(6, 5))
+    for name, clf in models.items():
+        pipe = Pipeline(steps=[("pre", pre["preprocessor"]), ("clf", clf)])
+        pipe.fit(X_train, y_train)
+        y_proba = pipe.predict_proba(X_test)[:, 1]
+        y_pred = pipe.predict(X_test)
+        results[name] = {
+            "accuracy": accuracy_score(y_test, y_pred),
+            "precision": precision_score(y_test, y_pred, zero_division=0),
+            "recall": recall_score(y_test, y_pred, zero_division=0),
+            "f1": f1_score(y_test, y_pred, zero_division=0),
+            "auc": roc_auc_score(y_test, y_proba),
+        }
+        fpr, tpr, _ = roc_curve(y_test, y_proba)
+        plt.plot(fpr, tpr, label=f"{name} (AUC={results[name]['auc']:.2f})")
+    plt.plot([0, 1], [0, 1], "k--")
+    plt.xlabel("FPR")
+    plt.ylabel("TPR")
+    plt.title("ROC Curves")
+    plt.legend()
+    save_figure(out / "results" / "roc_curves.png")
+
+    with open(out / "results" / "evaluation_metrics.txt", "w") as f:
+        for name, m in results.items():
+            f.write(f"{name}: {m}\n")
+
+    best_name = max(results, key=lambda k: results[k]["auc"] if not np.isnan(results[k]["auc"]) else -1)
+    best_pipe = Pipeline(steps=[("pre", pre["preprocessor"]), ("clf", models[best_name])])
+    best_pipe.fit(X, y)
+    dump(best_pipe, out / "models" / "final_model.pkl")
+    return {"best_model": best_name, "metrics": {name: {k: float(v) for k, v in m.items()} for name, m in results.items()}}
+
+
+def run_unsupervised(inputs: Dict[str, Path], out: Path, params: dict) -> dict:
+    pre = load_preprocessor(inputs)
+    X, y = dataset.load_xy()
+    Xt = pre["preprocessor"].fit_transform(X)
+
+    ks = list(range(2, min(params["max_k"], Xt.shape[0])))
+    inertias, sils = [], []
+    for k in ks:
+        km = KMeans(n_clusters=k, n_init=10, random_state=params["random_state"])
+        labels = km.fit_predict(Xt)
+        inertias.append(float(km.inertia_))
+        sils.append(float(silhouette_score(Xt, labels)) if len(set(labels)) > 1 else float("nan"))
+
+    plt.figure(figsize=(6, 4))
+    plt.plot(ks, inertias, marker="o")
+    plt.xlabel("k")
+    plt.ylabel("Inertia")
+    plt.title("Elbow Method")
+    save_figure(out / "results" / "kmeans_elbow.png")
+
+    plt.figure(figsize=(6, 4))
+    plt.plot(ks, sils, marker="o")
+    plt.xlabel("k")
+    plt.ylabel("Silhouette")
+    plt.title("Silhouette Scores")
+    save_figure(out / "results" / "kmeans_silhouette.png")
+
+    Z = linkage(Xt, method="ward")
+    plt.figure(figsize=(8, 4))
+    dendrogram(Z, no_labels=True, color_threshold=0)
+    plt.title("Hierarchical Dendrogram")
+    save_figure(out / "results" / "hierarchical_dendrogram.png")
+
+    labels_2 = fcluster(Z, t=2, criterion="maxclust")
+    crosstab = pd.crosstab(labels_2, y)
+    return {
+        "k": ks,
+        "inertia": inertias,
+        "silhouette": sils,
+        "cluster_vs_target": {str(label): row.tolist() for label, row in crosstab.iterrows()},
+    }
+
+
+def run_tune(inputs: Dict[str, Path], out: Path, params: dict) -> dict:
+    pre = load_preprocessor(inputs)
+    X_train, X_test, y_train, y_test = dataset.load_split()
+    random_state = params["random_state"]
+    pipe = Pipeline(steps=[("pre", pre["preprocessor"]), ("clf", RandomForestClassifier(random_state=random_state))])
+
+    param_grid = {
+        "clf__n_estimators": [100, 200, 400],
+        "clf__max_depth": [None, 5, 10],
+        "clf__min_samples_split": [2, 5, 10],
+    }
+    grid = GridSearchCV(pipe, param_grid=param_grid, cv=3, n_jobs=params["n_jobs"])
+    grid.fit(X_train, y_train)
+
+    param_dist = {
+        "clf__n_estimators": randint(100, 600),
+        "clf__max_depth": [None, 4, 6, 8, 10],
+        "clf__min_samples_split": randint(2, 12),
+    }
+    rand = RandomizedSearchCV(
+        pipe, param_distributions=param_dist, n_iter=10, cv=3, n_jobs=params["n_jobs"], random_state=random_state
+    )
+    rand.fit(X_train, y_train)
+
+    best = max([grid, rand], key=lambda m: m.best_score_)
+    dump(best.best_estimator_, out / "models" / "final_model.pkl")
+    return {
+        "grid_best_params": grid.best_params_,
+        "random_best_params": {k: (int(v) if isinstance(v, np.integer) else v) for k, v in rand.best_params_.items()},
+        "best_score": float(best.best_score_),
+    }
+
+
+# In dependency order; later stages win when two publish the same file, so
+# the tuned model replaces the supervised one as notebooks 04 then 06 did
+STAGES: Dict[str, Stage] = {stage.name: stage for stage in [
+    Stage("preprocess", run_preprocess, [], {}),
+    Stage("eda", run_eda, [], {}),
+    Stage("pca", run_pca, ["preprocess"], {"random_state": dataset.RANDOM_STATE, "variance": 0.95}),
+    Stage("features", run_features, ["preprocess"], {"random_state": dataset.RANDOM_STATE, "rfe_features": 5}),
+    Stage("supervised", run_supervised, ["preprocess"], {"random_state": dataset.RANDOM_STATE}),
+    Stage("unsupervised", run_unsupervised, ["preprocess"], {"random_state": dataset.RANDOM_STATE, "max_k": 8}),
+    Stage("tune", run_tune, ["preprocess"], {"random_state": dataset.RANDOM_STATE}),
+]}
+
+# Helpers the stages call; editing one invalidates every stage
+SHARED_CODE = (save_figure, load_preprocessor)
+
+
+def code_digest(stage: Stage) -> str:
+    digest = hashlib.sha256()
+    for func in (stage.run,) + SHARED_CODE:
+        digest.update(inspect.getsource(func).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stage_key(stage: Stage, data_key: str, dep_digests: Dict[str, str]) -> str:
+    payload = json.dumps({
+        "stage": stage.name,
+        "code": code_digest(stage),
+        "params": stage.params,
+        "data": data_key,
+        "deps": dep_digests,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def tree_digest(root: Path) -> str:
+    """Hash of every output file's path and contents under a stage directory."""
+    digest = hashlib.sha256()
+    for path in sorted(p for p in root.rglob("*") if p.is_file() and p.name != MANIFEST):
+        digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+        digest.update(dataset.file_digest(path).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stage_dir(name: str, key: str) -> Path:
+    return PIPELINE_CACHE_DIR / name / key
+
+
+def read_manifest(path: Path) -> Optional[dict]:
+    try:
+        return json.loads((path / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def execute_stage(name: str, key: str, dep_keys: Dict[str, str], n_jobs: int = 1) -> dict:
+    """Run one stage in a scratch directory and move it into the cache when it succeeds.
+
+    n_jobs is the stage's share of the CPUs for its own parallelism. It is
+    passed alongside the params but kept out of the cache key, since it does
+    not change the results.
+    """
+    stage = STAGES[name]
+    out = stage_dir(name, key)
+    tmp = out.with_name(f"{key}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    for sub in OUTPUT_DIRS:
+        (tmp / sub).mkdir(parents=True)
+    inputs = {dep: stage_dir(dep, dep_keys[dep]) for dep in stage.deps}
+    started = time.perf_counter()
+    try:
+        summary = stage.run(inputs, tmp, {**stage.params, "n_jobs": n_jobs})
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    manifest = {
+        "stage": name,
+        "key": key,
+        "digest": tree_digest(tmp),
+        "seconds": round(time.perf_counter() - started, 2),
+        "summary": summary,
+    }
+    (tmp / MANIFEST).write_text(json.dumps(manifest, indent=2, default=str), encoding="utf-8")
+    shutil.rmtree(out, ignore_errors=True)
+    os.replace(tmp, out)
+    return manifest
+
+
+def resolve(targets: List[str]) -> List[str]:
+    """The targets and everything they depend on, in dependency order."""
+    wanted = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(STAGES[name].deps)
+    return [name for name in STAGES if name in wanted]
+
+
+def run_pipeline(targets: List[str], jobs: int, force: List[str]) -> Dict[str, dict]:
+    """Run the targets, reusing cached stages, and return each stage's manifest."""
+    data_key = dataset.cache_key(dataset.DATA_PATH)
+    pending = resolve(targets)
+    done: Dict[str, dict] = {}
+    running = {}
+    # spawn, not fork: the parent may already hold BLAS and joblib threads
+    context = multiprocessing.get_context("spawn")
+    # Up to `jobs` stages run at once, so each gets an equal share of the CPUs
+    n_jobs = max(1, (os.cpu_count() or 1) // jobs)
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+        while pending or running:
+            ready = [name for name in pending if all(dep in done for dep in STAGES[name].deps)]
+            for name in ready:
+                pending.remove(name)
+                stage = STAGES[name]
+                key = stage_key(stage, data_key, {dep: done[dep]["digest"] for dep in stage.deps})
+                manifest = read_manifest(stage_dir(name, key))
+                if manifest is not None and name not in force:
+                    print(f"cached   {name:<13} {key}")
+                    done[name] = manifest
+                else:
+                    print(f"running  {name:<13} {key}")
+                    dep_keys = {dep: done[dep]["key"] for dep in stage.deps}
+                    running[pool.submit(execute_stage, name, key, dep_keys, n_jobs)] = name
+            if ready:
+                # Cached stages may have unblocked others; schedule those first
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    manifest = future.result()
+                except Exception as exc:
+                    print(f"failed   {name:<13} {exc}")
+                    # Let running stages finish but start nothing new
+                    pending.clear()
+                    continue
+                done[name] = manifest
+                print(f"finished {name:<13} {manifest['key']} in {manifest['seconds']} s")
+    return done
+
+
+def publish(done: Dict[str, dict]) -> None:
+    for name in STAGES:
+        if name not in done:
+            continue
+        for sub in OUTPUT_DIRS:
+            source = stage_dir(name, done[name]["key"]) / sub
+            if any(source.iterdir()):
+                shutil.copytree(source, PROJECT_DIR / sub, dirs_exist_ok=True)
+
+
+def status() -> None:
+    data_key = dataset.cache_key(dataset.DATA_PATH)
+    done: Dict[str, dict] = {}
+    for name, stage in STAGES.items():
+        if not all(dep in done for dep in stage.deps):
+            print(f"stale    {name:<13} (an upstream stage must run first)")
+            continue
+        key = stage_key(stage, data_key, {dep: done[dep]["digest"] for dep in stage.deps})
+        manifest = read_manifest(stage_dir(name, key))
+        if manifest is None:
+            print(f"stale    {name:<13} {key}")
+        else:
+            done[name] = manifest
+            print(f"cached   {name:<13} {key} ({manifest['seconds']} s)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the heart disease workflow as cached pipeline stages")
+    parser.add_argument("stages", nargs="*", metavar="stage",
+                        help=f"stages to run with their dependencies (default: all of {', '.join(STAGES)})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="stages to run at once (default: CPU count)")
+    parser.add_argument("--force", action="store_true",
+                        help="recompute the named stages (default: all stages) even if cached")
+    parser.add_argument("--status", action="store_true", help="show which stages are cached and exit")
+    args = parser.parse_args()
+    unknown = [name for name in args.stages if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    if not dataset.DATA_PATH.exists():
+        print(f"Dataset not found at {dataset.DATA_PATH}; run download_data.py first")
+        return 1
+    if args.status:
+        status()
+        return 0
+
+    targets = args.stages or list(STAGES)
+    force = targets if args.force else []
+    started = time.perf_counter()
+    done = run_pipeline(targets, max(1, args.jobs), force)
+    failed = [name for name in resolve(targets) if name not in done]
+    publish(done)
+    print(f"Pipeline finished in {time.perf_counter() - started:.1f} s; outputs copied to models/ and results/")
+    if failed:
+        print(f"Not completed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+"""Score patient records in bulk with the saved model.
+
+    python score.py clinic_export.csv scored.csv
+    python score.py clinic_export.parquet scored.parquet --chunk-size 100000
+
+The input is read in chunks, each chunk is scored with one predict_proba
+call, and the results are appended to the output as they are produced, so
+memory use depends on the chunk size and not the file size. The predicted
+class is derived from the probabilities instead of calling predict again.
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from joblib import load
+
+import dataset
+
+
+MODEL_PATH = dataset.PROJECT_DIR / "models" / "final_model.pkl"
+CHUNK_SIZE = 50_000
+PROBABILITY = "probability"
+PREDICTION = "prediction"
+
+Source = Union[str, Path, BinaryIO]
+
+
+def input_format(name: str) -> str:
+    suffix = Path(name).suffix.lower()
+    if suffix in {".parquet", ".pq"}:
+        return "parquet"
+    if suffix in {".csv", ".txt"}:
+        return "csv"
+    raise ValueError(f"Unsupported file type {suffix!r}; use .csv or .parquet")
+
+
+def feature_columns(model) -> List[str]:
+    """Columns the model was fitted on, in order."""
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        raise ValueError("The model does not record its input columns; refit it on a DataFrame")
+    return list(names)
+
+
+def numeric_columns(model) -> List[str]:
+    """Columns the model's preprocessor reads as numbers; empty if it cannot tell.
+
+    Every column of the ColumnTransformer in front of the classifier counts
+    as numeric unless its transformer one-hot encodes it.
+    """
+    steps = getattr(model, "steps", None)
+    transformers = getattr(steps[0][1], "transformers_", None) if steps else None
+    if transformers is None:
+        return []
+    numeric = []
+    for _, transformer, selected in transformers:
+        if isinstance(transformer, str):
+            continue
+        parts = [step for _, step in transformer.steps] if hasattr(transformer, "steps") else [transformer]
+        if not any(type(part).__name__ == "OneHotEncoder" for part in parts):
+            numeric.extend(selected)
+    return numeric
+
+
+def iter_chunks(source: Source, fmt: str, chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Frames of up to chunk_size rows; a file without rows gives one empty frame."""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(source)
+        if parquet.metadata.num_rows == 0:
+            yield parquet.schema_arrow.empty_table().to_pandas()
+            return
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        # A header-only CSV comes through as one empty chunk
+        yield from pd.read_csv(source, chunksize=chunk_size)
+
+
+def score_frame(model, frame: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Return frame with probability and prediction columns, from one predict_proba call."""
+    frame = frame.copy()
+    frame.columns = frame.columns.str.lower().str.strip()
+    missing = [c for c in columns if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    # predict_proba refuses zero rows; an empty chunk still gets the output columns
+    proba = model.predict_proba(frame[columns]) if len(frame) else np.zeros((0, len(model.classes_)))
+    # Same rule predict() applies for probability-based classifiers
+    frame[PREDICTION] = np.asarray(model.classes_)[proba.argmax(axis=1)]
+    frame[PROBABILITY] = proba[:, 1].astype("float32")
+    return frame
+
+
+class ResultWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: Path, fmt: str):
+        self.path = Path(path)
+        self.fmt = fmt
+        self.parquet_writer = None
+        self.rows = 0
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self.parquet_writer.write_table(table.cast(self.parquet_writer.schema))
+        else:
+            frame.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(frame)
+
+    def close(self) -> None:
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+            self.parquet_writer = None
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def score_file(
+    model,
+    source: Source,
+    destination: Path,
+    in_format: str,
+    out_format: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+    on_chunk=None,
+) -> int:
+    """Score every row of source into destination and return the number of rows.
+
+    on_chunk, if given, is called with each scored chunk after it is written.
+    """
+    columns = feature_columns(model)
+    with ResultWriter(destination, out_format or input_format(str(destination))) as writer:
+        for chunk in iter_chunks(source, in_format, chunk_size):
+            scored = score_frame(model, chunk, columns)
+            writer.write(scored)
+            if on_chunk is not None:
+                on_chunk(scored)
+        return writer.rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of patients with the saved model")
+    parser.add_argument("input", type=Path, help="patients to score (.csv or .parquet)")
+    parser.add_argument("output", type=Path, help="where to write the scores (.csv or .parquet)")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH, help=f"model to use (default: {MODEL_PATH})")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"rows scored per model call (default: {CHUNK_SIZE})")
+    args = parser.parse_args()
+
+    if not args.model.exists():
+        print(f"Model not found at {args.model}; run pipeline.py or the notebooks first")
+        return 1
+    try:
+        in_format, out_format = input_format(str(args.input)), input_format(str(args.output))
+    except ValueError as exc:
+        print(exc)
+        return 1
+
+    model = load(args.model)
+    started = time.perf_counter()
+    try:
+        rows = score_file(model, args.input, args.output, in_format, out_format, max(1, args.chunk_size))
+    except (OSError, ValueError) as exc:
+        print(f"Could not score {args.input}: {exc}")
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"Scored {rows} rows in {elapsed:.1f} s ({rows / elapsed if elapsed else 0:,.0f} rows/s) -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
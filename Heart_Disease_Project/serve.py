@@ -0,0 +1,360 @@
+"""Local HTTP inference server for the saved model.
+
+    python serve.py --port 8000 --max-batch 64 --max-wait-ms 2
+
+    POST /predict   one patient as a JSON object, or a list of them
+                    -> {"probability": 0.83, "prediction": 1} (or a list)
+    GET  /metrics   latency percentiles, throughput and batch sizes
+    GET  /health    {"status": "ok"}
+
+The model is loaded once. Requests that arrive within --max-wait-ms of each
+other are coalesced into one DataFrame and scored with a single
+predict_proba call on a worker thread, so concurrent single-row requests
+share the pipeline's per-call overhead instead of each paying it.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+from joblib import load
+
+from score import MODEL_PATH, PREDICTION, PROBABILITY, feature_columns, numeric_columns, score_frame
+
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH = 64
+MAX_WAIT_MS = 2.0
+# Latency samples kept for the percentiles in /metrics
+LATENCY_WINDOW = 10_000
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, math.ceil(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+class Metrics:
+    """Request latencies, row and batch counts since the server started."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.batch_sizes: Dict[int, int] = {}
+
+    def record_batch(self, rows: int) -> None:
+        self.batches += 1
+        self.rows += rows
+        self.batch_sizes[rows] = self.batch_sizes.get(rows, 0) + 1
+
+    def record_request(self, seconds: float) -> None:
+        self.requests += 1
+        self.latencies.append(seconds)
+
+    def snapshot(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "batches": self.batches,
+            "errors": self.errors,
+            "uptime_s": round(elapsed, 1),
+            "requests_per_sec": round(self.requests / elapsed, 1) if elapsed else 0.0,
+            "rows_per_batch": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50) * 1000, 3),
+                "p99": round(percentile(latencies, 99) * 1000, 3),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+            "batch_sizes": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+        }
+
+
+class MicroBatcher:
+    """Coalesces queued rows into batches scored with one predict_proba call each.
+
+    A batch closes when it holds max_batch rows or max_wait_ms after its
+    first row arrived, whichever comes first. Scoring runs on a single
+    worker thread so the event loop keeps accepting requests meanwhile. If
+    a batch fails, its requests are scored again one by one, so only the
+    request that caused the failure gets the error.
+    """
+
+    def __init__(self, model, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS,
+                 metrics: Optional[Metrics] = None):
+        self.model = model
+        self.columns = feature_columns(model)
+        self.numeric = set(numeric_columns(model))
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics or Metrics()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict")
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        # Nothing is left to score requests still waiting in the queue
+        while self.queue is not None and not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(HTTPError(503, "Server is shutting down"))
+        self.executor.shutdown(wait=True)
+
+    async def predict(self, rows: List[dict]) -> List[Tuple[float, int]]:
+        """Queue rows for the next batch and wait for their (probability, prediction)."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future))
+        return await future
+
+    async def run(self) -> None:
+        while True:
+            pending = [await self.queue.get()]
+            try:
+                await self.collect(pending)
+                await self.score_batch(pending)
+            except asyncio.CancelledError:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(HTTPError(503, "Server is shutting down"))
+                raise
+
+    async def collect(self, pending: List[Tuple[List[dict], asyncio.Future]]) -> None:
+        """Add queued requests to the batch until it is full or its wait is over."""
+        loop = asyncio.get_running_loop()
+        size = len(pending[0][0])
+        deadline = loop.time() + self.max_wait
+        while size < self.max_batch:
+            try:
+                # Requests that queued up while the last batch was scored join at once
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            pending.append(item)
+            size += len(item[0])
+
+    async def score_batch(self, pending: List[Tuple[List[dict], asyncio.Future]]) -> None:
+        rows = [row for item, _ in pending for row in item]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.score, rows)
+        except Exception as exc:
+            if len(pending) > 1:
+                for request in pending:
+                    await self.score_batch([request])
+                return
+            self.metrics.errors += 1
+            if not pending[0][1].done():
+                pending[0][1].set_exception(exc)
+            return
+        self.metrics.record_batch(len(rows))
+        start = 0
+        for item, future in pending:
+            if not future.done():
+                future.set_result(results[start:start + len(item)])
+            start += len(item)
+
+    def score(self, rows: List[dict]) -> List[Tuple[float, int]]:
+        scored = score_frame(self.model, pd.DataFrame.from_records(rows, columns=self.columns), self.columns)
+        return list(zip(scored[PROBABILITY].tolist(), scored[PREDICTION].tolist()))
+
+
+def parse_rows(body: bytes, columns: List[str], numeric: Set[str] = frozenset()) -> Tuple[List[dict], bool]:
+    """Decode a patient object or list into rows; the flag says whether it was a list.
+
+    Values of numeric columns are converted to float here, so a bad value is
+    a 400 for its own request instead of failing the batch it would join.
+    """
+    try:
+        data = json.loads(body or b"null")
+    except ValueError:
+        # JSONDecodeError, or an integer with more digits than int() accepts
+        raise HTTPError(400, "Request body must be valid JSON")
+    many = isinstance(data, list)
+    items = data if many else [data]
+    if not items or not all(isinstance(item, dict) for item in items):
+        raise HTTPError(400, "Request body must be a patient object or a non-empty list of them")
+    rows = []
+    for item in items:
+        row = {key.lower().strip(): value for key, value in item.items()}
+        missing = [c for c in columns if c not in row]
+        if missing:
+            raise HTTPError(400, f"Missing fields: {', '.join(missing)}")
+        for column in columns:
+            value = row[column]
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float, str))):
+                raise HTTPError(400, f"{column} must be a number, a string or null")
+            if value is not None and column in numeric:
+                try:
+                    value = float(value)
+                except (ValueError, OverflowError):
+                    # e.g. "abc", or an integer too large for a float
+                    value = math.nan
+                if not math.isfinite(value):
+                    raise HTTPError(400, f"{column} must be a finite number or null")
+                row[column] = value
+        rows.append({column: row[column] for column in columns})
+    return rows, many
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool) -> None:
+    body = json.dumps(payload).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+async def handle(batcher: MicroBatcher, method: str, path: str, body: bytes):
+    if path == "/predict" and method == "POST":
+        started = time.perf_counter()
+        rows, many = parse_rows(body, batcher.columns, batcher.numeric)
+        results = [
+            {"probability": probability, "prediction": prediction}
+            for probability, prediction in await batcher.predict(rows)
+        ]
+        batcher.metrics.record_request(time.perf_counter() - started)
+        return 200, results if many else results[0]
+    if path == "/metrics" and method == "GET":
+        return 200, batcher.metrics.snapshot()
+    if path == "/health" and method == "GET":
+        return 200, {"status": "ok"}
+    raise HTTPError(404, f"No route for {method} {path}")
+
+
+def make_connection_handler(batcher: MicroBatcher):
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as exc:
+                    write_response(writer, exc.status, {"error": exc.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    status, payload = await handle(batcher, method, path, body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {"error": exc.message}
+                except Exception as exc:
+                    print(f"Error handling {method} {path}: {exc}")
+                    status, payload = 500, {"error": "Internal server error"}
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle_connection
+
+
+async def serve(model, host: str, port: int, max_batch: int, max_wait_ms: float) -> None:
+    batcher = MicroBatcher(model, max_batch, max_wait_ms)
+    await batcher.start()
+    server = await asyncio.start_server(make_connection_handler(batcher), host, port, backlog=1024)
+    print(f"Serving {len(batcher.columns)}-feature model on http://{host}:{port} "
+          f"(batches of up to {max_batch} rows, {max_wait_ms} ms window)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve the heart disease model over HTTP with micro-batching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default=str(MODEL_PATH), help=f"model to serve (default: {MODEL_PATH})")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH,
+                        help=f"most rows scored per model call (default: {MAX_BATCH})")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS,
+                        help=f"how long a batch waits for more requests (default: {MAX_WAIT_MS}; 0 disables)")
+    args = parser.parse_args()
+
+    try:
+        model = load(args.model)
+    except FileNotFoundError:
+        print(f"Model not found at {args.model}; run pipeline.py or the notebooks first")
+        return 1
+    try:
+        asyncio.run(serve(model, args.host, args.port, max(1, args.max_batch), max(0.0, args.max_wait_ms)))
+    except KeyboardInterrupt:
+        print("Server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
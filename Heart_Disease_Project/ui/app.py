@@ -1,4 +1,8 @@
+import os
+import shutil
 import sys
+import tempfile
+import time
 from pathlib import Path
 
 import streamlit as st
@@ -7,7 +11,16 @@ from joblib import load
 
 
 PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+from score import CHUNK_SIZE, PREDICTION, PROBABILITY, feature_columns, input_format, score_file, score_frame
+
 MODEL_PATH = PROJECT_DIR / "models" / "final_model.pkl"
+PREVIEW_ROWS = 20
+# Largest scored file offered for download; Streamlit keeps downloads in memory
+MAX_DOWNLOAD_MB = 200
+# Scored files no session has shown for this long are deleted
+SCORED_FILE_TTL_S = 3600
+SCORED_DIR_PREFIX = "heart_scores_"
 
 
 @st.cache_resource
@@ -18,6 +31,36 @@ def load_model():
     return load(MODEL_PATH)
 
 
+def last_used(path: Path) -> float:
+    times = [path.stat().st_mtime] + [child.stat().st_mtime for child in path.iterdir()]
+    return max(times)
+
+
+@st.cache_resource
+def scored_dir() -> tempfile.TemporaryDirectory:
+    """This process's directory for scored files; it is removed when the app exits."""
+    # Directories left behind by an app process that was killed
+    cutoff = time.time() - SCORED_FILE_TTL_S
+    for stale in Path(tempfile.gettempdir()).glob(f"{SCORED_DIR_PREFIX}*"):
+        try:
+            if last_used(stale) < cutoff:
+                shutil.rmtree(stale, ignore_errors=True)
+        except OSError:
+            pass
+    return tempfile.TemporaryDirectory(prefix=SCORED_DIR_PREFIX)
+
+
+def sweep_scored_files(directory: Path) -> None:
+    """Delete scored files of sessions that ended or went idle; each rerun touches its own file."""
+    cutoff = time.time() - SCORED_FILE_TTL_S
+    for path in directory.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
 st.title("Heart Disease Risk Prediction")
 st.write("Input patient data to predict heart disease risk.")
 
@@ -55,12 +98,88 @@ if submitted:
     df = pd.DataFrame([inputs])
     if model is None:
         st.stop()
-    proba = None
-    if hasattr(model, "predict_proba"):
-        proba = float(model.predict_proba(df)[:, 1][0])
-    pred = int(model.predict(df)[0])
+    # One pipeline run gives both the probability and the class
+    scored = score_frame(model, df, feature_columns(model))
     st.subheader("Prediction")
-    st.write(f"Predicted class: {pred}")
-    if proba is not None:
-        st.write(f"Risk probability: {proba:.3f}")
+    st.write(f"Predicted class: {int(scored[PREDICTION].iloc[0])}")
+    st.write(f"Risk probability: {float(scored[PROBABILITY].iloc[0]):.3f}")
+
+st.header("Batch prediction")
+st.write("Upload a CSV or Parquet export with the columns above to score every row.")
+uploaded = st.file_uploader("Patients file", type=["csv", "parquet"])
+
+
+def score_upload(uploaded) -> dict:
+    """Score an upload chunk by chunk into a temporary file and summarize it."""
+    fmt = input_format(uploaded.name)
+    progress = st.progress(0.0, text="Scoring...")
+    batch = {"file_id": uploaded.file_id, "fmt": fmt, "path": None, "rows": 0, "positive": 0,
+             "preview": None, "error": None}
+
+    def on_chunk(scored: pd.DataFrame) -> None:
+        batch["rows"] += len(scored)
+        batch["positive"] += int((scored[PREDICTION] == 1).sum())
+        if batch["preview"] is None:
+            batch["preview"] = scored.head(PREVIEW_ROWS)
+        # Row counts are unknown up front, so track progress through the upload
+        progress.progress(min(uploaded.tell() / max(uploaded.size, 1), 1.0), text=f"Scored {batch['rows']:,} rows")
+
+    # Results are written chunk by chunk to disk rather than held in memory
+    directory = Path(scored_dir().name)
+    # Another app process may have swept the directory after an idle hour
+    directory.mkdir(exist_ok=True)
+    sweep_scored_files(directory)
+    with tempfile.NamedTemporaryFile(suffix=f".{fmt}", dir=directory, delete=False) as out:
+        out_path = Path(out.name)
+    try:
+        score_file(model, uploaded, out_path, fmt, fmt, CHUNK_SIZE, on_chunk)
+    except ValueError as exc:
+        out_path.unlink(missing_ok=True)
+        batch["error"] = str(exc)
+    else:
+        batch["path"] = out_path
+    progress.empty()
+    return batch
+
+
+def discard_batch() -> None:
+    batch = st.session_state.pop("batch", None)
+    if batch is not None and batch["path"] is not None:
+        batch["path"].unlink(missing_ok=True)
+
+
+if uploaded is None:
+    discard_batch()
+elif model is not None:
+    # Every widget interaction reruns this script; score each upload only once
+    batch = st.session_state.get("batch")
+    if batch is not None and batch["path"] is not None:
+        try:
+            # Marks the file as in use for sweep_scored_files
+            os.utime(batch["path"])
+        except FileNotFoundError:
+            # Swept while the session sat idle
+            batch = None
+    if batch is None or batch["file_id"] != uploaded.file_id:
+        discard_batch()
+        batch = st.session_state["batch"] = score_upload(uploaded)
 
+    if batch["error"]:
+        st.error(f"Could not score {uploaded.name}: {batch['error']}")
+    else:
+        fmt = batch["fmt"]
+        st.write(f"Scored {batch['rows']:,} rows. Predicted positive: {batch['positive']:,} of {batch['rows']:,}")
+        if batch["preview"] is not None:
+            st.dataframe(batch["preview"])
+        size = batch["path"].stat().st_size
+        if size <= MAX_DOWNLOAD_MB * 1024 * 1024:
+            st.download_button(
+                "Download predictions", batch["path"].read_bytes(),
+                file_name=f"{Path(uploaded.name).stem}_scored.{fmt}",
+                mime="text/csv" if fmt == "csv" else "application/octet-stream",
+            )
+        else:
+            st.info(
+                f"The scored file is {size / 1024 / 1024:,.0f} MB, over the {MAX_DOWNLOAD_MB} MB the app offers "
+                f"for download. Score it with `python score.py {uploaded.name} scored.{fmt}` instead."
+            )
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+HTTP/JSON API for Flight Reservation System
+Serves reservation create/read/update/delete/search over HTTP using only
+the standard library, so bookings no longer need the desktop app
+
+Usage:
+    python api_server.py --port 8080 --readers 4
+
+Endpoints:
+    POST   /reservations                  create (JSON body with all fields)
+    GET    /reservations?q=term&limit=50  search, or newest first without q
+    GET    /reservations?after_created_at=...&after_id=...  next page
+    GET    /reservations/<id>             read
+    PUT    /reservations/<id>             update (JSON body with all fields, plus the
+                                          "version" last read to reject stale edits)
+    DELETE /reservations/<id>             delete
+    GET    /stats/flights?flight_number=...&date=...  bookings and seats per flight and date
+    GET    /stats/routes                  bookings per route
+    GET    /stats/days?start=...&end=...  bookings per travel date
+    GET    /metrics[?format=json]         call latency, row and error metrics
+                                          (Prometheus text; needs --metrics)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import Database
+from instrumentation import Instrumentation
+from models import VersionConflict
+from seat_inventory import normalize_seat
+from validation import RESERVATION_FIELDS, validate_reservation
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_LIMIT = 500
+# Largest integer SQLite stores; no reservation id can be above it
+MAX_ID = 2 ** 63 - 1
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+class HTTPError(Exception):
+    """An error response with a status code and message"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def reservation_to_dict(reservation):
+    """Convert a Reservation to a JSON-friendly dict"""
+    return reservation.as_dict()
+
+def parse_body(body):
+    """Decode a JSON object request body"""
+    try:
+        data = json.loads(body or b"{}")
+    except json.JSONDecodeError:
+        raise HTTPError(400, "Request body must be valid JSON")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Request body must be a JSON object")
+    return data
+
+def parse_reservation(data):
+    """Validate the reservation fields of a decoded request body"""
+    values = tuple(str(data.get(field) or "").strip() for field in RESERVATION_FIELDS)
+    error = validate_reservation(*values)
+    if error:
+        raise HTTPError(400, error)
+    return values[:5] + (normalize_seat(values[5]),)
+
+class ReservationService:
+    """Reservation API on top of Database.
+    
+    Reads run on a thread pool sized to the database's reader connections.
+    Writes are queued to a single writer task that applies them one at a
+    time on its own thread, so requests never contend for the writer lock.
+    """
+    
+    def __init__(self, db, readers=4):
+        self.db = db
+        self.read_executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="api-read")
+        self.write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-write")
+        self.write_queue = None
+        self.writer_task = None
+    
+    async def start(self):
+        """Start the writer task"""
+        self.write_queue = asyncio.Queue()
+        self.writer_task = asyncio.create_task(self.writer_loop())
+    
+    async def stop(self):
+        """Stop the writer task and the executors"""
+        if self.writer_task:
+            self.writer_task.cancel()
+        self.read_executor.shutdown(wait=True)
+        self.write_executor.shutdown(wait=True)
+    
+    async def writer_loop(self):
+        """Apply queued writes one at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            method, args, future = await self.write_queue.get()
+            try:
+                result = await loop.run_in_executor(self.write_executor, getattr(self.db, method), *args)
+                if not future.cancelled():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+    
+    async def read(self, method, *args):
+        """Run a Database read on the reader pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.read_executor, getattr(self.db, method), *args)
+    
+    async def write(self, method, *args):
+        """Queue a Database write for the writer task and wait for it"""
+        if self.db.group_commit is not None:
+            # The group committer is already a single writer that batches commits
+            return await asyncio.wrap_future(self.db.submit_write(method, *args))
+        future = asyncio.get_running_loop().create_future()
+        await self.write_queue.put((method, args, future))
+        return await future
+    
+    async def handle(self, method, path, query, body):
+        """Dispatch one request, returning (status, payload)"""
+        parts = [part for part in path.split("/") if part]
+        if parts == ["metrics"]:
+            if method != "GET":
+                raise HTTPError(405, "Use GET on /metrics")
+            return 200, self.get_metrics(query)
+        if len(parts) == 2 and parts[0] == "stats":
+            if method != "GET":
+                raise HTTPError(405, "Use GET on /stats")
+            return 200, await self.get_stats(parts[1], query)
+        if not parts or parts[0] != "reservations" or len(parts) > 2:
+            raise HTTPError(404, "Not found")
+        
+        if len(parts) == 1:
+            if method == "GET":
+                return 200, await self.list_reservations(query)
+            if method == "POST":
+                return 201, await self.create_reservation(body)
+            raise HTTPError(405, "Use GET or POST on /reservations")
+        
+        try:
+            reservation_id = int(parts[1])
+        except ValueError:
+            raise HTTPError(404, "Reservation id must be a number")
+        if not 1 <= reservation_id <= MAX_ID:
+            raise HTTPError(404, "Reservation not found!")
+        if method == "GET":
+            return 200, await self.get_reservation(reservation_id)
+        if method == "PUT":
+            return 200, await self.update_reservation(reservation_id, body)
+        if method == "DELETE":
+            return 200, await self.delete_reservation(reservation_id)
+        raise HTTPError(405, "Use GET, PUT or DELETE on /reservations/<id>")
+    
+    async def list_reservations(self, query):
+        """Search reservations, or page through them newest first"""
+        try:
+            limit = min(int(query.get("limit", ["100"])[0]), MAX_LIMIT)
+        except ValueError:
+            raise HTTPError(400, "limit must be a number")
+        # SQLite reads a negative LIMIT as no limit at all
+        if limit < 1:
+            raise HTTPError(400, "limit must be at least 1")
+        term = query.get("q", [""])[0].strip()
+        if term:
+            rows = await self.read("search_reservations", term, limit)
+        else:
+            after = None
+            if "after_id" in query:
+                try:
+                    after = (query.get("after_created_at", [""])[0], int(query["after_id"][0]))
+                except ValueError:
+                    raise HTTPError(400, "after_id must be a number")
+            rows = await self.read("get_reservations_page", limit, after)
+        return {"reservations": [reservation_to_dict(row) for row in rows]}
+    
+    async def get_stats(self, kind, query):
+        """Read one of the booking summaries"""
+        def param(name):
+            return query.get(name, [""])[0].strip() or None
+        
+        if kind == "flights":
+            rows = await self.read("get_flight_load", param("flight_number"), param("date"))
+            return {"flights": [
+                {"flight_number": flight_number, "date": date, "bookings": bookings, "seats": seats}
+                for flight_number, date, bookings, seats in rows
+            ]}
+        if kind == "routes":
+            rows = await self.read("get_route_stats")
+            return {"routes": [
+                {"departure": departure, "destination": destination, "bookings": bookings}
+                for departure, destination, bookings in rows
+            ]}
+        if kind == "days":
+            rows = await self.read("get_daily_stats", param("start"), param("end"))
+            return {"days": [{"date": date, "bookings": bookings} for date, bookings in rows]}
+        raise HTTPError(404, "Unknown statistics; use flights, routes or days")
+    
+    def get_metrics(self, query):
+        """Metrics of the instrumented Database, as Prometheus text or JSON"""
+        instrumentation = self.db.instrumentation
+        if instrumentation is None:
+            raise HTTPError(404, "Metrics are off; start the server with --metrics")
+        if query.get("format", [""])[0] == "json":
+            return instrumentation.snapshot()
+        return instrumentation.to_prometheus()
+    
+    async def get_reservation(self, reservation_id):
+        """Fetch one reservation or raise 404"""
+        reservation = await self.read("get_reservation_by_id", reservation_id)
+        if not reservation:
+            raise HTTPError(404, "Reservation not found!")
+        return reservation_to_dict(reservation)
+    
+    async def create_reservation(self, body):
+        """Validate and book a new reservation"""
+        values = parse_reservation(parse_body(body))
+        name, flight_number, departure, destination, date, seat_number = values
+        if not await self.read("is_seat_available", flight_number, date, seat_number):
+            raise HTTPError(409, f"Seat {seat_number} on flight {flight_number} for {date} is already booked!")
+        reservation_id = await self.write("add_reservation", *values)
+        if not reservation_id:
+            # Most likely lost a race for the seat to a concurrent booking
+            raise HTTPError(409, "Failed to book flight. Please try again.")
+        return await self.get_reservation(reservation_id)
+    
+    async def update_reservation(self, reservation_id, body):
+        """Validate and apply changes to an existing reservation.
+        
+        Without a "version" in the body the update overwrites whatever is
+        stored; with one it only applies if nobody has changed it since.
+        """
+        data = parse_body(body)
+        values = parse_reservation(data)
+        expected_version = data.get("version")
+        if expected_version is not None and type(expected_version) is not int:
+            raise HTTPError(400, "version must be a number")
+        await self.get_reservation(reservation_id)
+        name, flight_number, departure, destination, date, seat_number = values
+        if not await self.read("is_seat_available", flight_number, date, seat_number, reservation_id):
+            raise HTTPError(409, f"Seat {seat_number} on flight {flight_number} for {date} is already booked!")
+        result = await self.write("update_reservation", reservation_id, expected_version, *values)
+        if isinstance(result, VersionConflict):
+            if result.current is None:
+                raise HTTPError(404, "Reservation not found!")
+            raise HTTPError(409, f"Reservation was changed by someone else (now version {result.current.version})")
+        if not result:
+            raise HTTPError(409, "Failed to update reservation. Please try again.")
+        return await self.get_reservation(reservation_id)
+    
+    async def delete_reservation(self, reservation_id):
+        """Delete a reservation or raise 404"""
+        await self.get_reservation(reservation_id)
+        if not await self.write("delete_reservation", reservation_id):
+            raise HTTPError(500, "Failed to delete reservation!")
+        return {"deleted": reservation_id}
+
+async def read_request(reader):
+    """Read one HTTP request, returning (method, target, headers, body) or None at EOF"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+    
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+def write_response(writer, status, payload, keep_alive):
+    """Write a JSON response, or a plain text one for str payloads"""
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+def make_connection_handler(service):
+    """Build the asyncio stream handler serving requests on one connection"""
+    
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    write_response(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                url = urlsplit(target)
+                try:
+                    status, payload = await service.handle(method, url.path, parse_qs(url.query), body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception as e:
+                    print(f"Error handling {method} {url.path}: {e}")
+                    status, payload = 500, {"error": "Internal server error"}
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    return handle_connection
+
+async def serve(host, port, db, readers):
+    """Run the API server until cancelled"""
+    service = ReservationService(db, readers)
+    await service.start()
+    server = await asyncio.start_server(make_connection_handler(service), host, port, backlog=1024)
+    print(f"🌐 Reservation API listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+def main():
+    """Parse command line arguments and run the server"""
+    parser = argparse.ArgumentParser(description="HTTP/JSON API for flight reservations")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--db", default="flights.db", help="database file (default: flights.db)")
+    parser.add_argument("--readers", type=int, default=4, help="pooled reader connections")
+    parser.add_argument("--group-commit-ms", type=float, default=0,
+                        help="coalesce writes arriving within this many ms into one commit (0 disables)")
+    parser.add_argument("--group-commit-batch", type=int, default=100, help="maximum writes per group commit")
+    parser.add_argument("--metrics", action="store_true", help="time every database call and serve /metrics")
+    parser.add_argument("--slow-query-ms", type=float,
+                        help="with --metrics, print calls slower than this with their query plans")
+    args = parser.parse_args()
+    
+    instrumentation = None
+    if args.metrics:
+        instrumentation = Instrumentation()
+        instrumentation.enable(slow_query_ms=args.slow_query_ms)
+    db = Database(args.db, readers=args.readers, instrumentation=instrumentation)
+    if args.group_commit_ms > 0:
+        db.enable_group_commit(max_batch=args.group_commit_batch, max_delay_ms=args.group_commit_ms)
+    try:
+        asyncio.run(serve(args.host, args.port, db, args.readers))
+    except KeyboardInterrupt:
+        print("Server stopped")
+    finally:
+        db.close_connection()
+
+if __name__ == "__main__":
+    main()
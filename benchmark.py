@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for Flight Reservation System
+Times the Database layer against synthetic datasets in a temporary database
+and stores the results as JSON so runs can be compared
+
+Usage:
+    python benchmark.py
+    python benchmark.py --sizes 10000 100000 1000000 --output results.json
+    python benchmark.py --sizes 100000 --compare results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import Database
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+FIRST_NAMES = ["Alice", "Bob", "Carol", "David", "Emma", "Frank", "Grace", "Henry", "Mona", "Omar", "Yara", "Karim"]
+LAST_NAMES = ["Johnson", "Smith", "Davis", "Wilson", "Brown", "Miller", "Taylor", "Anderson", "Hassan", "Nasser"]
+CITIES = ["New York", "Los Angeles", "Atlanta", "Seattle", "Chicago", "Miami", "London", "Paris",
+          "Frankfurt", "Berlin", "Rome", "Amsterdam", "Barcelona", "Cairo", "Dubai", "Tokyo"]
+AIRLINES = ["AA", "DL", "UA", "BA", "LH", "AF", "KL", "MS", "EK"]
+SEAT_LETTERS = "ABCDEF"
+FLIGHTS = 200
+DAYS = 365
+
+def generate_reservations(count, seed=42):
+    """Yield `count` synthetic reservations with no double-booked seats.
+    
+    Rows cycle through flights first, then dates, so the seat number only
+    advances once every flight and date has a passenger in that seat.
+    """
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    flights = []
+    for i in range(FLIGHTS):
+        departure, destination = rng.sample(CITIES, 2)
+        flights.append((f"{AIRLINES[i % len(AIRLINES)]}{100 + i}", departure, destination))
+    for i in range(count):
+        flight_number, departure, destination = flights[i % FLIGHTS]
+        travel_date = start + timedelta(days=(i // FLIGHTS) % DAYS)
+        seat = i // (FLIGHTS * DAYS)
+        yield (
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            flight_number,
+            departure,
+            destination,
+            travel_date.isoformat(),
+            f"{seat // len(SEAT_LETTERS) + 1}{SEAT_LETTERS[seat % len(SEAT_LETTERS)]}",
+        )
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of already sorted samples"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+def summarize(samples, rows=None):
+    """Summarize per-call latencies (seconds) as milliseconds and throughput"""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    summary = {
+        "count": len(ordered),
+        "total_s": round(total, 6),
+        "mean_ms": round(total / len(ordered) * 1000, 4) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4) if ordered else 0.0,
+        "ops_per_sec": round(len(ordered) / total, 2) if total > 0 else 0.0,
+    }
+    if rows is not None:
+        summary["rows_per_sec"] = round(rows / total, 2) if total > 0 else 0.0
+    return summary
+
+def time_calls(fn, calls):
+    """Time fn(*args) for each args tuple, returning the latencies in seconds"""
+    samples = []
+    for args in calls:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def run_benchmark(size, ops=1000, seed=42, profile=None, cache_size=1024):
+    """Load `size` rows into a scratch database and time each Database operation"""
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "benchmark.db"), profile=profile, cache_size=cache_size)
+        try:
+            print(f"\n📦 Loading {size:,} reservations...")
+            start = time.perf_counter()
+            loaded = db.bulk_add_reservations(generate_reservations(size, seed), chunk_size=10_000)
+            results["bulk_insert"] = summarize([time.perf_counter() - start], rows=loaded["inserted"])
+            
+            # Seats past the generated ones are free on every flight and date
+            extra_seat = size // (FLIGHTS * DAYS) + 1
+            new_rows = [
+                row[:5] + (f"{extra_seat // len(SEAT_LETTERS) + 1}{SEAT_LETTERS[extra_seat % len(SEAT_LETTERS)]}",)
+                for row in generate_reservations(min(ops, FLIGHTS * DAYS), seed + 1)
+            ]
+            results["insert"] = summarize(time_calls(db.add_reservation, new_rows))
+            
+            repeats = max(1, min(20, 2_000_000 // max(size, 1)))
+            get_all = time_calls(db.get_all_reservations, [()] * repeats)
+            results["get_all"] = summarize(get_all, rows=(size + len(new_rows)) * repeats)
+            
+            results["get_page"] = summarize(time_calls(db.get_reservations_page, [(100,)] * ops))
+            
+            terms = [rng.choice(FIRST_NAMES)[:3] for _ in range(ops // 4)] + \
+                    [rng.choice(CITIES).split()[0] for _ in range(ops // 4)] + \
+                    [rng.choice(AIRLINES) + str(rng.randint(100, 100 + FLIGHTS - 1)) for _ in range(ops // 4)]
+            results["search"] = summarize(time_calls(db.search_reservations, [(term,) for term in terms]))
+            
+            ids = [(rng.randint(1, size),) for _ in range(ops)]
+            results["get_by_id"] = summarize(time_calls(db.get_reservation_by_id, ids))
+            
+            # Distinct ids, so no timed update hits the version conflict path
+            updates = []
+            for reservation_id in rng.sample(range(1, size + 1), min(ops // 2, size)):
+                row = db.get_reservation_by_id(reservation_id)
+                updates.append((reservation_id, row.version, row.name + " Jr", *row.fields()[1:]))
+            results["update"] = summarize(time_calls(db.update_reservation, updates))
+            
+            deletes = rng.sample(range(1, size + 1), min(ops // 2, size))
+            results["delete"] = summarize(time_calls(db.delete_reservation, [(i,) for i in deletes]))
+            
+            results["cache"] = db.get_cache_stats()
+        finally:
+            db.close_connection()
+    return results
+
+def print_results(size, results):
+    """Print a table of latency percentiles for one dataset size"""
+    print(f"\n📊 {size:,} rows")
+    print(f"   {'operation':<12}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>12}{'rows/s':>12}")
+    for name, summary in results.items():
+        if "p50_ms" not in summary:
+            continue
+        rows_per_sec = f"{summary['rows_per_sec']:,.0f}" if "rows_per_sec" in summary else ""
+        print(f"   {name:<12}{summary['count']:>8}{summary['p50_ms']:>10.3f}{summary['p95_ms']:>10.3f}"
+              f"{summary['p99_ms']:>10.3f}{summary['ops_per_sec']:>12,.0f}{rows_per_sec:>12}")
+
+def compare_results(baseline, current):
+    """Print the p50 change of each operation against a baseline run"""
+    print(f"\n🔍 Comparison with baseline from {baseline['metadata']['timestamp']}")
+    for size, results in current["results"].items():
+        base = baseline["results"].get(size)
+        if not base:
+            continue
+        print(f"   {int(size):,} rows")
+        for name, summary in results.items():
+            if "p50_ms" not in summary or name not in base or not base[name]["p50_ms"]:
+                continue
+            change = (summary["p50_ms"] - base[name]["p50_ms"]) / base[name]["p50_ms"] * 100
+            marker = "🔺" if change > 10 else "🔻" if change < -10 else "  "
+            print(f"   {marker} {name:<12}{base[name]['p50_ms']:>10.3f} -> {summary['p50_ms']:.3f} ms ({change:+.1f}%)")
+
+def main():
+    """Run the benchmark for each requested dataset size"""
+    parser = argparse.ArgumentParser(description="Benchmark the Flight Reservation System database layer")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="dataset sizes in rows")
+    parser.add_argument("--ops", type=int, default=1000, help="operations timed per single-row benchmark")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for data and access patterns")
+    parser.add_argument("--profile", default=None, help="storage profile name (see connection_pool.py)")
+    parser.add_argument("--cache-size", type=int, default=1024, help="reservation cache size (0 disables)")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+    
+    print("⏱️  Flight Reservation System - Database Benchmark")
+    print("=" * 50)
+    
+    report = {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "ops": args.ops,
+            "profile": args.profile or "default",
+            "cache_size": args.cache_size,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        results = run_benchmark(size, args.ops, args.seed, args.profile, args.cache_size)
+        report["results"][str(size)] = results
+        print_results(size, results)
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare_results(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
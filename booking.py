@@ -2,13 +2,14 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from datetime import datetime
-from database import db
+from instrumentation import timed
+from validation import validate_reservation
 
 class BookingPage:
-    def __init__(self, parent, show_home_page):
+    def __init__(self, parent, show_home_page, worker):
         self.parent = parent
         self.show_home_page = show_home_page
+        self.worker = worker
         self.frame = None
         self.create_widgets()
     
@@ -65,14 +66,14 @@ class BookingPage:
         buttons_frame.pack(pady=20)
         
         # Submit Button
-        submit_button = ttk.Button(
+        self.submit_button = ttk.Button(
             buttons_frame,
             text="✈️ Book Flight",
             command=self.book_flight,
             style="success.TButton",
             width=20
         )
-        submit_button.pack(side="left", padx=(0, 10))
+        self.submit_button.pack(side="left", padx=(0, 10))
         
         # Back Button
         back_button = ttk.Button(
@@ -94,6 +95,7 @@ class BookingPage:
         )
         clear_button.pack(side="left", padx=(10, 0))
     
+    @timed("ui.book_flight")
     def book_flight(self):
         """Book a flight with the entered details"""
         # Get values from entries
@@ -105,20 +107,38 @@ class BookingPage:
         seat_number = self.seat_number_entry.get().strip()
         
         # Validate inputs
-        if not all([name, flight_number, departure, destination, date, seat_number]):
-            messagebox.showerror("Error", "Please fill in all fields!")
+        error = validate_reservation(name, flight_number, departure, destination, date, seat_number)
+        if error:
+            messagebox.showerror("Error", error)
             return
         
-        # Validate date format
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            messagebox.showerror("Error", "Please enter a valid date in YYYY-MM-DD format!")
+        # Check the seat, then add the reservation, on the background worker
+        values = (name, flight_number, departure, destination, date, seat_number)
+        self.submit_button.config(state="disabled")
+        self.worker.submit(
+            "is_seat_available", flight_number, date, seat_number,
+            callback=lambda available: self.on_seat_checked(available, values)
+        )
+    
+    def on_seat_checked(self, available, values):
+        """Book the seat if it is free, otherwise report the conflict"""
+        name, flight_number, departure, destination, date, seat_number = values
+        if not available:
+            self.submit_button.config(state="normal")
+            messagebox.showerror("Error", f"Seat {seat_number} on flight {flight_number} for {date} is already booked!")
             return
         
-        # Add reservation to database
-        if db.add_reservation(name, flight_number, departure, destination, date, seat_number):
-            messagebox.showinfo("Success", f"Flight booked successfully!\n\nPassenger: {name}\nFlight: {flight_number}\nFrom: {departure}\nTo: {destination}\nDate: {date}\nSeat: {seat_number}")
+        details = f"Passenger: {name}\nFlight: {flight_number}\nFrom: {departure}\nTo: {destination}\nDate: {date}\nSeat: {seat_number}"
+        self.worker.submit(
+            "add_reservation", *values,
+            callback=lambda success: self.on_booked(success, details)
+        )
+    
+    def on_booked(self, success, details):
+        """Report the result of a booking"""
+        self.submit_button.config(state="normal")
+        if success:
+            messagebox.showinfo("Success", f"Flight booked successfully!\n\n{details}")
             self.clear_form()
         else:
             messagebox.showerror("Error", "Failed to book flight. Please try again.")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Bulk import/export script for Flight Reservation System
+Streams reservations between the database and CSV or JSON Lines files
+
+Usage:
+    python bulk_io.py import bookings.csv
+    python bulk_io.py import bookings.jsonl --chunk-size 5000
+    python bulk_io.py export backup.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import Database, RESERVATION_COLUMNS
+
+EXPORT_FIELDS = RESERVATION_COLUMNS
+EXPORT_PAGE_SIZE = 1000
+
+def detect_format(path, file_format=None):
+    """Work out the file format from the --format option or the file extension"""
+    if file_format:
+        return file_format
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".csv":
+        return "csv"
+    raise ValueError(f"Cannot detect format of {path}; use --format csv or --format jsonl")
+
+def read_csv(f):
+    """Yield reservation dicts from a CSV file with a header row"""
+    yield from csv.DictReader(f)
+
+def read_jsonl(f):
+    """Yield reservation dicts from a JSON Lines file, skipping blank lines"""
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            # Keep row numbering intact; bulk_add_reservations reports the row with this error
+            yield ValueError(f"Invalid JSON: {e}")
+
+def import_reservations(db, path, file_format=None, chunk_size=1000):
+    """Import reservations from a CSV or JSON Lines file"""
+    file_format = detect_format(path, file_format)
+    reader = read_csv if file_format == "csv" else read_jsonl
+    
+    print(f"📥 Importing {file_format.upper()} reservations from {path}")
+    with open(path, newline="", encoding="utf-8") as f:
+        result = db.bulk_add_reservations(reader(f), chunk_size=chunk_size)
+    
+    for row_number, error in result["failed"]:
+        print(f"❌ Row {row_number}: {error}")
+    print(f"✅ Imported {result['inserted']} reservations, {len(result['failed'])} failed")
+    print(f"⏱️  {result['elapsed']:.2f}s ({result['rows_per_second']:,.0f} rows/s)")
+    return result
+
+def export_reservations(db, path, file_format=None):
+    """Export all reservations to a CSV or JSON Lines file"""
+    file_format = detect_format(path, file_format)
+    
+    print(f"📤 Exporting reservations to {path} as {file_format.upper()}")
+    start = time.perf_counter()
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_FIELDS)
+            for reservation in db.iter_reservations(EXPORT_PAGE_SIZE):
+                writer.writerow(reservation.as_tuple())
+                count += 1
+        else:
+            for reservation in db.iter_reservations(EXPORT_PAGE_SIZE):
+                f.write(json.dumps(reservation.as_dict()) + "\n")
+                count += 1
+    
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"✅ Exported {count} reservations")
+    print(f"⏱️  {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    return count
+
+def main():
+    """Parse command line arguments and run the import or export"""
+    parser = argparse.ArgumentParser(description="Bulk import/export of flight reservations")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="CSV or JSON Lines file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="file format (default: from extension)")
+    parser.add_argument("--db", default="flights.db", help="database file (default: flights.db)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per transaction on import")
+    args = parser.parse_args()
+    
+    db = Database(args.db)
+    try:
+        if args.command == "import":
+            result = import_reservations(db, args.path, args.format, args.chunk_size)
+            return 1 if result["failed"] else 0
+        export_reservations(db, args.path, args.format)
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        db.close_connection()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Storage profiles: PRAGMA settings applied to every pooled connection.
+# "default" favours throughput (WAL with NORMAL sync is still crash-safe,
+# but the last commits may roll back on power loss), "durable" syncs every
+# commit, and "compat" matches SQLite's built-in defaults. busy_timeout is
+# how long a connection waits for a lock held by another process before
+# the pool's own retries take over.
+STORAGE_PROFILES = {
+    "default": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,      # KiB when negative, i.e. ~16 MB
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 2000,      # ms
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 2000,
+    },
+    "compat": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 2000,
+    },
+}
+
+# Retries of a write transaction that is still locked out after busy_timeout,
+# sleeping WRITE_BACKOFF_MS * 2**attempt (capped, with jitter) in between
+WRITE_RETRIES = 5
+WRITE_BACKOFF_MS = 25
+WRITE_BACKOFF_MAX_MS = 1000
+
+def resolve_profile(profile=None):
+    """Return the PRAGMA settings for a profile name or an override dict"""
+    if profile is None:
+        return dict(STORAGE_PROFILES["default"])
+    if isinstance(profile, str):
+        if profile not in STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile: {profile}")
+        return dict(STORAGE_PROFILES[profile])
+    # Partial dicts override the default profile
+    settings = dict(STORAGE_PROFILES["default"])
+    settings.update(profile)
+    return settings
+
+def apply_profile(conn, settings):
+    """Apply storage PRAGMAs to a connection"""
+    # busy_timeout goes first so the others wait out a lock instead of failing
+    for pragma in ("busy_timeout", "journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store"):
+        if pragma in settings:
+            conn.execute(f"PRAGMA {pragma} = {settings[pragma]}")
+
+def is_busy(error):
+    """Check whether an SQLite error means another connection holds the lock"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+def is_interrupted(error):
+    """Check whether an SQLite error means the query was aborted by interrupt()"""
+    return isinstance(error, sqlite3.OperationalError) and str(error).lower() == "interrupted"
+
+class ConnectionPool:
+    """One writer connection and up to N reader connections to a database.
+    
+    The writer is guarded by a lock so only one thread writes at a time;
+    readers are handed out from a queue and created on first use. With WAL
+    journaling readers do not block the writer or each other. Connections
+    are opened with check_same_thread=False, which is safe here because a
+    connection is only ever used by the thread currently holding it.
+    
+    Other processes may write to the same file. Write transactions start
+    with BEGIN IMMEDIATE, so the database lock is taken up front (where
+    busy_timeout applies) instead of on the first write after a read,
+    where SQLite fails at once. Lock-outs that outlast busy_timeout are
+    retried with exponential backoff.
+    """
+    
+    def __init__(self, db_name, readers=2, profile=None):
+        self.db_name = db_name
+        self.settings = resolve_profile(profile)
+        # Every connection to ":memory:" is its own database, so share one
+        self.max_readers = 0 if db_name == ":memory:" else readers
+        self.write_lock = threading.RLock()
+        self.busy_retries = 0
+        self.trace_callback = None
+        self.writer_conn = self.connect()
+        self.idle_readers = queue.LifoQueue()
+        self.all_readers = []
+        self.readers_lock = threading.Lock()
+        self.closed = False
+    
+    def connect(self):
+        """Open a new connection with the pool's storage profile applied"""
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        apply_profile(conn, self.settings)
+        if self.trace_callback is not None:
+            conn.set_trace_callback(self.trace_callback)
+        return conn
+    
+    def set_trace_callback(self, callback):
+        """Install an SQL trace callback on current and future connections (None removes it)"""
+        self.trace_callback = callback
+        self.writer_conn.set_trace_callback(callback)
+        with self.readers_lock:
+            for conn in self.all_readers:
+                conn.set_trace_callback(callback)
+    
+    @contextmanager
+    def writer(self, transaction=True):
+        """Yield the writer connection inside a transaction.
+        
+        Commits when the block exits normally and rolls back on error.
+        The lock is re-entrant, so a thread already holding the writer
+        may nest calls; only the outermost block commits. With
+        transaction=False the connection is only locked, for callers that
+        manage their own transactions (or ATTACH, which needs none open).
+        """
+        with self.write_lock:
+            outermost = transaction and not self.writer_conn.in_transaction
+            if outermost:
+                self.retry_busy(self.writer_conn.execute, "BEGIN IMMEDIATE")
+            try:
+                yield self.writer_conn
+                if outermost:
+                    self.retry_busy(self.writer_conn.commit)
+            except BaseException:
+                if outermost:
+                    self.writer_conn.rollback()
+                raise
+    
+    def retry_busy(self, operation, *args):
+        """Run operation(*args), retrying with backoff while the database is locked"""
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                return operation(*args)
+            except sqlite3.OperationalError as e:
+                if not is_busy(e) or attempt == WRITE_RETRIES:
+                    raise
+                self.busy_retries += 1
+                delay_ms = min(WRITE_BACKOFF_MS * 2 ** attempt, WRITE_BACKOFF_MAX_MS)
+                time.sleep(delay_ms * random.uniform(0.5, 1.0) / 1000)
+    
+    def data_version(self):
+        """PRAGMA data_version of the writer, or None while another thread is writing.
+        
+        The value changes whenever another connection, e.g. in another
+        process, commits to the database.
+        """
+        if not self.write_lock.acquire(blocking=False):
+            return None
+        try:
+            return self.writer_conn.execute("PRAGMA data_version").fetchone()[0]
+        finally:
+            self.write_lock.release()
+    
+    @contextmanager
+    def reader(self):
+        """Yield a reader connection, returning it to the pool afterwards"""
+        if self.max_readers == 0:
+            with self.write_lock:
+                yield self.writer_conn
+            return
+        
+        conn = self.acquire_reader()
+        try:
+            yield conn
+        finally:
+            self.idle_readers.put(conn)
+    
+    def acquire_reader(self):
+        """Take an idle reader, opening a new one while under the limit"""
+        try:
+            return self.idle_readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self.readers_lock:
+            if len(self.all_readers) < self.max_readers:
+                conn = self.connect()
+                self.all_readers.append(conn)
+                return conn
+        return self.idle_readers.get()
+    
+    def interrupt(self):
+        """Abort any query currently running on a pooled connection"""
+        self.writer_conn.interrupt()
+        with self.readers_lock:
+            for conn in self.all_readers:
+                conn.interrupt()
+    
+    def close(self):
+        """Close every connection in the pool"""
+        if self.closed:
+            return
+        self.closed = True
+        with self.readers_lock:
+            for conn in self.all_readers:
+                conn.close()
+            self.all_readers.clear()
+        with self.write_lock:
+            self.writer_conn.close()
@@ -1,28 +1,93 @@
 import sqlite3
 import os
+import re
+import threading
+import time
 from datetime import datetime
+from itertools import islice
+from concurrent.futures import Future
+from connection_pool import ConnectionPool, is_interrupted
+from group_commit import GroupCommitter
+from lru_cache import LRUCache
+from migrations import apply_migrations
+from models import Reservation, ReservationChange, VersionConflict
+from partitions import ARCHIVE_SCHEMA, archive_file_name, attached, month_bounds, month_key, months_between
+from seat_inventory import DEFAULT_LAYOUT, SeatInventory, normalize_seat
+from validation import RESERVATION_FIELDS, validate_reservation
+
+# Column order of the reservations table and of Reservation.as_tuple()
+RESERVATION_COLUMNS = Reservation.__slots__
+
+# AFTER INSERT triggers that bulk_load_reservations suspends, each with the
+# set-based statement that catches up on the rows loaded (ids above ?)
+BULK_LOAD_TRIGGERS = {
+    "reservations_fts_ai": '''
+        INSERT INTO reservations_fts (rowid, name, flight_number, departure, destination)
+        SELECT id, name, flight_number, departure, destination FROM reservations WHERE id > ?
+    ''',
+    "reservation_changes_ai": '''
+        INSERT INTO reservation_changes (reservation_id, operation)
+        SELECT id, 'insert' FROM reservations WHERE id > ? ORDER BY id
+    ''',
+    "reservation_stats_ai": [
+        '''
+        INSERT INTO flight_date_stats
+        SELECT flight_number, date, COUNT(*) FROM reservations WHERE id > ? GROUP BY flight_number, date
+        ON CONFLICT (flight_number, date) DO UPDATE SET bookings = bookings + excluded.bookings
+        ''',
+        '''
+        INSERT INTO route_stats
+        SELECT departure, destination, COUNT(*) FROM reservations WHERE id > ? GROUP BY departure, destination
+        ON CONFLICT (departure, destination) DO UPDATE SET bookings = bookings + excluded.bookings
+        ''',
+        '''
+        INSERT INTO daily_stats
+        SELECT date, COUNT(*) FROM reservations WHERE id > ? GROUP BY date
+        ON CONFLICT (date) DO UPDATE SET bookings = bookings + excluded.bookings
+        ''',
+    ],
+}
 
 class Database:
-    def __init__(self, db_name="flights.db"):
+    def __init__(self, db_name="flights.db", profile=None, readers=2, cache_size=1024, cache_ttl=60,
+                 cache_sync_ms=100, archive_dir=None, instrumentation=None):
+        # profile: a name from connection_pool.STORAGE_PROFILES or a dict of PRAGMA overrides
+        # cache_size/cache_ttl: bounds of the get_reservation_by_id cache (0 disables it)
+        # cache_sync_ms: how long cached seats and reservations may lag behind writes made
+        #   by other processes (0 checks on every cached read)
+        # archive_dir: where monthly archive databases live (default: next to db_name)
+        # instrumentation: an instrumentation.Instrumentation timing every public method
         self.db_name = db_name
-        self.conn = None
-        self.cursor = None
+        self.archive_dir = archive_dir or os.path.dirname(os.path.abspath(db_name))
+        self.profile = profile
+        self.readers = readers
+        self.pool = None
+        self.fts_enabled = False
+        self.seats = SeatInventory(self._load_seat_map)
+        self.reservation_cache = LRUCache(cache_size, cache_ttl)
+        self.data_version = None
+        self.data_version_checked = 0.0
+        self.cache_sync_interval = cache_sync_ms / 1000
+        self.group_commit = None
+        self.instrumentation = instrumentation
         self.create_connection()
         self.create_tables()
+        if instrumentation is not None:
+            instrumentation.wrap_database(self)
     
     def create_connection(self):
-        """Create a database connection"""
+        """Create the database connection pool"""
         try:
-            self.conn = sqlite3.connect(self.db_name)
-            self.cursor = self.conn.cursor()
+            self.pool = ConnectionPool(self.db_name, readers=self.readers, profile=self.profile)
             print("Database connection established successfully")
         except sqlite3.Error as e:
-            print(f"Error connecting to database: {e}")
+            self.report_error("connecting to database", e)
     
     def create_tables(self):
         """Create the reservations table if it doesn't exist"""
         try:
-            self.cursor.execute('''
+            with self.pool.writer() as conn:
+                conn.execute('''
                 CREATE TABLE IF NOT EXISTS reservations (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name TEXT NOT NULL,
@@ -33,72 +98,829 @@ class Database:
                     seat_number TEXT NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
-            ''')
-            self.conn.commit()
+                ''')
             print("Tables created successfully")
         except sqlite3.Error as e:
-            print(f"Error creating tables: {e}")
+            self.report_error("creating tables", e)
+        self.create_search_index()
+        self.migrate()
+    
+    def migrate(self):
+        """Bring the schema up to date with migrations.MIGRATIONS"""
+        try:
+            # Migrations run their own transactions
+            with self.pool.writer(transaction=False) as conn:
+                apply_migrations(conn)
+        except sqlite3.Error as e:
+            self.report_error("migrating database", e)
+    
+    def create_search_index(self):
+        """Create the FTS5 search index over reservations and its sync triggers"""
+        try:
+            with self.pool.writer() as conn:
+                self._create_search_index(conn)
+            self.fts_enabled = True
+        except sqlite3.Error as e:
+            self.report_error("creating search index", e)
+            self.fts_enabled = False
+    
+    def _create_search_index(self, conn):
+        """Create the FTS5 table and triggers on the writer connection"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reservations_fts'"
+        ).fetchone() is not None
+        conn.executescript('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS reservations_fts USING fts5(
+                name, flight_number, departure, destination,
+                content='reservations', content_rowid='id', prefix='2 3'
+            );
+            CREATE TRIGGER IF NOT EXISTS reservations_fts_ai AFTER INSERT ON reservations BEGIN
+                INSERT INTO reservations_fts(rowid, name, flight_number, departure, destination)
+                VALUES (new.id, new.name, new.flight_number, new.departure, new.destination);
+            END;
+            CREATE TRIGGER IF NOT EXISTS reservations_fts_ad AFTER DELETE ON reservations BEGIN
+                INSERT INTO reservations_fts(reservations_fts, rowid, name, flight_number, departure, destination)
+                VALUES ('delete', old.id, old.name, old.flight_number, old.departure, old.destination);
+            END;
+            CREATE TRIGGER IF NOT EXISTS reservations_fts_au AFTER UPDATE ON reservations BEGIN
+                INSERT INTO reservations_fts(reservations_fts, rowid, name, flight_number, departure, destination)
+                VALUES ('delete', old.id, old.name, old.flight_number, old.departure, old.destination);
+                INSERT INTO reservations_fts(rowid, name, flight_number, departure, destination)
+                VALUES (new.id, new.name, new.flight_number, new.departure, new.destination);
+            END;
+        ''')
+        if not exists:
+            # Index rows that were stored before the search index existed
+            conn.execute("INSERT INTO reservations_fts(reservations_fts) VALUES ('rebuild')")
     
     def add_reservation(self, name, flight_number, departure, destination, date, seat_number):
-        """Add a new reservation to the database"""
+        """Add a new reservation to the database, returning its id (False on error)"""
+        seat_number = normalize_seat(seat_number)
         try:
-            self.cursor.execute('''
-                INSERT INTO reservations (name, flight_number, departure, destination, date, seat_number)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (name, flight_number, departure, destination, date, seat_number))
-            self.conn.commit()
-            return True
+            with self.pool.writer() as conn:
+                cursor = conn.execute('''
+                    INSERT INTO reservations (name, flight_number, departure, destination, date, seat_number)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (name, flight_number, departure, destination, date, seat_number))
+            self.seats.occupy(flight_number, date, seat_number)
+            return cursor.lastrowid
         except sqlite3.Error as e:
-            print(f"Error adding reservation: {e}")
+            self.report_error("adding reservation", e)
             return False
     
+    def bulk_add_reservations(self, reservations, chunk_size=1000):
+        """Add many reservations, committing once per chunk.
+        
+        `reservations` is any iterable of dicts keyed by field name or of
+        (name, flight_number, departure, destination, date, seat_number)
+        sequences; it is consumed lazily. Invalid rows are reported and
+        skipped without aborting the rest of the batch. A reader that cannot
+        parse a row yields an exception in its place, which is reported as
+        that row's error.
+        
+        Returns a summary dict with the inserted count, a list of
+        (row_number, error) failures, elapsed seconds and rows per second.
+        """
+        inserted = 0
+        failures = []
+        start = time.perf_counter()
+        rows = enumerate(reservations, 1)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            
+            # Validate before touching the database
+            valid = []
+            for row_number, reservation in chunk:
+                if isinstance(reservation, dict):
+                    values = [reservation.get(field) for field in RESERVATION_FIELDS]
+                elif isinstance(reservation, (list, tuple)):
+                    values = list(reservation)
+                elif isinstance(reservation, Exception):
+                    failures.append((row_number, str(reservation)))
+                    continue
+                else:
+                    # e.g. a JSON Lines row holding null, a number or a string
+                    failures.append((row_number, "Expected a reservation object or a list of fields"))
+                    continue
+                if len(values) != len(RESERVATION_FIELDS):
+                    failures.append((row_number, f"Expected {len(RESERVATION_FIELDS)} fields, got {len(values)}"))
+                    continue
+                values = [str(value).strip() if value is not None else "" for value in values]
+                error = validate_reservation(*values)
+                if error:
+                    failures.append((row_number, error))
+                else:
+                    values[5] = normalize_seat(values[5])
+                    valid.append((row_number, values))
+            
+            inserted += self._insert_chunk(valid, failures)
+        
+        elapsed = time.perf_counter() - start
+        return {
+            "inserted": inserted,
+            "failed": failures,
+            "elapsed": elapsed,
+            "rows_per_second": inserted / elapsed if elapsed > 0 else 0.0,
+        }
+    
+    def _insert_chunk(self, rows, failures):
+        """Insert validated (row_number, values) pairs in a single transaction"""
+        if not rows:
+            return 0
+        # Cached seat maps for these flights are stale once the chunk lands
+        for _, values in rows:
+            self.seats.invalidate(values[1], values[4])
+        sql = '''
+            INSERT INTO reservations (name, flight_number, departure, destination, date, seat_number)
+            VALUES (?, ?, ?, ?, ?, ?)
+        '''
+        try:
+            with self.pool.writer() as conn:
+                conn.executemany(sql, [values for _, values in rows])
+            return len(rows)
+        except sqlite3.Error:
+            # Retry row by row so one bad row does not sink the whole chunk
+            inserted = 0
+            for row_number, values in rows:
+                try:
+                    with self.pool.writer() as conn:
+                        conn.execute(sql, values)
+                    inserted += 1
+                except sqlite3.Error as e:
+                    failures.append((row_number, str(e)))
+            return inserted
+    
+    def bulk_load_reservations(self, reservations, chunk_size=50_000):
+        """Load a large volume of trusted rows in one transaction.
+        
+        For generated or previously exported data: rows must be complete
+        (name, flight_number, departure, destination, date, seat_number)
+        sequences and are not validated. The per-row triggers in
+        BULK_LOAD_TRIGGERS are dropped for the load and their work (search
+        index, change log, statistics) is done once, set-based, at the end;
+        the triggers are recreated in the same transaction, so other
+        connections never see them missing. Rows the database rejects,
+        such as double-booked seats, are reported and skipped.
+        
+        Returns the same summary dict as bulk_add_reservations.
+        """
+        inserted = 0
+        failures = []
+        start = time.perf_counter()
+        sql = '''
+            INSERT INTO reservations (name, flight_number, departure, destination, date, seat_number)
+            VALUES (?, ?, ?, ?, ?, ?)
+        '''
+        try:
+            with self.pool.writer() as conn:
+                last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM reservations').fetchone()[0]
+                triggers = conn.execute(
+                    "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN (%s)"
+                    % ", ".join("?" * len(BULK_LOAD_TRIGGERS)), tuple(BULK_LOAD_TRIGGERS)
+                ).fetchall()
+                for name, _ in triggers:
+                    conn.execute(f'DROP TRIGGER {name}')
+                
+                rows = enumerate(reservations, 1)
+                while True:
+                    chunk = list(islice(rows, chunk_size))
+                    if not chunk:
+                        break
+                    conn.execute('SAVEPOINT bulk_chunk')
+                    try:
+                        conn.executemany(sql, [values for _, values in chunk])
+                        inserted += len(chunk)
+                    except sqlite3.Error:
+                        # Redo the chunk row by row to skip just the rejected rows
+                        conn.execute('ROLLBACK TO bulk_chunk')
+                        for row_number, values in chunk:
+                            try:
+                                conn.execute(sql, values)
+                                inserted += 1
+                            except sqlite3.Error as e:
+                                failures.append((row_number, str(e)))
+                    conn.execute('RELEASE bulk_chunk')
+                
+                for name, trigger_sql in triggers:
+                    catch_up = BULK_LOAD_TRIGGERS[name]
+                    for statement in [catch_up] if isinstance(catch_up, str) else catch_up:
+                        conn.execute(statement, (last_id,))
+                    conn.execute(trigger_sql)
+        except sqlite3.Error as e:
+            self.report_error("bulk loading reservations", e)
+            inserted = 0
+        finally:
+            self.seats.invalidate()
+            self.reservation_cache.clear()
+        
+        elapsed = time.perf_counter() - start
+        return {
+            "inserted": inserted,
+            "failed": failures,
+            "elapsed": elapsed,
+            "rows_per_second": inserted / elapsed if elapsed > 0 else 0.0,
+        }
+    
+    def _query_reservations(self, conn, sql, params=()):
+        """Run a reservations query, returning a cursor that yields Reservation records"""
+        cursor = conn.execute(sql, params)
+        cursor.row_factory = Reservation.from_row
+        return cursor
+    
     def get_all_reservations(self):
         """Get all reservations from the database"""
         try:
-            self.cursor.execute('SELECT * FROM reservations ORDER BY created_at DESC')
-            return self.cursor.fetchall()
+            with self.pool.reader() as conn:
+                return self._query_reservations(
+                    conn, 'SELECT * FROM reservations ORDER BY created_at DESC, id DESC'
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.report_error("fetching reservations", e)
+            return []
+    
+    def iter_reservations(self, batch_size=1000):
+        """Yield every reservation, newest first, without loading them all.
+        
+        Rows are read one keyset page at a time, so memory stays constant
+        however many reservations there are, and no connection is held
+        while the caller processes a page.
+        """
+        after = None
+        while True:
+            page = self.get_reservations_page(batch_size, after)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after = (page[-1].created_at, page[-1].id)
+    
+    def get_reservations_page(self, limit=100, after=None):
+        """Get one page of reservations, newest first.
+        
+        Pages are keyset-paginated on (created_at, id): pass the
+        (created_at, id) of the last row of the previous page as `after`
+        to fetch the next page, so every page costs the same to read.
+        """
+        try:
+            with self.pool.reader() as conn:
+                if after is None:
+                    return self._query_reservations(conn, '''
+                        SELECT * FROM reservations
+                        ORDER BY created_at DESC, id DESC
+                        LIMIT ?
+                    ''', (limit,)).fetchall()
+                created_at, reservation_id = after
+                return self._query_reservations(conn, '''
+                    SELECT * FROM reservations
+                    WHERE (created_at, id) < (?, ?)
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                ''', (created_at, reservation_id, limit)).fetchall()
+        except sqlite3.Error as e:
+            self.report_error("fetching reservations page", e)
+            return []
+    
+    def search_reservations(self, search_term, limit=200):
+        """Search reservations by name, flight number, departure or destination.
+        
+        Every word in the search term is matched as a prefix against the
+        full-text index, newest reservations first, at most `limit` rows.
+        """
+        tokens = re.findall(r"\w+", search_term or "")
+        if not tokens:
+            return self.get_reservations_page(limit)
+        try:
+            with self.pool.reader() as conn:
+                if self.fts_enabled:
+                    query = " ".join(f'"{token}"*' for token in tokens)
+                    return self._query_reservations(conn, '''
+                        SELECT r.* FROM reservations_fts f
+                        JOIN reservations r ON r.id = f.rowid
+                        WHERE reservations_fts MATCH ?
+                        ORDER BY f.rowid DESC
+                        LIMIT ?
+                    ''', (query, limit)).fetchall()
+                
+                # Fallback for SQLite builds without FTS5
+                clauses = []
+                params = []
+                for token in tokens:
+                    clauses.append("(name LIKE ? OR flight_number LIKE ? OR departure LIKE ? OR destination LIKE ?)")
+                    params.extend([f"%{token}%"] * 4)
+                return self._query_reservations(
+                    conn,
+                    f"SELECT * FROM reservations WHERE {' AND '.join(clauses)} ORDER BY id DESC LIMIT ?",
+                    (*params, limit)
+                ).fetchall()
         except sqlite3.Error as e:
-            print(f"Error fetching reservations: {e}")
+            self.report_error("searching reservations", e)
             return []
     
+    def _sync_caches(self):
+        """Drop the seat and reservation caches if another process has written since the last check"""
+        # PRAGMA data_version takes the writer lock and costs more than a cache hit,
+        # so check at most every cache_sync_ms
+        now = time.monotonic()
+        if now - self.data_version_checked < self.cache_sync_interval:
+            return
+        self.data_version_checked = now
+        version = self.pool.data_version()
+        if version is not None and version != self.data_version:
+            if self.data_version is not None:
+                self.seats.invalidate()
+                self.reservation_cache.clear()
+            self.data_version = version
+    
     def get_reservation_by_id(self, reservation_id):
         """Get a specific reservation by ID"""
+        self._sync_caches()
+        try:
+            key = int(reservation_id)
+        except (TypeError, ValueError):
+            # No reservation has an id that is not a number
+            return None
+        hit, reservation = self.reservation_cache.get(key)
+        if hit:
+            return reservation
+        # A write that commits while the row is read invalidates after the
+        # read started, and the stale row must not be cached
+        generation = self.reservation_cache.generation
         try:
-            self.cursor.execute('SELECT * FROM reservations WHERE id = ?', (reservation_id,))
-            return self.cursor.fetchone()
+            with self.pool.reader() as conn:
+                reservation = self._query_reservations(
+                    conn, 'SELECT * FROM reservations WHERE id = ?', (key,)
+                ).fetchone()
+            if reservation:
+                self.reservation_cache.put(reservation.id, reservation, generation)
+            return reservation
         except sqlite3.Error as e:
-            print(f"Error fetching reservation: {e}")
+            self.report_error("fetching reservation", e)
             return None
     
-    def update_reservation(self, reservation_id, name, flight_number, departure, destination, date, seat_number):
-        """Update an existing reservation"""
+    def _forget_reservation(self, reservation_id):
+        """Drop a reservation from the id cache once a write to it has committed"""
         try:
-            self.cursor.execute('''
-                UPDATE reservations 
-                SET name = ?, flight_number = ?, departure = ?, destination = ?, date = ?, seat_number = ?
-                WHERE id = ?
-            ''', (name, flight_number, departure, destination, date, seat_number, reservation_id))
-            self.conn.commit()
-            return True
+            self.reservation_cache.invalidate(int(reservation_id))
+        except (TypeError, ValueError):
+            pass
+    
+    def update_reservation(self, reservation_id, expected_version, name, flight_number, departure, destination,
+                           date, seat_number):
+        """Update an existing reservation if it is still at expected_version.
+        
+        Returns the new version on success, a falsy VersionConflict holding
+        the current reservation if it was changed or deleted since that
+        version was read, or False on error. An expected_version of None
+        skips the check and overwrites whatever is stored.
+        """
+        seat_number = normalize_seat(seat_number)
+        try:
+            with self.pool.writer() as conn:
+                old = conn.execute(
+                    'SELECT flight_number, date, seat_number FROM reservations WHERE id = ?', (reservation_id,)
+                ).fetchone()
+                cursor = conn.execute('''
+                    UPDATE reservations
+                    SET name = ?, flight_number = ?, departure = ?, destination = ?, date = ?, seat_number = ?,
+                        version = version + 1
+                    WHERE id = ? AND (? IS NULL OR version = ?)
+                ''', (name, flight_number, departure, destination, date, seat_number,
+                      reservation_id, expected_version, expected_version))
+                if cursor.rowcount == 0:
+                    current = self._query_reservations(
+                        conn, 'SELECT * FROM reservations WHERE id = ?', (reservation_id,)
+                    ).fetchone()
+                    self._forget_reservation(reservation_id)
+                    return VersionConflict(current)
+                version = conn.execute('SELECT version FROM reservations WHERE id = ?', (reservation_id,)).fetchone()[0]
+            self._forget_reservation(reservation_id)
+            if old:
+                self.seats.release(*old)
+                self.seats.occupy(flight_number, date, seat_number)
+            return version
         except sqlite3.Error as e:
-            print(f"Error updating reservation: {e}")
+            self.report_error("updating reservation", e)
             return False
     
     def delete_reservation(self, reservation_id):
         """Delete a reservation by ID"""
         try:
-            self.cursor.execute('DELETE FROM reservations WHERE id = ?', (reservation_id,))
-            self.conn.commit()
+            with self.pool.writer() as conn:
+                old = conn.execute(
+                    'SELECT flight_number, date, seat_number FROM reservations WHERE id = ?', (reservation_id,)
+                ).fetchone()
+                conn.execute('DELETE FROM reservations WHERE id = ?', (reservation_id,))
+            self._forget_reservation(reservation_id)
+            if old:
+                self.seats.release(*old)
             return True
         except sqlite3.Error as e:
-            print(f"Error deleting reservation: {e}")
+            self.report_error("deleting reservation", e)
             return False
     
+    def define_flight(self, flight_number, seat_rows, seat_letters="ABCDEF"):
+        """Set the seat layout of a flight"""
+        try:
+            with self.pool.writer() as conn:
+                conn.execute('''
+                    INSERT INTO flights (flight_number, seat_rows, seat_letters) VALUES (?, ?, ?)
+                    ON CONFLICT(flight_number) DO UPDATE SET
+                        seat_rows = excluded.seat_rows, seat_letters = excluded.seat_letters
+                ''', (flight_number, seat_rows, seat_letters))
+            self.seats.invalidate(flight_number)
+            return True
+        except sqlite3.Error as e:
+            self.report_error("defining flight", e)
+            return False
+    
+    def get_seat_layout(self, flight_number):
+        """Get (seat_rows, seat_letters) for a flight, falling back to the default layout"""
+        try:
+            with self.pool.reader() as conn:
+                layout = conn.execute(
+                    'SELECT seat_rows, seat_letters FROM flights WHERE flight_number = ?', (flight_number,)
+                ).fetchone()
+            return tuple(layout) if layout else DEFAULT_LAYOUT
+        except sqlite3.Error as e:
+            self.report_error("fetching seat layout", e)
+            return DEFAULT_LAYOUT
+    
+    def _load_seat_map(self, flight_number, date):
+        """Load the layout and booked seats of a flight for the seat inventory"""
+        with self.pool.reader() as conn:
+            archived = conn.execute(
+                'SELECT 1 FROM archive_partitions WHERE month = ? AND ? < archived_before', (month_key(date), date)
+            ).fetchone()
+            seats = [row[0] for row in conn.execute(
+                'SELECT seat_number FROM reservations WHERE flight_number = ? AND date = ?',
+                (flight_number, date)
+            )]
+        layout = self.get_seat_layout(flight_number)
+        if archived:
+            # Archived travel dates take no bookings, so every seat reads as taken
+            seat_rows, seat_letters = layout
+            seats = [f"{row}{letter}" for row in range(1, seat_rows + 1) for letter in seat_letters]
+        return layout, seats
+    
+    def is_seat_available(self, flight_number, date, seat_number, reservation_id=None):
+        """Check whether a seat on a flight and date is free.
+        
+        Pass the reservation_id being edited to treat its own seat as free.
+        """
+        seat_number = normalize_seat(seat_number)
+        try:
+            self._sync_caches()
+            if self.seats.get(flight_number, date).is_free(seat_number):
+                return True
+            if reservation_id is not None:
+                current = self.get_reservation_by_id(reservation_id)
+                return bool(current) and (current.flight_number, current.date, current.seat_number) == \
+                    (flight_number, date, seat_number)
+            return False
+        except sqlite3.Error as e:
+            self.report_error("checking seat availability", e)
+            return False
+    
+    def get_free_seats(self, flight_number, date):
+        """List the free seats of a flight on a date"""
+        try:
+            self._sync_caches()
+            return self.seats.get(flight_number, date).free_seats()
+        except sqlite3.Error as e:
+            self.report_error("fetching free seats", e)
+            return []
+    
+    def get_flight_load(self, flight_number=None, date=None):
+        """Get (flight_number, date, bookings, seats) for flights with bookings.
+        
+        Filter by flight, by date or both. Counts come from the
+        flight_date_stats summary table, which triggers keep up to date, so
+        this reads one row per flight and date rather than per booking.
+        """
+        where = []
+        params = [DEFAULT_LAYOUT[0] * len(DEFAULT_LAYOUT[1])]
+        if flight_number:
+            where.append("flight_date_stats.flight_number = ?")
+            params.append(flight_number)
+        if date:
+            where.append("date = ?")
+            params.append(date)
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute(f'''
+                    SELECT flight_date_stats.flight_number, date, bookings,
+                           COALESCE(seat_rows * length(seat_letters), ?) AS seats
+                    FROM flight_date_stats
+                    LEFT JOIN flights USING (flight_number)
+                    {"WHERE " + " AND ".join(where) if where else ""}
+                    ORDER BY flight_date_stats.flight_number, date
+                ''', params).fetchall()
+        except sqlite3.Error as e:
+            self.report_error("fetching flight load", e)
+            return []
+    
+    def get_route_stats(self):
+        """Get (departure, destination, bookings) for every route with bookings"""
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute(
+                    'SELECT departure, destination, bookings FROM route_stats ORDER BY departure, destination'
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.report_error("fetching route stats", e)
+            return []
+    
+    def get_daily_stats(self, start_date=None, end_date=None):
+        """Get (date, bookings) per travel date, optionally within a date range (inclusive)"""
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute(
+                    'SELECT date, bookings FROM daily_stats WHERE date BETWEEN ? AND ? ORDER BY date',
+                    (start_date or "", end_date or "9999-12-31")
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.report_error("fetching daily stats", e)
+            return []
+    
+    def _last_change_seq(self, conn):
+        """Highest sequence number ever logged, including pruned changes (0 if none)"""
+        last = conn.execute('SELECT MAX(seq) FROM reservation_changes').fetchone()[0]
+        if last is None:
+            # The log is empty or fully pruned; AUTOINCREMENT remembers the last seq handed out
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'reservation_changes'").fetchone()
+            last = row[0] if row else 0
+        return last
+    
+    def get_change_seq(self):
+        """Get the sequence number of the latest logged change (0 if none)"""
+        try:
+            with self.pool.reader() as conn:
+                return self._last_change_seq(conn)
+        except sqlite3.Error as e:
+            self.report_error("fetching change sequence", e)
+            return 0
+    
+    def changes_since(self, seq, limit=1000):
+        """Get up to `limit` logged changes after sequence number `seq`, oldest first.
+        
+        Read get_change_seq() before loading a view, then pass the seq of
+        the last change applied to fetch the next ones. Returns None if
+        changes after `seq` have already been pruned, in which case the
+        view has to be reloaded in full.
+        """
+        try:
+            with self.pool.reader() as conn:
+                oldest = conn.execute('SELECT MIN(seq) FROM reservation_changes').fetchone()[0]
+                if oldest is None:
+                    # Everything logged has been pruned; the next change is the oldest one kept
+                    oldest = self._last_change_seq(conn) + 1
+                if seq < oldest - 1:
+                    return None
+                changes = []
+                for row in conn.execute('''
+                    SELECT c.seq, c.operation, c.reservation_id, r.*
+                    FROM reservation_changes c
+                    LEFT JOIN reservations r ON r.id = c.reservation_id
+                    WHERE c.seq > ?
+                    ORDER BY c.seq
+                    LIMIT ?
+                ''', (seq, limit)):
+                    reservation = Reservation(*row[3:]) if row[3] is not None else None
+                    changes.append(ReservationChange(row[0], row[1], row[2], reservation))
+                return changes
+        except sqlite3.Error as e:
+            self.report_error("fetching changes", e)
+            return []
+    
+    def prune_changes(self, keep=100_000):
+        """Drop all but the latest `keep` entries of the change log, returning how many were dropped"""
+        try:
+            with self.pool.writer() as conn:
+                return conn.execute(
+                    'DELETE FROM reservation_changes WHERE seq <= (SELECT MAX(seq) FROM reservation_changes) - ?',
+                    (keep,)
+                ).rowcount
+        except sqlite3.Error as e:
+            self.report_error("pruning changes", e)
+            return 0
+    
+    def get_reservations_by_date(self, start_date, end_date=None, flight_number=None):
+        """Get reservations travelling between two dates (inclusive), by date.
+        
+        Archived months in the range are read from their archive database,
+        attached only for this query, together with the active rows.
+        """
+        end_date = end_date or start_date
+        where = "date BETWEEN ? AND ?"
+        params = [start_date, end_date]
+        if flight_number:
+            where += " AND flight_number = ?"
+            params.append(flight_number)
+        columns = ", ".join(RESERVATION_COLUMNS)
+        # Rows from every partition are merged and sorted below, so no ORDER BY here
+        sql = f"SELECT {columns} FROM {{schema}}.reservations WHERE {where}"
+        try:
+            with self.pool.reader() as conn:
+                archives = conn.execute(
+                    'SELECT file_name FROM archive_partitions WHERE month BETWEEN ? AND ? ORDER BY month',
+                    (month_key(start_date), month_key(end_date))
+                ).fetchall()
+                rows = []
+                for (file_name,) in archives:
+                    with attached(conn, os.path.join(self.archive_dir, file_name)):
+                        rows.extend(self._query_reservations(conn, sql.format(schema="archive"), params))
+                rows.extend(self._query_reservations(conn, sql.format(schema="main"), params))
+            rows.sort(key=lambda row: (row.date, row.id))
+            return rows
+        except sqlite3.Error as e:
+            self.report_error("fetching reservations by date", e)
+            return []
+    
+    def get_archived_months(self):
+        """List (month, file_name, row_count, archived_at, archived_before) of every archive database"""
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute(
+                    'SELECT month, file_name, row_count, archived_at, archived_before FROM archive_partitions ORDER BY month'
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.report_error("fetching archived months", e)
+            return []
+    
+    def archive_reservations(self, before_date):
+        """Move reservations travelling before a date into monthly archive databases.
+        
+        Each month is committed to its archive database before it is deleted
+        from the active one, so an interrupted run leaves rows in both places
+        rather than in neither, and running it again finishes the job. The
+        cutoff is recorded with the month, and from then on bookings on, or
+        moves to, an archived date are refused (see migration 7), since the
+        unique seat index no longer sees those seats. Only rows whose id
+        landed in the archive are deleted; anything else stays in the active
+        database and is counted as kept. Archived bookings keep counting in
+        the statistics tables.
+        Returns {"archived": count, "kept": count, "months": [(month, count), ...]}.
+        """
+        summary = {"archived": 0, "kept": 0, "months": []}
+        columns = ", ".join(RESERVATION_COLUMNS)
+        month_rows = "FROM main.reservations WHERE date >= ? AND date < ?"
+        try:
+            # ATTACH is refused inside a transaction; each month commits on its own
+            with self.pool.writer(transaction=False) as conn:
+                first = conn.execute(
+                    'SELECT MIN(date) FROM reservations WHERE date < ?', (before_date,)
+                ).fetchone()[0]
+                if first is None:
+                    return summary
+                for key in months_between(first, before_date):
+                    start, end = month_bounds(key)
+                    end = min(end, before_date)
+                    if conn.execute(f'SELECT 1 {month_rows} LIMIT 1', (start, end)).fetchone() is None:
+                        continue
+                    file_name = archive_file_name(self.db_name, key)
+                    with attached(conn, os.path.join(self.archive_dir, file_name)):
+                        try:
+                            conn.executescript(ARCHIVE_SCHEMA)
+                            self.pool.retry_busy(conn.execute, "BEGIN IMMEDIATE")
+                            # Copies left by an interrupted run may be outdated; the active row wins
+                            conn.execute(
+                                f'DELETE FROM archive.reservations WHERE id IN (SELECT id {month_rows})', (start, end)
+                            )
+                            # A row whose seat the archive already holds is skipped and kept below
+                            conn.execute(f'''
+                                INSERT OR IGNORE INTO archive.reservations ({columns})
+                                SELECT {columns} {month_rows}
+                            ''', (start, end))
+                            conn.commit()
+                            self.pool.retry_busy(conn.execute, "BEGIN IMMEDIATE")
+                            # Suspended as in bulk_load_reservations, so the counts keep archived bookings
+                            stats_trigger = conn.execute(
+                                "SELECT sql FROM main.sqlite_master WHERE type = 'trigger' AND name = 'reservation_stats_ad'"
+                            ).fetchone()
+                            if stats_trigger:
+                                conn.execute('DROP TRIGGER main.reservation_stats_ad')
+                            moved = conn.execute(
+                                f'DELETE {month_rows} AND id IN (SELECT id FROM archive.reservations)', (start, end)
+                            ).rowcount
+                            if stats_trigger:
+                                conn.execute(stats_trigger[0])
+                            kept = conn.execute(f'SELECT COUNT(*) {month_rows}', (start, end)).fetchone()[0]
+                            row_count = conn.execute('SELECT COUNT(*) FROM archive.reservations').fetchone()[0]
+                            conn.execute('''
+                                INSERT INTO archive_partitions (month, file_name, row_count, archived_before)
+                                VALUES (?, ?, ?, ?)
+                                ON CONFLICT(month) DO UPDATE SET
+                                    file_name = excluded.file_name, row_count = excluded.row_count,
+                                    archived_before = MAX(archived_before, excluded.archived_before),
+                                    archived_at = CURRENT_TIMESTAMP
+                            ''', (key, file_name, row_count, end))
+                            conn.commit()
+                        except BaseException:
+                            # DETACH is refused while a transaction is open
+                            conn.rollback()
+                            raise
+                    summary["archived"] += moved
+                    summary["kept"] += kept
+                    summary["months"].append((key, moved))
+        except sqlite3.Error as e:
+            self.report_error("archiving reservations", e)
+        finally:
+            # Archived rows no longer hold seats or belong in the id cache
+            self.seats.invalidate()
+            self.reservation_cache.clear()
+        return summary
+    
+    def report_error(self, action, error):
+        """Print a database error and count it against the running call"""
+        if is_interrupted(error):
+            # Aborted on purpose through interrupt(); the caller discards the result
+            return
+        print(f"Error {action}: {error}")
+        if self.instrumentation is not None:
+            self.instrumentation.record_error()
+    
+    def enable_group_commit(self, max_batch=100, max_delay_ms=5):
+        """Coalesce writes sent through submit_write into shared transactions.
+        
+        Up to max_batch writes arriving within max_delay_ms of each other
+        are committed together, trading a little latency for far fewer syncs.
+        """
+        if self.group_commit is None:
+            self.group_commit = GroupCommitter(self, max_batch=max_batch, max_delay_ms=max_delay_ms)
+    
+    def disable_group_commit(self):
+        """Flush queued writes and go back to committing each write on its own"""
+        if self.group_commit is not None:
+            self.group_commit.close()
+            self.group_commit = None
+    
+    def submit_write(self, method, *args):
+        """Run a write method (e.g. "add_reservation") and return a Future for its result.
+        
+        With group commit enabled the Future resolves once the batch holding
+        the write has committed; otherwise the write runs immediately.
+        """
+        if self.group_commit is not None:
+            return self.group_commit.submit(method, *args)
+        future = Future()
+        future.set_result(getattr(self, method)(*args))
+        return future
+    
+    def get_group_commit_stats(self):
+        """Get batch size and commit latency metrics (None when group commit is off)"""
+        return self.group_commit.stats() if self.group_commit else None
+    
+    def get_cache_stats(self):
+        """Get hit, miss and eviction counters of the reservation cache"""
+        return self.reservation_cache.stats()
+    
+    def interrupt(self):
+        """Abort any query currently running on this database's connections"""
+        if self.pool:
+            self.pool.interrupt()
+    
     def close_connection(self):
         """Close the database connection"""
-        if self.conn:
-            self.conn.close()
+        self.disable_group_commit()
+        if self.pool:
+            self.pool.close()
             print("Database connection closed")
 
-# Initialize database
-db = Database()
\ No newline at end of file
+class LazyDatabase:
+    """Stand-in for a Database that opens it on first use.
+    
+    Attribute access is forwarded to the real Database, which is created
+    (connection opened, tables and migrations applied) the first time it is
+    needed rather than when this module is imported.
+    """
+    
+    def __init__(self, db_name="flights.db", **options):
+        self.db_name = db_name
+        self.options = options
+        self.instance = None
+        self.lock = threading.Lock()
+    
+    def get(self):
+        """Return the underlying Database, opening it if necessary"""
+        if self.instance is None:
+            with self.lock:
+                if self.instance is None:
+                    self.instance = Database(self.db_name, **self.options)
+        return self.instance
+    
+    def is_open(self):
+        """Check whether the database has been opened yet"""
+        return self.instance is not None
+    
+    def close_connection(self):
+        """Close the database if it was ever opened"""
+        if self.instance is not None:
+            self.instance.close_connection()
+            self.instance = None
+    
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+# Initialize database (opened lazily on first use)
+db = LazyDatabase()
\ No newline at end of file
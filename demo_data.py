@@ -1,118 +1,295 @@
 #!/usr/bin/env python3
 """
 Demo data script for Flight Reservation System
-Populates the database with sample reservations for testing
+Populates the database with seeded synthetic reservations (any number,
+from a handful to millions) and can replay a mixed read/write workload
+against it at a target rate, so production-scale behaviour can be
+reproduced locally
+
+Usage:
+    python demo_data.py                              # 10,000 reservations into flights.db
+    python demo_data.py --rows 5000000 --db big.db --seed 7
+    python demo_data.py --rows 0 --replay --rate 500 --duration 60
 """
 
-import sys
+import argparse
+import math
 import os
+import random
+import sys
+import time
+from datetime import date, timedelta
 
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from database import db
+from benchmark import summarize
+
+# (code, city, weight): weights roughly follow passenger traffic, so hubs
+# appear on far more routes than regional airports
+AIRPORTS = [
+    ("ATL", "Atlanta", 10), ("DXB", "Dubai", 9), ("LHR", "London", 9), ("JFK", "New York", 8),
+    ("LAX", "Los Angeles", 8), ("CDG", "Paris", 7), ("FRA", "Frankfurt", 6), ("AMS", "Amsterdam", 6),
+    ("ORD", "Chicago", 6), ("HND", "Tokyo", 6), ("IST", "Istanbul", 5), ("CAI", "Cairo", 4),
+    ("MAD", "Madrid", 4), ("BCN", "Barcelona", 4), ("FCO", "Rome", 4), ("SEA", "Seattle", 3),
+    ("MIA", "Miami", 3), ("LAS", "Las Vegas", 3), ("BER", "Berlin", 3), ("DOH", "Doha", 3),
+    ("JED", "Jeddah", 2), ("ATH", "Athens", 2), ("LIS", "Lisbon", 2), ("HRG", "Hurghada", 1),
+]
+AIRLINES = ["AA", "DL", "UA", "BA", "LH", "AF", "KL", "MS", "EK", "QR", "TK", "IB"]
+# (seat_rows, seat_letters, weight) of the aircraft flying a route
+AIRCRAFT = [(19, "ABCD", 2), (30, "ABCDEF", 5), (32, "ABCDEF", 4), (42, "ABCDEFGHK", 2), (44, "ABCDEFGHK", 1)]
+# Relative demand by weekday (Monday first) and by month (January first)
+WEEKDAY_DEMAND = [0.95, 0.8, 0.85, 1.0, 1.2, 1.05, 1.15]
+MONTH_DEMAND = [0.8, 0.8, 0.9, 1.0, 1.0, 1.1, 1.3, 1.3, 1.0, 0.95, 0.9, 1.2]
+# Names drawn with Zipf-like weights, so a few are common and most are rare
+FIRST_NAMES = [
+    "Mohamed", "Sarah", "Ahmed", "Emma", "Omar", "Olivia", "James", "Fatima", "Liam", "Yara", "Noah", "Mona",
+    "Karim", "Sofia", "David", "Layla", "Lucas", "Nour", "Ethan", "Hana", "Youssef", "Grace", "Mateo", "Amira",
+]
+LAST_NAMES = [
+    "Smith", "Hassan", "Johnson", "Ali", "Brown", "Ibrahim", "Garcia", "Mahmoud", "Miller", "Nasser", "Davis",
+    "Khalil", "Wilson", "Mostafa", "Taylor", "Anderson", "Saleh", "Martin", "Farouk", "Thomas", "Dandrawy",
+]
+MEAN_LOAD_FACTOR = 0.75
+DEFAULT_START = date(2025, 1, 1)
+# Share of each operation in a replayed workload
+WORKLOAD_MIX = {"lookup": 0.40, "search": 0.20, "page": 0.15, "book": 0.15, "update": 0.07, "cancel": 0.03}
+
+def zipf_weights(count, exponent=1.0):
+    """Weights 1, 1/2**s, 1/3**s, ... for count items"""
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+def flight_count(rows, days):
+    """Flights needed to carry `rows` bookings over `days` at MEAN_LOAD_FACTOR"""
+    mean_capacity = sum(rows_ * len(letters) * w for rows_, letters, w in AIRCRAFT) / sum(w for *_, w in AIRCRAFT)
+    return max(1, math.ceil(rows / (days * mean_capacity * MEAN_LOAD_FACTOR)))
+
+def generate_flights(count, rng):
+    """Return `count` (flight_number, departure, destination, seat_rows, seat_letters) tuples"""
+    weights = [weight for _, _, weight in AIRPORTS]
+    aircraft_weights = [weight for _, _, weight in AIRCRAFT]
+    flights = []
+    for i in range(count):
+        departure = rng.choices(AIRPORTS, weights)[0]
+        destination = departure
+        while destination == departure:
+            destination = rng.choices(AIRPORTS, weights)[0]
+        seat_rows, seat_letters, _ = rng.choices(AIRCRAFT, aircraft_weights)[0]
+        flight_number = f"{AIRLINES[i % len(AIRLINES)]}{100 + i // len(AIRLINES)}"
+        flights.append((flight_number, departure[1], destination[1], seat_rows, seat_letters))
+    return flights
+
+def plan_bookings(rows, flights, days, start, rng):
+    """Number of reservations per (flight index, day index), summing to exactly `rows`.
+    
+    Each flight and date draws a load factor around MEAN_LOAD_FACTOR,
+    scaled by weekday and month demand and capped at the seat count.
+    """
+    demand = {}
+    for day in range(days):
+        travel_date = start + timedelta(days=day)
+        seasonal = WEEKDAY_DEMAND[travel_date.weekday()] * MONTH_DEMAND[travel_date.month - 1]
+        for index, (_, _, _, seat_rows, seat_letters) in enumerate(flights):
+            load = rng.betavariate(6, 2) / (6 / 8) * MEAN_LOAD_FACTOR * seasonal
+            demand[index, day] = seat_rows * len(seat_letters) * load
+    
+    # Scale to the requested total, then hand out the rounding remainder
+    scale = rows / sum(demand.values())
+    plan = {}
+    for slot, wanted in demand.items():
+        capacity = flights[slot[0]][3] * len(flights[slot[0]][4])
+        plan[slot] = min(capacity, int(wanted * scale))
+    remainder = rows - sum(plan.values())
+    slots = list(plan)
+    while remainder > 0:
+        slot = rng.choice(slots)
+        if plan[slot] < flights[slot[0]][3] * len(flights[slot[0]][4]):
+            plan[slot] += 1
+            remainder -= 1
+    return plan
+
+def generate_reservations(rows, seed=42, days=365, start=DEFAULT_START, flights=None):
+    """Yield `rows` synthetic reservations with no double-booked seats.
+    
+    The same seed always gives the same rows, matching what
+    load_reservations loads. Flights are sized so that an average flight
+    is about MEAN_LOAD_FACTOR full; pass `flights` (from generate_flights)
+    to book against a known set of flights. Rows are
+    emitted flight by flight in a shuffled order, so ids and created_at do
+    not follow travel date, as in a live system.
+    """
+    if flights is None:
+        flights = generate_flights(flight_count(rows, days), random.Random(seed))
+    rng = random.Random(seed)
+    plan = plan_bookings(rows, flights, days, start, rng)
+    slots = [slot for slot, booked in plan.items() if booked]
+    rng.shuffle(slots)
+    
+    first_weights = zipf_weights(len(FIRST_NAMES), 0.8)
+    last_weights = zipf_weights(len(LAST_NAMES), 0.8)
+    dates = [(start + timedelta(days=day)).isoformat() for day in range(days)]
+    for index, day in slots:
+        flight_number, departure, destination, seat_rows, seat_letters = flights[index]
+        seats = rng.sample(range(seat_rows * len(seat_letters)), plan[index, day])
+        firsts = rng.choices(FIRST_NAMES, first_weights, k=len(seats))
+        lasts = rng.choices(LAST_NAMES, last_weights, k=len(seats))
+        for seat, first, last in zip(seats, firsts, lasts):
+            yield (
+                f"{first} {last}",
+                flight_number,
+                departure,
+                destination,
+                dates[day],
+                f"{seat // len(seat_letters) + 1}{seat_letters[seat % len(seat_letters)]}",
+            )
+
+def load_reservations(db, rows, seed=42, days=365, start=DEFAULT_START, chunk_size=50_000):
+    """Define the generated flights and bulk-load `rows` reservations, returning the bulk summary"""
+    flights = generate_flights(flight_count(rows, days), random.Random(seed))
+    for flight_number, _, _, seat_rows, seat_letters in flights:
+        db.define_flight(flight_number, seat_rows, seat_letters)
+    reservations = generate_reservations(rows, seed, days, start, flights)
+    return db.bulk_load_reservations(reservations, chunk_size=chunk_size)
+
+class Workload:
+    """Mixed read/write operations against a Database, chosen by WORKLOAD_MIX"""
+    
+    def __init__(self, db, seed=42, mix=None):
+        self.db = db
+        self.rng = random.Random(seed)
+        self.mix = mix or WORKLOAD_MIX
+        self.flights = [row for row in db.get_flight_load() if row[2] < row[3]]
+        self.routes = {}
+        newest = db.get_reservations_page(1)
+        self.max_id = newest[0].id if newest else 0
+        self.booked = 0
+    
+    def random_id(self):
+        """An id that probably exists (some were cancelled or archived)"""
+        return self.rng.randint(1, max(self.max_id, 1))
+    
+    def lookup(self):
+        """Fetch one reservation by id"""
+        self.db.get_reservation_by_id(self.random_id())
+    
+    def search(self):
+        """Search by a name prefix, surname or city"""
+        term = self.rng.choice([self.rng.choice(FIRST_NAMES)[:3], self.rng.choice(LAST_NAMES),
+                                self.rng.choice(AIRPORTS)[1]])
+        self.db.search_reservations(term, limit=50)
+    
+    def page(self):
+        """Fetch the first page of the reservation list"""
+        self.db.get_reservations_page(100)
+    
+    def book(self):
+        """Book a free seat on a flight that has some"""
+        if not self.flights:
+            return
+        flight_number, travel_date, _, _ = self.rng.choice(self.flights)
+        free = self.db.get_free_seats(flight_number, travel_date)
+        if not free:
+            return
+        if flight_number not in self.routes:
+            booked = self.db.get_reservations_by_date(travel_date, flight_number=flight_number)
+            self.routes[flight_number] = (booked[0].departure, booked[0].destination) if booked else \
+                (AIRPORTS[0][1], AIRPORTS[1][1])
+        departure, destination = self.routes[flight_number]
+        name = f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+        reservation_id = self.db.add_reservation(
+            name, flight_number, departure, destination, travel_date, self.rng.choice(free)
+        )
+        if reservation_id:
+            self.max_id = max(self.max_id, reservation_id)
+            self.booked += 1
+    
+    def update(self):
+        """Rename a reservation, as an edit from the edit page would"""
+        reservation = self.db.get_reservation_by_id(self.random_id())
+        if reservation:
+            self.db.update_reservation(reservation.id, reservation.version, reservation.name + " Jr",
+                                       *reservation.fields()[1:])
+    
+    def cancel(self):
+        """Delete a reservation"""
+        self.db.delete_reservation(self.random_id())
+    
+    def run(self, rate=0, duration=10, operations=None):
+        """Issue operations for `duration` seconds (or `operations` of them).
+        
+        With a rate, operations are scheduled open-loop at that many per
+        second, so a slow operation delays the ones behind it as it would
+        for real users, and latency includes that queueing. rate=0 runs as
+        fast as possible. Returns per-operation latency summaries.
+        """
+        kinds = list(self.mix)
+        weights = [self.mix[kind] for kind in kinds]
+        samples = {kind: [] for kind in kinds}
+        start = time.perf_counter()
+        issued = 0
+        while True:
+            now = time.perf_counter()
+            if now - start >= duration or (operations is not None and issued >= operations):
+                break
+            scheduled = start + issued / rate if rate else now
+            if scheduled > now:
+                time.sleep(scheduled - now)
+            kind = self.rng.choices(kinds, weights)[0]
+            getattr(self, kind)()
+            samples[kind].append(time.perf_counter() - scheduled)
+            issued += 1
+        elapsed = time.perf_counter() - start
+        results = {kind: summarize(latencies) for kind, latencies in samples.items() if latencies}
+        results["total"] = {"operations": issued, "elapsed_s": round(elapsed, 3),
+                            "ops_per_sec": round(issued / elapsed, 2) if elapsed > 0 else 0.0}
+        return results
 
 def add_demo_data():
-    """Add sample reservations to the database"""
+    """Parse command line arguments, load synthetic reservations and optionally replay a workload"""
+    parser = argparse.ArgumentParser(description="Load synthetic reservations and replay a mixed workload")
+    parser.add_argument("--db", default="flights.db", help="database file (default: flights.db)")
+    parser.add_argument("--rows", type=int, default=10_000, help="reservations to add (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument("--days", type=int, default=365, help="travel dates to spread bookings over")
+    parser.add_argument("--start", default=DEFAULT_START.isoformat(), help="first travel date (YYYY-MM-DD)")
+    parser.add_argument("--replay", action="store_true", help="replay a mixed read/write workload afterwards")
+    parser.add_argument("--rate", type=float, default=200, help="replayed operations per second (0: unthrottled)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to replay for")
+    args = parser.parse_args()
+    
+    from database import Database
+    
     print("🎭 Adding Demo Data to Flight Reservation System")
     print("=" * 50)
-    
-    # Sample reservations
-    demo_reservations = [
-        {
-            "name": "Alice Johnson",
-            "flight_number": "AA123",
-            "departure": "New York",
-            "destination": "Los Angeles",
-            "date": "2024-12-25",
-            "seat_number": "12A"
-        },
-        {
-            "name": "Bob Smith",
-            "flight_number": "DL456",
-            "departure": "Atlanta",
-            "destination": "Seattle",
-            "date": "2024-12-26",
-            "seat_number": "8C"
-        },
-        {
-            "name": "Carol Davis",
-            "flight_number": "UA789",
-            "departure": "Chicago",
-            "destination": "Miami",
-            "date": "2024-12-27",
-            "seat_number": "15F"
-        },
-        {
-            "name": "David Wilson",
-            "flight_number": "SW321",
-            "departure": "Dallas",
-            "destination": "Las Vegas",
-            "date": "2024-12-28",
-            "seat_number": "22B"
-        },
-        {
-            "name": "Emma Brown",
-            "flight_number": "BA654",
-            "departure": "London",
-            "destination": "Paris",
-            "date": "2024-12-29",
-            "seat_number": "7A"
-        },
-        {
-            "name": "Frank Miller",
-            "flight_number": "LH987",
-            "departure": "Frankfurt",
-            "destination": "Berlin",
-            "date": "2024-12-30",
-            "seat_number": "11D"
-        },
-        {
-            "name": "Grace Taylor",
-            "flight_number": "AF147",
-            "departure": "Paris",
-            "destination": "Rome",
-            "date": "2024-12-31",
-            "seat_number": "9C"
-        },
-        {
-            "name": "Henry Anderson",
-            "flight_number": "KL258",
-            "departure": "Amsterdam",
-            "destination": "Barcelona",
-            "date": "2025-01-01",
-            "seat_number": "14E"
-        }
-    ]
-    
-    # Add each reservation
-    for i, reservation in enumerate(demo_reservations, 1):
-        print(f"Adding reservation {i}/{len(demo_reservations)}: {reservation['name']}")
+    db = Database(args.db)
+    try:
+        if args.rows:
+            print(f"📦 Generating {args.rows:,} reservations (seed {args.seed})...")
+            result = load_reservations(db, args.rows, args.seed, args.days, date.fromisoformat(args.start))
+            for row_number, error in result["failed"][:10]:
+                print(f"❌ Row {row_number}: {error}")
+            print(f"✅ Added {result['inserted']:,}/{args.rows:,} reservations "
+                  f"in {result['elapsed']:.1f} s ({result['rows_per_second']:,.0f} rows/s)")
         
-        success = db.add_reservation(
-            name=reservation["name"],
-            flight_number=reservation["flight_number"],
-            departure=reservation["departure"],
-            destination=reservation["destination"],
-            date=reservation["date"],
-            seat_number=reservation["seat_number"]
-        )
+        if args.replay:
+            print(f"\n🔁 Replaying workload at {args.rate or 'unlimited'} ops/s for {args.duration} s...")
+            results = Workload(db, args.seed).run(args.rate, args.duration)
+            total = results.pop("total")
+            for kind, summary in results.items():
+                print(f"   {kind:<8} {summary['count']:>7,} ops   p50 {summary['p50_ms']:>8} ms   "
+                      f"p99 {summary['p99_ms']:>8} ms")
+            print(f"   {total['operations']:,} operations, {total['ops_per_sec']:,} per second")
         
-        if success:
-            print(f"✅ Added: {reservation['name']} - {reservation['flight_number']}")
-        else:
-            print(f"❌ Failed to add: {reservation['name']}")
-    
-    # Display final count
-    final_reservations = db.get_all_reservations()
-    print(f"\n📊 Total reservations in database: {len(final_reservations)}")
+        with db.pool.reader() as conn:
+            count = conn.execute('SELECT COUNT(*) FROM reservations').fetchone()[0]
+        print(f"\n📊 Total reservations in database: {count:,}")
+    finally:
+        db.close_connection()
     
     print("\n" + "=" * 50)
     print("🎉 Demo data added successfully!")
     print("\n💡 You can now run the application to see the sample reservations.")
-    
-    # Close database connection
-    db.close_connection()
+    return 0
 
 if __name__ == "__main__":
-    add_demo_data()
\ No newline at end of file
+    sys.exit(add_demo_data())
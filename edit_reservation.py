@@ -2,16 +2,19 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from datetime import datetime
-from database import db
+from instrumentation import timed
+from models import VersionConflict
+from validation import validate_reservation
 
 class EditReservationPage:
-    def __init__(self, parent, show_home_page, show_reservations_page):
+    def __init__(self, parent, show_home_page, show_reservations_page, worker):
         self.parent = parent
         self.show_home_page = show_home_page
         self.show_reservations_page = show_reservations_page
+        self.worker = worker
         self.frame = None
         self.reservation_id = None
+        self.reservation_version = None
         self.create_widgets()
     
     def create_widgets(self):
@@ -67,14 +70,14 @@ class EditReservationPage:
         buttons_frame.pack(pady=20)
         
         # Update Button
-        update_button = ttk.Button(
+        self.update_button = ttk.Button(
             buttons_frame,
             text="💾 Update Reservation",
             command=self.update_reservation,
             style="success.TButton",
             width=20
         )
-        update_button.pack(side="left", padx=(0, 10))
+        self.update_button.pack(side="left", padx=(0, 10))
         
         # Back Button
         back_button = ttk.Button(
@@ -108,9 +111,19 @@ class EditReservationPage:
     def load_reservation(self, reservation_id):
         """Load reservation data into the form"""
         self.reservation_id = reservation_id
-        reservation = db.get_reservation_by_id(reservation_id)
-        
+        self.status_label.config(text=f"Loading reservation ID: {reservation_id}…")
+        self.worker.submit(
+            "get_reservation_by_id", reservation_id,
+            callback=lambda reservation: self.fill_form(reservation_id, reservation),
+            key="edit_load"
+        )
+    
+    def fill_form(self, reservation_id, reservation):
+        """Fill the form with a loaded reservation"""
         if reservation:
+            # Updates only apply if nobody else has changed the reservation since
+            self.reservation_version = reservation.version
+            
             # Clear existing entries
             self.name_entry.delete(0, tk.END)
             self.flight_number_entry.delete(0, tk.END)
@@ -120,20 +133,21 @@ class EditReservationPage:
             self.seat_number_entry.delete(0, tk.END)
             
             # Fill with reservation data
-            self.name_entry.insert(0, reservation[1])  # name
-            self.flight_number_entry.insert(0, reservation[2])  # flight_number
-            self.departure_entry.insert(0, reservation[3])  # departure
-            self.destination_entry.insert(0, reservation[4])  # destination
-            self.date_entry.insert(0, reservation[5])  # date
-            self.seat_number_entry.insert(0, reservation[6])  # seat_number
+            self.name_entry.insert(0, reservation.name)
+            self.flight_number_entry.insert(0, reservation.flight_number)
+            self.departure_entry.insert(0, reservation.departure)
+            self.destination_entry.insert(0, reservation.destination)
+            self.date_entry.insert(0, reservation.date)
+            self.seat_number_entry.insert(0, reservation.seat_number)
             
             # Update title
-            self.title_label.config(text=f"✏️ Edit Reservation - {reservation[1]}")
+            self.title_label.config(text=f"✏️ Edit Reservation - {reservation.name}")
             self.status_label.config(text=f"Editing reservation ID: {reservation_id}")
         else:
             messagebox.showerror("Error", "Reservation not found!")
             self.show_reservations_page()
     
+    @timed("ui.update_reservation")
     def update_reservation(self):
         """Update the reservation with new data"""
         if not self.reservation_id:
@@ -149,24 +163,66 @@ class EditReservationPage:
         seat_number = self.seat_number_entry.get().strip()
         
         # Validate inputs
-        if not all([name, flight_number, departure, destination, date, seat_number]):
-            messagebox.showerror("Error", "Please fill in all fields!")
+        error = validate_reservation(name, flight_number, departure, destination, date, seat_number)
+        if error:
+            messagebox.showerror("Error", error)
             return
         
-        # Validate date format
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            messagebox.showerror("Error", "Please enter a valid date in YYYY-MM-DD format!")
+        # Check the seat, then update the reservation, on the background worker
+        values = (name, flight_number, departure, destination, date, seat_number)
+        reservation_id = self.reservation_id
+        version = self.reservation_version
+        self.update_button.config(state="disabled")
+        self.worker.submit(
+            "is_seat_available", flight_number, date, seat_number, reservation_id,
+            callback=lambda available: self.on_seat_checked(available, reservation_id, version, values)
+        )
+    
+    def on_seat_checked(self, available, reservation_id, version, values):
+        """Save the changes if the seat is free, otherwise report the conflict"""
+        name, flight_number, departure, destination, date, seat_number = values
+        if not available:
+            self.update_button.config(state="normal")
+            messagebox.showerror("Error", f"Seat {seat_number} on flight {flight_number} for {date} is already booked!")
             return
         
-        # Update reservation in database
-        if db.update_reservation(self.reservation_id, name, flight_number, departure, destination, date, seat_number):
-            messagebox.showinfo("Success", f"Reservation updated successfully!\n\nPassenger: {name}\nFlight: {flight_number}\nFrom: {departure}\nTo: {destination}\nDate: {date}\nSeat: {seat_number}")
+        details = f"Passenger: {name}\nFlight: {flight_number}\nFrom: {departure}\nTo: {destination}\nDate: {date}\nSeat: {seat_number}"
+        self.worker.submit(
+            "update_reservation", reservation_id, version, *values,
+            callback=lambda result: self.on_updated(result, reservation_id, details)
+        )
+    
+    def on_updated(self, result, reservation_id, details):
+        """Report the result of an update"""
+        self.update_button.config(state="normal")
+        if result:
+            messagebox.showinfo("Success", f"Reservation updated successfully!\n\n{details}")
             self.show_reservations_page()
+        elif isinstance(result, VersionConflict):
+            self.on_conflict(result, reservation_id)
         else:
             messagebox.showerror("Error", "Failed to update reservation. Please try again.")
     
+    def on_conflict(self, conflict, reservation_id):
+        """Tell the user someone else changed the reservation and offer to reload it"""
+        if conflict.current is None:
+            messagebox.showerror("Error", "This reservation was deleted by someone else while you were editing it.")
+            self.show_reservations_page()
+            return
+        
+        current = conflict.current
+        details = (f"Passenger: {current.name}\nFlight: {current.flight_number}\nFrom: {current.departure}\n"
+                   f"To: {current.destination}\nDate: {current.date}\nSeat: {current.seat_number}")
+        if messagebox.askyesno(
+            "Reservation Changed",
+            f"Someone else changed this reservation while you were editing it:\n\n{details}\n\n"
+            "Load their version? Your unsaved changes will be discarded."
+        ):
+            self.fill_form(reservation_id, current)
+        else:
+            # Keep the edits; saving again will overwrite the other changes
+            self.reservation_version = current.version
+    
     def show(self):
         """Show the edit reservation page"""
         self.frame.pack(fill="both", expand=True)
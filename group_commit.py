@@ -0,0 +1,139 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+class GroupCommitter:
+    """Coalesce Database writes into shared transactions.
+    
+    Writes are queued and applied by one background thread. The first
+    queued write opens a batch; the batch closes when it holds max_batch
+    writes or max_delay_ms has passed, and is committed as one transaction,
+    so many writers share one commit. Every write runs inside its own
+    savepoint, so a write that fails is rolled back without affecting the
+    others. The Future returned by submit() resolves to the write method's
+    result once the batch has been committed.
+    """
+    
+    def __init__(self, db, max_batch=100, max_delay_ms=5, history=1000):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay_ms = max_delay_ms
+        self.pending = queue.Queue()
+        self.batch_sizes = deque(maxlen=history)
+        self.commit_latencies = deque(maxlen=history)
+        self.batches = 0
+        self.writes = 0
+        self.failed_batches = 0
+        self.stats_lock = threading.Lock()
+        self.closed = False
+        self.close_lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, name="GroupCommitter", daemon=True)
+        self.thread.start()
+    
+    def submit(self, method, *args):
+        """Queue a Database write method call and return a Future for its result"""
+        future = Future()
+        with self.close_lock:
+            # Nothing would ever run a write queued behind the stop marker
+            if self.closed:
+                raise RuntimeError("Group commit has been closed")
+            self.pending.put((method, args, future))
+        return future
+    
+    def run(self):
+        """Collect writes into batches and commit them until stopped"""
+        stopping = False
+        while not stopping:
+            first = self.pending.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay_ms / 1000
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.pending.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self.commit_batch(batch)
+    
+    def commit_batch(self, batch):
+        """Apply a batch of writes in one transaction and resolve their futures"""
+        results = []
+        start = time.perf_counter()
+        try:
+            with self.db.pool.writer() as conn:
+                for method, args, future in batch:
+                    conn.execute("SAVEPOINT group_write")
+                    try:
+                        result = getattr(self.db, method)(*args)
+                    except Exception as e:
+                        result = e
+                    if result is False or isinstance(result, Exception):
+                        conn.execute("ROLLBACK TO group_write")
+                    conn.execute("RELEASE group_write")
+                    results.append(result)
+            # Each write dropped its cached row before the shared commit, so a
+            # reader may have cached the old row again in between
+            for method, args, _ in batch:
+                if method in ("update_reservation", "delete_reservation"):
+                    self.db._forget_reservation(args[0])
+        except Exception as e:
+            print(f"Error committing write batch: {e}")
+            # Caches were updated as if the batch had committed
+            self.db.seats.invalidate()
+            self.db.reservation_cache.clear()
+            results = [False] * len(batch)
+            with self.stats_lock:
+                self.failed_batches += 1
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        with self.stats_lock:
+            self.batches += 1
+            self.writes += len(batch)
+            self.batch_sizes.append(len(batch))
+            self.commit_latencies.append(elapsed_ms)
+        
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+    
+    def stats(self):
+        """Return batch size and commit latency metrics over recent batches"""
+        with self.stats_lock:
+            sizes = sorted(self.batch_sizes)
+            latencies = sorted(self.commit_latencies)
+            batches, writes, failed = self.batches, self.writes, self.failed_batches
+        
+        def pick(samples, pct):
+            return samples[min(len(samples) - 1, int(pct / 100 * len(samples)))] if samples else 0
+        
+        return {
+            "batches": batches,
+            "writes": writes,
+            "failed_batches": failed,
+            "mean_batch_size": round(writes / batches, 2) if batches else 0.0,
+            "p50_batch_size": pick(sizes, 50),
+            "max_batch_size": sizes[-1] if sizes else 0,
+            "p50_commit_ms": round(pick(latencies, 50), 3),
+            "p99_commit_ms": round(pick(latencies, 99), 3),
+        }
+    
+    def close(self):
+        """Commit anything still queued and stop the background thread"""
+        with self.close_lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.pending.put(None)
+        self.thread.join()
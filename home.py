@@ -4,10 +4,11 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 
 class HomePage:
-    def __init__(self, parent, show_booking_page, show_reservations_page):
+    def __init__(self, parent, show_booking_page, show_reservations_page, show_stats_page):
         self.parent = parent
         self.show_booking_page = show_booking_page
         self.show_reservations_page = show_reservations_page
+        self.show_stats_page = show_stats_page
         self.frame = None
         self.create_widgets()
     
@@ -58,6 +59,16 @@ class HomePage:
         )
         view_button.pack(pady=10)
         
+        # Statistics Button
+        stats_button = ttk.Button(
+            buttons_frame,
+            text="📊 Statistics",
+            command=self.show_stats_page,
+            style="info.TButton",
+            width=25
+        )
+        stats_button.pack(pady=10)
+        
         # Exit Button
         exit_button = ttk.Button(
             buttons_frame,
@@ -0,0 +1,233 @@
+import functools
+import inspect
+import json
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Database methods left unwrapped; report_error marks the call it runs in
+UNTIMED_METHODS = ("report_error",)
+
+def count_rows(result):
+    """Rows produced by a Database call, judged from its return value"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        return result.get("inserted", result.get("archived", 0))
+    if result is None or isinstance(result, bool):
+        return 0
+    return 1
+
+class CallStats:
+    """Latency histogram, error count and row count of one instrumented call"""
+    
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.rows = 0
+    
+    def add(self, seconds, rows, error):
+        """Record one call"""
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.errors += error
+        self.rows += rows
+    
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, in seconds"""
+        rank = pct / 100 * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def snapshot(self):
+        """JSON-friendly summary"""
+        return {
+            "calls": self.count,
+            "errors": self.errors,
+            "rows": self.rows,
+            "mean_ms": round(self.total / self.count * 1000, 4) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 4),
+            "p95_ms": round(self.percentile(95) * 1000, 4),
+            "p99_ms": round(self.percentile(99) * 1000, 4),
+            "max_ms": round(self.max * 1000, 4),
+            "buckets": dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"], self.buckets)),
+        }
+
+class Instrumentation:
+    """Timing of Database calls and page actions.
+    
+    Disabled until enable() is called, so instrumented code only pays for
+    one attribute check. Once enabled, every call records its latency into
+    a histogram along with the rows it returned and whether it failed, and
+    is passed to any hooks added with add_hook(fn), called as
+    fn(name, seconds, rows, error). With slow_query_ms set, calls slower
+    than that are printed with the SQL they ran and its query plan.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.slow_query_ms = None
+        self.stats = {}
+        self.hooks = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+    
+    def enable(self, slow_query_ms=None):
+        """Start recording; slow_query_ms also logs calls slower than that"""
+        self.slow_query_ms = slow_query_ms
+        self.enabled = True
+    
+    def disable(self):
+        """Stop recording (recorded metrics are kept)"""
+        self.enabled = False
+    
+    def add_hook(self, hook):
+        """Call hook(name, seconds, rows, error) after every recorded call"""
+        self.hooks.append(hook)
+    
+    def reset(self):
+        """Drop everything recorded so far"""
+        with self.lock:
+            self.stats.clear()
+    
+    def frames(self):
+        """This thread's stack of running instrumented calls"""
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+    
+    def call(self, name, fn, args, kwargs, db=None):
+        """Run fn(*args, **kwargs) and record how it went under `name`"""
+        stack = self.frames()
+        frame = {"error": False, "statements": []}
+        stack.append(frame)
+        start = time.perf_counter()
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        except BaseException:
+            frame["error"] = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            self.record(name, seconds, count_rows(result), frame["error"])
+            if stack:
+                # Statements of nested calls count towards the outer call too
+                stack[-1]["statements"].extend(frame["statements"])
+            elif self.slow_query_ms is not None and seconds * 1000 >= self.slow_query_ms:
+                self.log_slow_call(name, seconds, frame["statements"], db)
+    
+    def record(self, name, seconds, rows=0, error=False):
+        """Add one call to the metrics of `name`"""
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = CallStats()
+            stats.add(seconds, rows, error)
+        for hook in self.hooks:
+            hook(name, seconds, rows, error)
+    
+    def record_error(self):
+        """Mark the innermost running call on this thread as failed"""
+        stack = self.frames()
+        if stack:
+            stack[-1]["error"] = True
+    
+    def trace(self, sql):
+        """SQL trace callback collecting statements for the slow query log"""
+        stack = self.frames()
+        # Statements run by triggers and FTS internals are traced as "-- ..."
+        if stack and not sql.startswith("--"):
+            stack[-1]["statements"].append(sql)
+    
+    def log_slow_call(self, name, seconds, statements, db):
+        """Print a slow call with the SQL it ran and the plan of each statement"""
+        print(f"🐢 Slow call {name}: {seconds * 1000:.1f} ms")
+        if db is None:
+            return
+        from query_plan import explain
+        for sql in dict.fromkeys(" ".join(sql.split()) for sql in statements):
+            print(f"     {sql}")
+            if sql.split(" ", 1)[0].upper() not in ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH"):
+                continue
+            try:
+                with db.pool.reader() as conn:
+                    for detail in explain(conn, sql):
+                        print(f"        {detail}")
+            except Exception as e:
+                print(f"        (no plan: {e})")
+    
+    def wrap_database(self, db):
+        """Instrument every public method of a Database instance"""
+        if self.slow_query_ms is not None:
+            db.pool.set_trace_callback(self.trace)
+        for name, method in inspect.getmembers(db, inspect.ismethod):
+            # Generators would only be timed until their first yield
+            if name.startswith("_") or name in UNTIMED_METHODS or inspect.isgeneratorfunction(method):
+                continue
+            setattr(db, name, self.wrap(f"db.{name}", method, db))
+    
+    def wrap(self, name, fn, db=None):
+        """Return fn instrumented under `name`"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            return self.call(name, fn, args, kwargs, db)
+        return wrapper
+    
+    def snapshot(self):
+        """Metrics of every call as a JSON-friendly dict"""
+        with self.lock:
+            return {name: stats.snapshot() for name, stats in sorted(self.stats.items())}
+    
+    def to_json(self, indent=2):
+        """Metrics of every call as a JSON document"""
+        return json.dumps(self.snapshot(), indent=indent)
+    
+    def to_prometheus(self):
+        """Metrics of every call in the Prometheus text exposition format"""
+        lines = [
+            "# HELP flight_call_duration_seconds Latency of Database calls and page actions",
+            "# TYPE flight_call_duration_seconds histogram",
+        ]
+        with self.lock:
+            items = sorted(self.stats.items())
+            for name, stats in items:
+                cumulative = 0
+                for bound, count in zip([str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"], stats.buckets):
+                    cumulative += count
+                    lines.append(f'flight_call_duration_seconds_bucket{{call="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'flight_call_duration_seconds_sum{{call="{name}"}} {stats.total:.9f}')
+                lines.append(f'flight_call_duration_seconds_count{{call="{name}"}} {stats.count}')
+            lines.append("# HELP flight_call_errors_total Calls that failed")
+            lines.append("# TYPE flight_call_errors_total counter")
+            lines.extend(f'flight_call_errors_total{{call="{name}"}} {stats.errors}' for name, stats in items)
+            lines.append("# HELP flight_call_rows_total Rows returned or written by calls")
+            lines.append("# TYPE flight_call_rows_total counter")
+            lines.extend(f'flight_call_rows_total{{call="{name}"}} {stats.rows}' for name, stats in items)
+        return "\n".join(lines) + "\n"
+
+# Shared instance used by the desktop app and the timed() decorator
+metrics = Instrumentation()
+
+def timed(name):
+    """Decorator recording a function's calls in the shared metrics under `name`"""
+    def decorator(fn):
+        return metrics.wrap(name, fn)
+    return decorator
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Load test script for the Flight Reservation System HTTP API
+Drives api_server.py with concurrent keep-alive clients issuing a mix of
+bookings, lookups and searches, and reports requests per second
+
+Usage:
+    python api_server.py --port 8080 &
+    python load_test.py --port 8080 --clients 32 --duration 10 --write-ratio 0.2
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark import summarize
+
+SEARCH_TERMS = ["load", "tester", "LT1", "Cairo", "Dubai"]
+
+# Distinct bookable seats: 180 seats x 1000 flights x 28 days x 12 months
+SEAT_SPACE = 180 * 1000 * 28 * 12
+
+class Client:
+    """A keep-alive HTTP/1.1 connection to the API"""
+    
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+    
+    async def connect(self):
+        """Open the connection"""
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+    
+    async def request(self, method, path, payload=None):
+        """Send one request and return (status, decoded JSON body)"""
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        )
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+        
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = await self.reader.readexactly(length) if length else b"{}"
+        return status, json.loads(data)
+    
+    async def close(self):
+        """Close the connection"""
+        if self.writer:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+async def run_client(host, port, deadline, write_ratio, seats, booked_ids, latencies, errors, conflicts, rng):
+    """Issue requests until the deadline, recording latency per request kind.
+    
+    Bookings refused with 409 because the seat is taken (e.g. by an earlier
+    run against the same database) are counted as conflicts, not errors.
+    """
+    client = Client(host, port)
+    await client.connect()
+    try:
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            start = time.perf_counter()
+            if roll < write_ratio or not booked_ids:
+                kind = "create"
+                seat_id = next(seats) % SEAT_SPACE
+                status, body = await client.request("POST", "/reservations", {
+                    "name": f"Load Tester {seat_id}",
+                    "flight_number": f"LT{seat_id // 180 % 1000}",
+                    "departure": "Cairo",
+                    "destination": "Dubai",
+                    "date": f"2030-{seat_id // 5_040_000 % 12 + 1:02d}-{seat_id // 180_000 % 28 + 1:02d}",
+                    "seat_number": f"{seat_id % 180 // 6 + 1}{'ABCDEF'[seat_id % 6]}",
+                })
+                if status == 201:
+                    booked_ids.append(body["id"])
+            elif roll < write_ratio + (1 - write_ratio) / 2:
+                kind = "get"
+                status, _ = await client.request("GET", f"/reservations/{rng.choice(booked_ids)}")
+            else:
+                kind = "search"
+                status, _ = await client.request("GET", f"/reservations?q={rng.choice(SEARCH_TERMS)}&limit=20")
+            latencies.setdefault(kind, []).append(time.perf_counter() - start)
+            if kind == "create" and status == 409:
+                conflicts[kind] = conflicts.get(kind, 0) + 1
+            elif status >= 400:
+                errors[kind] = errors.get(kind, 0) + 1
+    finally:
+        await client.close()
+
+async def run_load_test(host, port, clients, duration, write_ratio, seed):
+    """Run all clients concurrently and return (latencies by kind, errors, conflicts, elapsed)"""
+    rng = random.Random(seed)
+    # Each booking gets a seat no other booking in the run uses. The start is
+    # not drawn from the seed, so repeated runs against one database book
+    # new seats instead of replaying the seats the last run already took.
+    seats = itertools.count(random.SystemRandom().randrange(SEAT_SPACE))
+    booked_ids = []
+    latencies = {}
+    errors = {}
+    conflicts = {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        run_client(host, port, deadline, write_ratio, seats, booked_ids, latencies, errors, conflicts,
+                   random.Random(rng.random()))
+        for _ in range(clients)
+    ))
+    return latencies, errors, conflicts, time.perf_counter() - start
+
+def main():
+    """Parse command line arguments, run the load test and print a summary"""
+    parser = argparse.ArgumentParser(description="Load test the reservation HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="fraction of requests that book")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the request mix")
+    args = parser.parse_args()
+    
+    print(f"🚦 Load testing http://{args.host}:{args.port} with {args.clients} clients for {args.duration}s")
+    latencies, errors, conflicts, elapsed = asyncio.run(
+        run_load_test(args.host, args.port, args.clients, args.duration, args.write_ratio, args.seed)
+    )
+    
+    total = sum(len(samples) for samples in latencies.values())
+    failed = sum(errors.values()) + sum(conflicts.values())
+    print(f"\n   {'request':<10}{'count':>8}{'errors':>8}{'409s':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for kind, samples in sorted(latencies.items()):
+        summary = summarize(samples)
+        print(f"   {kind:<10}{summary['count']:>8}{errors.get(kind, 0):>8}{conflicts.get(kind, 0):>8}"
+              f"{summary['p50_ms']:>10.2f}{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}")
+    print(f"\n✅ {total} requests in {elapsed:.1f}s: {total / elapsed:,.0f} requests/s, "
+          f"{(total - failed) / elapsed:,.0f} successful/s")
+    if conflicts:
+        print(f"⚠️  {sum(conflicts.values())} bookings hit an already booked seat (409)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional time-to-live per entry.
+
+    Keeps hit, miss and eviction counters (evictions count entries pushed
+    out by the size limit or expired by the TTL) so the cache can be sized.
+    
+    Every invalidate() or clear() bumps `generation`. A reader that reads
+    it before fetching a value and passes it to put() has the put skipped
+    if a write invalidated the cache in between, so the value it fetched
+    may be older than the write.
+    """
+    
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+    
+    def get(self, key):
+        """Return (True, value) on a hit or (False, None) on a miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self.entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return False, None
+    
+    def put(self, key, value, generation=None):
+        """Store a value, evicting the least recently used entry when full.
+        
+        With a generation, the value is dropped if the cache has been
+        invalidated since that generation was read.
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, key):
+        """Drop one entry if present"""
+        with self.lock:
+            self.entries.pop(key, None)
+            self.generation += 1
+    
+    def clear(self):
+        """Drop every entry"""
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+    
+    def stats(self):
+        """Return the cache counters and current size"""
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -1,12 +1,28 @@
+import os
+import time
+from startup_timer import StartupTimer
+
+# Time startup from before the GUI toolkit is imported
+startup_timer = StartupTimer(budget_ms=1500, start=time.perf_counter())
+
 import tkinter as tk
 from tkinter import ttk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from database import db
+from instrumentation import metrics
+from query_worker import QueryWorker
 from home import HomePage
-from booking import BookingPage
-from reservations import ReservationsPage
-from edit_reservation import EditReservationPage
+
+startup_timer.mark("imports")
+
+# FLIGHTS_METRICS=<file> times database calls and page actions and writes a
+# JSON snapshot to that file on exit; FLIGHTS_SLOW_QUERY_MS=<ms> also prints
+# calls slower than that with their query plans
+METRICS_FILE = os.environ.get("FLIGHTS_METRICS")
+SLOW_QUERY_MS = os.environ.get("FLIGHTS_SLOW_QUERY_MS")
+if METRICS_FILE or SLOW_QUERY_MS:
+    metrics.enable(slow_query_ms=float(SLOW_QUERY_MS) if SLOW_QUERY_MS else None)
 
 class FlightReservationApp:
     def __init__(self):
@@ -20,20 +36,34 @@ class FlightReservationApp:
         
         # Center the window
         self.center_window()
+        startup_timer.mark("window")
+        
+        # Run database queries off the Tk main thread; the worker opens
+        # its own connection in the background
+        self.worker = QueryWorker(self.root, db.db_name, instrumentation=metrics if metrics.enabled else None)
         
         # Initialize pages
         self.current_page = None
         self.pages = {}
         
-        # Create pages
+        # Register page factories; pages are built on first navigation
         self.create_pages()
         
         # Show home page initially
         self.show_home_page()
+        startup_timer.mark("home page")
+        
+        # Report startup time once the first frame has been drawn
+        self.root.after_idle(self.on_first_frame)
         
         # Bind window close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
+    def on_first_frame(self):
+        """Finish startup timing when the main loop first goes idle"""
+        startup_timer.mark("first frame")
+        startup_timer.report()
+    
     def center_window(self):
         """Center the window on the screen"""
         self.root.update_idletasks()
@@ -44,29 +74,66 @@ class FlightReservationApp:
         self.root.geometry(f"{width}x{height}+{x}+{y}")
     
     def create_pages(self):
-        """Create all application pages"""
-        # Create pages with navigation callbacks
-        self.pages['home'] = HomePage(
+        """Register the factories that build each application page"""
+        self.page_factories = {
+            'home': self.create_home_page,
+            'booking': self.create_booking_page,
+            'reservations': self.create_reservations_page,
+            'edit': self.create_edit_page,
+            'stats': self.create_stats_page,
+        }
+    
+    def get_page(self, name):
+        """Get a page, building it the first time it is shown"""
+        if name not in self.pages:
+            self.pages[name] = self.page_factories[name]()
+        return self.pages[name]
+    
+    def create_home_page(self):
+        """Create the home page"""
+        return HomePage(
             self.root,
             self.show_booking_page,
-            self.show_reservations_page
+            self.show_reservations_page,
+            self.show_stats_page
         )
-        
-        self.pages['booking'] = BookingPage(
+    
+    def create_booking_page(self):
+        """Create the booking page"""
+        from booking import BookingPage
+        return BookingPage(
             self.root,
-            self.show_home_page
+            self.show_home_page,
+            self.worker
         )
-        
-        self.pages['reservations'] = ReservationsPage(
+    
+    def create_reservations_page(self):
+        """Create the reservations page"""
+        from reservations import ReservationsPage
+        return ReservationsPage(
             self.root,
             self.show_home_page,
-            self.show_edit_page
+            self.show_edit_page,
+            self.worker
         )
-        
-        self.pages['edit'] = EditReservationPage(
+    
+    def create_edit_page(self):
+        """Create the edit reservation page"""
+        from edit_reservation import EditReservationPage
+        return EditReservationPage(
             self.root,
             self.show_home_page,
-            self.show_reservations_page
+            self.show_reservations_page,
+            self.worker
+        )
+    
+    def create_stats_page(self):
+        """Create the statistics page"""
+        from stats import StatsPage
+        return StatsPage(
+            self.root,
+            self.show_home_page,
+            self.worker
         )
     
     def hide_current_page(self):
@@ -77,42 +144,55 @@ class FlightReservationApp:
     def show_home_page(self):
         """Show the home page"""
         self.hide_current_page()
-        self.pages['home'].show()
+        self.get_page('home').show()
         self.current_page = 'home'
         self.root.title("Flight Reservation System - Home")
     
     def show_booking_page(self):
         """Show the booking page"""
         self.hide_current_page()
-        self.pages['booking'].show()
+        self.get_page('booking').show()
         self.current_page = 'booking'
         self.root.title("Flight Reservation System - Book Flight")
     
     def show_reservations_page(self):
         """Show the reservations page"""
         self.hide_current_page()
-        self.pages['reservations'].show()
+        self.get_page('reservations').show()
         self.current_page = 'reservations'
         self.root.title("Flight Reservation System - View Reservations")
     
+    def show_stats_page(self):
+        """Show the statistics page"""
+        self.hide_current_page()
+        self.get_page('stats').show()
+        self.current_page = 'stats'
+        self.root.title("Flight Reservation System - Statistics")
+    
     def show_edit_page(self, reservation_id=None):
         """Show the edit reservation page"""
         self.hide_current_page()
-        self.pages['edit'].show()
+        self.get_page('edit').show()
         if reservation_id:
-            self.pages['edit'].load_reservation(reservation_id)
+            self.get_page('edit').load_reservation(reservation_id)
         self.current_page = 'edit'
         self.root.title("Flight Reservation System - Edit Reservation")
     
     def on_closing(self):
         """Handle application closing"""
         try:
-            # Close database connection
+            # Stop the background worker and close database connection
+            self.worker.close()
             db.close_connection()
             print("Database connection closed")
         except:
             pass
         
+        if METRICS_FILE:
+            with open(METRICS_FILE, "w", encoding="utf-8") as f:
+                f.write(metrics.to_json())
+            print(f"📈 Metrics written to {METRICS_FILE}")
+        
         # Destroy the window
         self.root.destroy()
     
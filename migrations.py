@@ -0,0 +1,228 @@
+# Schema migrations for the reservations database.
+#
+# Each migration is (version, description, steps) where a step is either an
+# SQL statement or a callable taking the connection. Migrations run in order
+# inside one transaction each, and the schema version is tracked in
+# PRAGMA user_version so each one is applied exactly once per database.
+# Append new migrations to the end; never edit one that has shipped.
+
+from seat_inventory import normalize_seat
+
+def resolve_double_bookings(conn):
+    """Normalize stored seat labels and move every double-booked seat but the first aside.
+    
+    Seats used to be free text, so '12a', ' 12A' and '12A' may all be
+    stored for one flight and date, and nothing stopped the same seat being
+    booked twice. The earliest booking keeps the seat; later ones get the
+    seat label '<seat>-DUP<id>' so the unique seat index can be built
+    without losing a reservation, and can be given a real seat by editing.
+    """
+    conn.create_function("normalize_seat", 1, normalize_seat, deterministic=True)
+    conn.execute("UPDATE reservations SET seat_number = normalize_seat(seat_number) "
+                 "WHERE seat_number != normalize_seat(seat_number)")
+    moved = conn.execute('''
+        UPDATE reservations SET seat_number = seat_number || '-DUP' || id
+        WHERE EXISTS (
+            SELECT 1 FROM reservations AS earlier
+            WHERE earlier.flight_number = reservations.flight_number AND earlier.date = reservations.date
+              AND earlier.seat_number = reservations.seat_number AND earlier.id < reservations.id
+        )
+    ''').rowcount
+    if moved:
+        print(f"Moved {moved} double-booked reservation(s) to seats ending in -DUP<id>; edit them to reassign a seat")
+
+MIGRATIONS = [
+    (1, "Index reservations for list ordering and flight/date lookups", [
+        # Serves ORDER BY created_at DESC, id DESC and its keyset pagination
+        "CREATE INDEX IF NOT EXISTS idx_reservations_created_at ON reservations (created_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_reservations_flight_date ON reservations (flight_number, date)",
+        "CREATE INDEX IF NOT EXISTS idx_reservations_date ON reservations (date)",
+    ]),
+    (2, "Add seat layouts and prevent double-booking a seat", [
+        '''
+        CREATE TABLE IF NOT EXISTS flights (
+            flight_number TEXT PRIMARY KEY,
+            seat_rows INTEGER NOT NULL,
+            seat_letters TEXT NOT NULL DEFAULT 'ABCDEF'
+        )
+        ''',
+        resolve_double_bookings,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_reservations_seat ON reservations (flight_number, date, seat_number)",
+        # The unique index covers (flight_number, date) lookups as well
+        "DROP INDEX IF EXISTS idx_reservations_flight_date",
+    ]),
+    (3, "Track monthly archive databases", [
+        '''
+        CREATE TABLE IF NOT EXISTS archive_partitions (
+            month TEXT PRIMARY KEY,
+            file_name TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (4, "Version reservations for optimistic concurrency control", [
+        # Bumped by every update_reservation, which only applies if it still matches
+        "ALTER TABLE reservations ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+    ]),
+    (5, "Log reservation changes for incremental refreshes", [
+        '''
+        CREATE TABLE IF NOT EXISTS reservation_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            reservation_id INTEGER NOT NULL,
+            operation TEXT NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS reservation_changes_ai AFTER INSERT ON reservations BEGIN
+            INSERT INTO reservation_changes (reservation_id, operation) VALUES (new.id, 'insert');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS reservation_changes_au AFTER UPDATE ON reservations BEGIN
+            INSERT INTO reservation_changes (reservation_id, operation) VALUES (new.id, 'update');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS reservation_changes_ad AFTER DELETE ON reservations BEGIN
+            INSERT INTO reservation_changes (reservation_id, operation) VALUES (old.id, 'delete');
+        END
+        ''',
+    ]),
+    (6, "Keep booking counts per flight and date, per route and per day", [
+        '''
+        CREATE TABLE IF NOT EXISTS flight_date_stats (
+            flight_number TEXT NOT NULL,
+            date TEXT NOT NULL,
+            bookings INTEGER NOT NULL,
+            PRIMARY KEY (flight_number, date)
+        ) WITHOUT ROWID
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_flight_date_stats_date ON flight_date_stats (date)",
+        '''
+        CREATE TABLE IF NOT EXISTS route_stats (
+            departure TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            bookings INTEGER NOT NULL,
+            PRIMARY KEY (departure, destination)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            date TEXT PRIMARY KEY,
+            bookings INTEGER NOT NULL
+        ) WITHOUT ROWID
+        ''',
+        # Count the reservations stored before the triggers existed
+        '''
+        INSERT INTO flight_date_stats
+        SELECT flight_number, date, COUNT(*) FROM reservations GROUP BY flight_number, date
+        ''',
+        '''
+        INSERT INTO route_stats
+        SELECT departure, destination, COUNT(*) FROM reservations GROUP BY departure, destination
+        ''',
+        "INSERT INTO daily_stats SELECT date, COUNT(*) FROM reservations GROUP BY date",
+        '''
+        CREATE TRIGGER IF NOT EXISTS reservation_stats_ai AFTER INSERT ON reservations BEGIN
+            INSERT INTO flight_date_stats VALUES (new.flight_number, new.date, 1)
+                ON CONFLICT (flight_number, date) DO UPDATE SET bookings = bookings + 1;
+            INSERT INTO route_stats VALUES (new.departure, new.destination, 1)
+                ON CONFLICT (departure, destination) DO UPDATE SET bookings = bookings + 1;
+            INSERT INTO daily_stats VALUES (new.date, 1)
+                ON CONFLICT (date) DO UPDATE SET bookings = bookings + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS reservation_stats_ad AFTER DELETE ON reservations BEGIN
+            UPDATE flight_date_stats SET bookings = bookings - 1
+                WHERE flight_number = old.flight_number AND date = old.date;
+            DELETE FROM flight_date_stats WHERE flight_number = old.flight_number AND date = old.date AND bookings <= 0;
+            UPDATE route_stats SET bookings = bookings - 1
+                WHERE departure = old.departure AND destination = old.destination;
+            DELETE FROM route_stats WHERE departure = old.departure AND destination = old.destination AND bookings <= 0;
+            UPDATE daily_stats SET bookings = bookings - 1 WHERE date = old.date;
+            DELETE FROM daily_stats WHERE date = old.date AND bookings <= 0;
+        END
+        ''',
+        # Only changes that move a booking between groups touch the counts
+        '''
+        CREATE TRIGGER IF NOT EXISTS reservation_stats_au AFTER UPDATE OF flight_number, departure, destination, date
+        ON reservations BEGIN
+            UPDATE flight_date_stats SET bookings = bookings - 1
+                WHERE flight_number = old.flight_number AND date = old.date;
+            DELETE FROM flight_date_stats WHERE flight_number = old.flight_number AND date = old.date AND bookings <= 0;
+            UPDATE route_stats SET bookings = bookings - 1
+                WHERE departure = old.departure AND destination = old.destination;
+            DELETE FROM route_stats WHERE departure = old.departure AND destination = old.destination AND bookings <= 0;
+            UPDATE daily_stats SET bookings = bookings - 1 WHERE date = old.date;
+            DELETE FROM daily_stats WHERE date = old.date AND bookings <= 0;
+            INSERT INTO flight_date_stats VALUES (new.flight_number, new.date, 1)
+                ON CONFLICT (flight_number, date) DO UPDATE SET bookings = bookings + 1;
+            INSERT INTO route_stats VALUES (new.departure, new.destination, 1)
+                ON CONFLICT (departure, destination) DO UPDATE SET bookings = bookings + 1;
+            INSERT INTO daily_stats VALUES (new.date, 1)
+                ON CONFLICT (date) DO UPDATE SET bookings = bookings + 1;
+        END
+        ''',
+    ]),
+    (7, "Refuse bookings on travel dates that have been archived", [
+        # Seats of archived dates live in the archive databases, out of reach of
+        # the unique seat index, so no booking may land on or move to those dates
+        "ALTER TABLE archive_partitions ADD COLUMN archived_before TEXT",
+        # Archives made before the cutoff was recorded close their whole month
+        "UPDATE archive_partitions SET archived_before = date(month || '-01', '+1 month')",
+        '''
+        CREATE TRIGGER IF NOT EXISTS reservations_archived_bi BEFORE INSERT ON reservations
+        WHEN EXISTS (
+            SELECT 1 FROM archive_partitions WHERE month = substr(new.date, 1, 7) AND new.date < archived_before
+        ) BEGIN
+            SELECT RAISE(ABORT, 'Travel date has been archived');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS reservations_archived_bu BEFORE UPDATE OF flight_number, date, seat_number
+        ON reservations
+        WHEN (new.flight_number IS NOT old.flight_number OR new.date IS NOT old.date
+              OR new.seat_number IS NOT old.seat_number)
+            AND EXISTS (
+                SELECT 1 FROM archive_partitions WHERE month = substr(new.date, 1, 7) AND new.date < archived_before
+            ) BEGIN
+            SELECT RAISE(ABORT, 'Travel date has been archived');
+        END
+        ''',
+    ]),
+]
+
+def get_schema_version(conn):
+    """Return the schema version recorded in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def apply_migrations(conn, migrations=MIGRATIONS):
+    """Apply all pending migrations, returning the list of versions applied"""
+    current = get_schema_version(conn)
+    applied = []
+    for version, description, steps in migrations:
+        if version <= current:
+            continue
+        # Take the write lock first; another process may be migrating too
+        conn.execute("BEGIN IMMEDIATE")
+        if get_schema_version(conn) >= version:
+            conn.execute("ROLLBACK")
+            continue
+        try:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            # PRAGMA does not accept bound parameters
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"Applied migration {version}: {description}")
+        applied.append(version)
+    return applied
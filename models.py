@@ -0,0 +1,105 @@
+class Reservation:
+    """One row of the reservations table.
+    
+    Uses __slots__ instead of a per-instance __dict__, so a record costs
+    about as much memory as the tuple it replaces while fields are read by
+    name (reservation.seat_number) rather than by position. Records are
+    shared through the reservation cache; treat them as read-only.
+    
+    `version` starts at 1 and goes up by one with every update; pass it
+    back to Database.update_reservation so an edit based on an outdated
+    copy is rejected instead of overwriting someone else's changes.
+    """
+    
+    __slots__ = (
+        "id", "name", "flight_number", "departure", "destination", "date", "seat_number", "created_at", "version"
+    )
+    
+    id: int
+    name: str
+    flight_number: str
+    departure: str
+    destination: str
+    date: str
+    seat_number: str
+    created_at: str
+    version: int
+    
+    def __init__(self, id, name, flight_number, departure, destination, date, seat_number, created_at=None,
+                 version=1):
+        self.id = id
+        self.name = name
+        self.flight_number = flight_number
+        self.departure = departure
+        self.destination = destination
+        self.date = date
+        self.seat_number = seat_number
+        self.created_at = created_at
+        self.version = version
+    
+    @classmethod
+    def from_row(cls, cursor, row):
+        """Row factory building a Reservation from a reservations row"""
+        return cls(*row)
+    
+    def fields(self):
+        """The bookable fields, in the order add_reservation/update_reservation take them"""
+        return (self.name, self.flight_number, self.departure, self.destination, self.date, self.seat_number)
+    
+    def as_tuple(self):
+        """All columns in table order"""
+        return (self.id,) + self.fields() + (self.created_at, self.version)
+    
+    def as_dict(self):
+        """All columns keyed by column name"""
+        return dict(zip(self.__slots__, self.as_tuple()))
+    
+    def __iter__(self):
+        return iter(self.as_tuple())
+    
+    def __eq__(self, other):
+        if not isinstance(other, Reservation):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+    
+    def __repr__(self):
+        return f"Reservation({', '.join(f'{name}={value!r}' for name, value in self.as_dict().items())})"
+
+class VersionConflict:
+    """Result of an update_reservation whose expected version was out of date.
+    
+    Falsy, so callers that only check for success treat it as a failed
+    update. `current` is the reservation as it is now stored, or None if it
+    has been deleted.
+    """
+    
+    __slots__ = ("current",)
+    
+    def __init__(self, current):
+        self.current = current
+    
+    def __bool__(self):
+        return False
+    
+    def __repr__(self):
+        return f"VersionConflict(current={self.current!r})"
+
+class ReservationChange:
+    """One entry of the reservation change log.
+    
+    `operation` is "insert", "update" or "delete". `reservation` is the
+    reservation as it is stored now (so it may already include later
+    changes), or None once it has been deleted.
+    """
+    
+    __slots__ = ("seq", "operation", "reservation_id", "reservation")
+    
+    def __init__(self, seq, operation, reservation_id, reservation):
+        self.seq = seq
+        self.operation = operation
+        self.reservation_id = reservation_id
+        self.reservation = reservation
+    
+    def __repr__(self):
+        return (f"ReservationChange(seq={self.seq!r}, operation={self.operation!r}, "
+                f"reservation_id={self.reservation_id!r}, reservation={self.reservation!r})")
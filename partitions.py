@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Archival job for Flight Reservation System
+Moves reservations whose travel date has passed out of the active database
+into monthly archive databases next to it (e.g. flights_archive_2024-12.db),
+so lists, searches and seat checks only work on upcoming travel
+
+Usage:
+    python partitions.py                      # archive travel more than 90 days ago
+    python partitions.py --older-than-days 30
+    python partitions.py --before 2025-01-01 --db flights.db
+"""
+
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Same columns as the active reservations table; archived rows keep their ids
+ARCHIVE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS archive.reservations (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        flight_number TEXT NOT NULL,
+        departure TEXT NOT NULL,
+        destination TEXT NOT NULL,
+        date TEXT NOT NULL,
+        seat_number TEXT NOT NULL,
+        created_at TIMESTAMP,
+        version INTEGER NOT NULL DEFAULT 1
+    );
+    CREATE INDEX IF NOT EXISTS archive.idx_reservations_date ON reservations (date);
+    CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_reservations_seat ON reservations (flight_number, date, seat_number);
+'''
+
+def month_key(day):
+    """Partition key ("YYYY-MM") of a YYYY-MM-DD date"""
+    return day[:7]
+
+def month_bounds(key):
+    """First day of a month and first day of the next one, as YYYY-MM-DD"""
+    year, month = int(key[:4]), int(key[5:7])
+    start = date(year, month, 1)
+    end = date(year + month // 12, month % 12 + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+def months_between(first_day, last_day):
+    """Partition keys of every month from first_day to last_day inclusive"""
+    keys = []
+    key = month_key(first_day)
+    while key <= month_key(last_day):
+        keys.append(key)
+        key = month_key(month_bounds(key)[1])
+    return keys
+
+def archive_file_name(db_name, key):
+    """File name of the archive database holding one month"""
+    stem, extension = os.path.splitext(os.path.basename(db_name))
+    return f"{stem}_archive_{key}{extension or '.db'}"
+
+@contextmanager
+def attached(conn, path, alias="archive"):
+    """Attach a database file to a connection for the duration of the block"""
+    conn.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+    try:
+        yield conn
+    finally:
+        conn.execute(f"DETACH DATABASE {alias}")
+
+def main():
+    """Archive reservations older than the requested cutoff"""
+    parser = argparse.ArgumentParser(description="Move past reservations into monthly archive databases")
+    parser.add_argument("--db", default="flights.db", help="active database file (default: flights.db)")
+    parser.add_argument("--before", help="archive travel dates before this YYYY-MM-DD date")
+    parser.add_argument("--older-than-days", type=int, default=90,
+                        help="archive travel dates more than this many days ago (default: 90)")
+    parser.add_argument("--keep-changes", type=int, default=100_000,
+                        help="entries of the change log to keep (default: 100000)")
+    args = parser.parse_args()
+    
+    from database import Database
+    
+    before = args.before or (date.today() - timedelta(days=args.older_than_days)).isoformat()
+    print(f"📦 Archiving reservations travelling before {before}...")
+    db = Database(args.db)
+    try:
+        summary = db.archive_reservations(before)
+        pruned = db.prune_changes(args.keep_changes)
+    finally:
+        db.close_connection()
+    
+    for key, moved in summary["months"]:
+        print(f"   {key}: {moved:,} reservations -> {archive_file_name(args.db, key)}")
+    print(f"✅ Archived {summary['archived']:,} reservations")
+    if summary["kept"]:
+        print(f"⚠️  Kept {summary['kept']:,} reservations whose seat is already taken in the archive")
+    print(f"🧹 Pruned {pruned:,} change log entries")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
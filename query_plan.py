@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Query plan checker for Flight Reservation System
+Runs EXPLAIN QUERY PLAN for every query the Database class issues and
+flags full table scans and temporary sorts
+
+Usage:
+    python query_plan.py
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import Database
+
+SAMPLE_RESERVATION = ("Plan Checker", "QP100", "Cairo", "Dubai", "2024-12-25", "1A")
+
+# Summary tables hold one row per group (route, day, ...), never one per
+# reservation, so reading all of them is expected
+SUMMARY_TABLES = ("flight_date_stats", "route_stats", "daily_stats")
+
+def capture_queries(db, action):
+    """Run action() and return the distinct SQL statements it sent to the database"""
+    statements = []
+    
+    def trace(sql):
+        sql = " ".join(sql.split())
+        if sql not in statements:
+            statements.append(sql)
+    
+    db.pool.set_trace_callback(trace)
+    try:
+        action()
+    finally:
+        db.pool.set_trace_callback(None)
+    return statements
+
+def exercise_database(db):
+    """Call every Database query method once with sample values"""
+    db.define_flight(SAMPLE_RESERVATION[1], 30)
+    db.add_reservation(*SAMPLE_RESERVATION)
+    db.bulk_add_reservations([SAMPLE_RESERVATION[:5] + ("2A",)])
+    db.is_seat_available(SAMPLE_RESERVATION[1], SAMPLE_RESERVATION[4], "3A")
+    db.get_free_seats(SAMPLE_RESERVATION[1], SAMPLE_RESERVATION[4])
+    page = db.get_reservations_page(10)
+    db.get_reservations_page(10, after=(page[-1].created_at, page[-1].id))
+    db.get_all_reservations()
+    db.search_reservations("plan")
+    db.get_flight_load(SAMPLE_RESERVATION[1])
+    db.get_flight_load(date=SAMPLE_RESERVATION[4])
+    db.get_flight_load()
+    db.get_route_stats()
+    db.get_daily_stats(SAMPLE_RESERVATION[4], SAMPLE_RESERVATION[4])
+    db.get_reservations_by_date(SAMPLE_RESERVATION[4], SAMPLE_RESERVATION[4], SAMPLE_RESERVATION[1])
+    db.get_reservations_by_date(SAMPLE_RESERVATION[4])
+    db.get_archived_months()
+    reservation_id = page[0].id
+    db.get_reservation_by_id(reservation_id)
+    db.update_reservation(reservation_id, page[0].version, *page[0].fields())
+    db.delete_reservation(reservation_id)
+    db.changes_since(db.get_change_seq() - 2)
+    db.prune_changes(10)
+
+def explain(conn, sql):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+    # Statements traced without expanded parameters still contain ?
+    params = [None] * sql.count("?")
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+def is_problem(detail):
+    """A plan step is a problem if it scans a table without an index or sorts in a temp B-tree"""
+    if detail.startswith("SCAN ") and "USING" not in detail and "VIRTUAL TABLE" not in detail:
+        return detail.split()[1] not in SUMMARY_TABLES
+    return "USE TEMP B-TREE" in detail
+
+def check_query_plans(db):
+    """Explain every query the Database issues.
+    
+    Returns a list of (sql, plan details, problem details) tuples, one per
+    distinct statement that produced a query plan.
+    """
+    statements = capture_queries(db, lambda: exercise_database(db))
+    report = []
+    with db.pool.writer() as conn:
+        for sql in statements:
+            keyword = sql.split(" ", 1)[0].upper()
+            if keyword not in ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH"):
+                continue
+            # Statements SQLite modules such as FTS5 run on their shadow tables
+            if "'main'." in sql:
+                continue
+            plan = explain(conn, sql)
+            if plan:
+                report.append((sql, plan, [detail for detail in plan if is_problem(detail)]))
+    return report
+
+def main():
+    """Check query plans against a scratch database with the current schema"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "plan_check.db"))
+        try:
+            report = check_query_plans(db)
+        finally:
+            db.close_connection()
+    
+    problems = 0
+    for sql, plan, flagged in report:
+        print(f"{'❌' if flagged else '✅'} {sql}")
+        for detail in plan:
+            print(f"     {'!!' if detail in flagged else '  '} {detail}")
+        problems += bool(flagged)
+    print(f"\n{len(report)} queries checked, {problems} with full scans or temp sorts")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+from connection_pool import is_interrupted
+from database import Database
+from instrumentation import count_rows
+
+class QueryWorker:
+    """Run Database calls on a background thread with its own connection.
+    
+    Results are handed back to the Tk main thread by polling with
+    root.after, so callbacks may safely touch widgets. Jobs submitted with
+    a key supersede earlier jobs with the same key: queued ones are
+    skipped, a running one is interrupted, and stale results are dropped.
+    
+    With instrumentation, the worker's Database calls are timed and each
+    job is also recorded as "worker.<method>" from submit to the moment its
+    callback has run, which is the latency a page action actually sees.
+    """
+    POLL_INTERVAL_MS = 20
+    
+    def __init__(self, root, db_name="flights.db", instrumentation=None):
+        self.root = root
+        self.db_name = db_name
+        self.instrumentation = instrumentation
+        self.db = None
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.lock = threading.Lock()
+        self.generations = {}
+        self.debounce_ids = {}
+        self.running_key = None
+        self.thread = threading.Thread(target=self.run, name="QueryWorker", daemon=True)
+        self.thread.start()
+        self.poll_id = self.root.after(self.POLL_INTERVAL_MS, self.poll_results)
+    
+    def run(self):
+        """Worker thread loop: execute queued jobs one at a time"""
+        # The connection must be created on the thread that uses it
+        self.db = Database(self.db_name, instrumentation=self.instrumentation)
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            key, generation, method, args, callback, submitted = job
+            with self.lock:
+                if self.is_stale(key, generation):
+                    continue
+                self.running_key = key
+            failed = False
+            try:
+                result = getattr(self.db, method)(*args)
+            except Exception as e:
+                with self.lock:
+                    superseded = is_interrupted(e) and self.is_stale(key, generation)
+                if superseded:
+                    # Aborted by cancel() or a newer submit(); its result would be dropped anyway
+                    continue
+                print(f"Error running background query {method}: {e}")
+                result = None
+                failed = True
+            finally:
+                with self.lock:
+                    self.running_key = None
+            self.results.put((key, generation, callback, result, method, submitted, failed))
+        self.db.close_connection()
+    
+    def is_stale(self, key, generation):
+        """Check whether a job has been superseded by a newer one"""
+        return key is not None and self.generations.get(key) != generation
+    
+    def submit(self, method, *args, callback=None, key=None):
+        """Queue a Database method call; callback(result) runs on the Tk thread"""
+        with self.lock:
+            generation = None
+            if key is not None:
+                generation = self.generations.get(key, 0) + 1
+                self.generations[key] = generation
+                if self.running_key == key and self.db is not None:
+                    # Abort the superseded query instead of waiting for it
+                    self.db.interrupt()
+        self.jobs.put((key, generation, method, args, callback, time.perf_counter()))
+    
+    def debounce(self, key, delay_ms, method, *args, callback=None):
+        """Submit a keyed job after delay_ms, restarting the delay on every call"""
+        self.cancel(key)
+        self.debounce_ids[key] = self.root.after(
+            delay_ms, lambda: self.fire_debounced(key, method, args, callback)
+        )
+    
+    def fire_debounced(self, key, method, args, callback):
+        """Submit a debounced job once its delay has elapsed"""
+        self.debounce_ids.pop(key, None)
+        self.submit(method, *args, callback=callback, key=key)
+    
+    def cancel(self, key):
+        """Drop any pending, queued or running job with this key"""
+        after_id = self.debounce_ids.pop(key, None)
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+        with self.lock:
+            self.generations[key] = self.generations.get(key, 0) + 1
+            if self.running_key == key and self.db is not None:
+                self.db.interrupt()
+    
+    def poll_results(self):
+        """Deliver finished results to their callbacks on the Tk thread"""
+        while True:
+            try:
+                key, generation, callback, result, method, submitted, failed = self.results.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                stale = self.is_stale(key, generation)
+            if not stale and callback is not None:
+                callback(result)
+            if not stale and self.instrumentation is not None and self.instrumentation.enabled:
+                self.instrumentation.record(
+                    f"worker.{method}", time.perf_counter() - submitted, count_rows(result), failed
+                )
+        self.poll_id = self.root.after(self.POLL_INTERVAL_MS, self.poll_results)
+    
+    def close(self):
+        """Stop polling and shut down the worker thread"""
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
+        for after_id in self.debounce_ids.values():
+            self.root.after_cancel(after_id)
+        self.debounce_ids.clear()
+        self.jobs.put(None)
+        self.thread.join(timeout=2)
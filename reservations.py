@@ -2,17 +2,36 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from database import db
+from instrumentation import timed
 
 class ReservationsPage:
-    def __init__(self, parent, show_home_page, show_edit_page):
+    SEARCH_LIMIT = 200
+    SEARCH_DELAY_MS = 250
+    PAGE_SIZE = 100
+    # Fetch the next page once the view is scrolled past this fraction
+    PREFETCH_THRESHOLD = 0.8
+    # How often the visible list picks up changes made elsewhere
+    POLL_INTERVAL_MS = 2000
+    CHANGES_LIMIT = 500
+    
+    def __init__(self, parent, show_home_page, show_edit_page, worker):
         self.parent = parent
         self.show_home_page = show_home_page
         self.show_edit_page = show_edit_page
+        self.worker = worker
         self.frame = None
         self.tree = None
+        self.scrollbar = None
+        self.page_cursor = None
+        self.has_more = False
+        self.page_pending = False
+        self.loaded_count = 0
+        # Sequence number of the last change-log entry applied to the list
+        self.change_seq = None
+        self.search_active = False
+        self.poll_job = None
+        # Rows are loaded by show(), not at construction
         self.create_widgets()
-        self.load_reservations()
     
     def create_widgets(self):
         """Create the reservations page widgets"""
@@ -72,12 +91,12 @@ class ReservationsPage:
         self.tree.column("Seat Number", width=100, anchor="center")
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
         
         # Pack tree and scrollbar
         self.tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.scrollbar.pack(side="right", fill="y")
         
         # Buttons frame
         buttons_frame = ttk.Frame(self.frame)
@@ -122,41 +141,111 @@ class ReservationsPage:
         )
         self.status_label.pack(pady=(10, 0))
     
+    @timed("ui.load_reservations")
     def load_reservations(self):
-        """Load all reservations from database"""
+        """Load the first page of reservations from database"""
+        # Drop any search or change refresh still waiting on the worker; changes
+        # fetched for the old rows must not be applied to the reloaded list
+        self.worker.cancel("search")
+        self.worker.cancel("changes")
+        self.change_seq = None
+        
         # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
+        self.page_cursor = None
+        self.has_more = True
+        self.loaded_count = 0
+        self.search_active = False
+        
+        # Jobs run in order, so no change after this seq is missed by the first page
+        self.worker.submit("get_change_seq", callback=self.set_change_seq)
+        self.load_next_page()
+    
+    def set_change_seq(self, seq):
+        """Remember where in the change log the loaded rows start"""
+        self.change_seq = seq or 0
+    
+    def load_next_page(self):
+        """Request the next page of reservations from the background worker"""
+        if not self.has_more:
+            self.page_pending = False
+            return
         
-        # Get reservations from database
-        reservations = db.get_all_reservations()
+        self.page_pending = True
+        self.worker.submit(
+            "get_reservations_page", self.PAGE_SIZE, self.page_cursor,
+            callback=self.append_page,
+            key="page"
+        )
+    
+    def append_page(self, reservations):
+        """Append a fetched page of reservations to the treeview"""
+        self.page_pending = False
+        reservations = reservations or []
         
-        # Add to treeview
+        # Add to treeview; rows already added from the change log are skipped
         for reservation in reservations:
-            self.tree.insert("", "end", values=reservation)
+            if not self.tree.exists(str(reservation.id)):
+                self.tree.insert("", "end", iid=str(reservation.id), values=reservation.as_tuple())
+                self.loaded_count += 1
         
-        # Update status
-        self.status_label.config(text=f"Total Reservations: {len(reservations)}")
+        self.has_more = len(reservations) == self.PAGE_SIZE
+        if reservations:
+            last = reservations[-1]
+            self.page_cursor = (last.created_at, last.id)
+        self.update_status()
+    
+    def update_status(self):
+        """Show how many reservations are listed"""
+        if self.has_more:
+            self.status_label.config(text=f"Showing {self.loaded_count} reservations (scroll for more)")
+        else:
+            self.status_label.config(text=f"Total Reservations: {self.loaded_count}")
     
+    def on_tree_scroll(self, first, last):
+        """Update the scrollbar and fetch more rows as the end comes into view"""
+        self.scrollbar.set(first, last)
+        if self.has_more and not self.page_pending and float(last) >= self.PREFETCH_THRESHOLD:
+            self.load_next_page()
+    
+    @timed("ui.search_reservations")
     def search_reservations(self, event=None):
         """Search reservations based on entered text"""
-        search_term = self.search_entry.get().lower()
+        search_term = self.search_entry.get().strip()
+        if not search_term:
+            self.load_reservations()
+            return
         
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Stop paging; search results replace the list once they arrive
+        self.worker.cancel("page")
+        self.page_pending = False
+        self.has_more = False
+        self.status_label.config(text="Searching…")
         
-        # Get all reservations
-        reservations = db.get_all_reservations()
+        # Wait for typing to pause; a newer keystroke supersedes this search
+        self.worker.debounce(
+            "search", self.SEARCH_DELAY_MS,
+            "search_reservations", search_term, self.SEARCH_LIMIT,
+            callback=self.show_search_results
+        )
+    
+    def show_search_results(self, reservations):
+        """Replace the treeview contents with search results"""
+        reservations = reservations or []
         
-        # Filter and add matching items
+        # Clear existing items; search results are not paginated
+        self.tree.delete(*self.tree.get_children())
+        self.search_active = True
+        
+        # Add matching items
         for reservation in reservations:
-            # Search in name, flight number, departure, destination
-            if (search_term in str(reservation[1]).lower() or  # name
-                search_term in str(reservation[2]).lower() or  # flight_number
-                search_term in str(reservation[3]).lower() or  # departure
-                search_term in str(reservation[4]).lower()):   # destination
-                self.tree.insert("", "end", values=reservation)
+            self.tree.insert("", "end", iid=str(reservation.id), values=reservation.as_tuple())
+        
+        # Update status
+        if len(reservations) >= self.SEARCH_LIMIT:
+            self.status_label.config(text=f"Showing first {self.SEARCH_LIMIT} matches")
+        else:
+            self.status_label.config(text=f"Matching Reservations: {len(reservations)}")
     
     def edit_selected(self):
         """Edit the selected reservation"""
@@ -186,17 +275,78 @@ class ReservationsPage:
         
         # Confirm deletion
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete the reservation for {passenger_name}?"):
-            if db.delete_reservation(reservation_id):
-                messagebox.showinfo("Success", "Reservation deleted successfully!")
-                self.load_reservations()
-            else:
-                messagebox.showerror("Error", "Failed to delete reservation!")
+            self.worker.submit("delete_reservation", reservation_id, callback=self.on_deleted)
+    
+    def on_deleted(self, success):
+        """Report the result of a delete and refresh the list"""
+        if success:
+            messagebox.showinfo("Success", "Reservation deleted successfully!")
+            self.refresh_changes()
+        else:
+            messagebox.showerror("Error", "Failed to delete reservation!")
+    
+    def refresh_changes(self):
+        """Fetch the changes made since the list was loaded"""
+        if self.change_seq is None:
+            # Still loading; the load records where to start from
+            return
+        self.worker.submit(
+            "changes_since", self.change_seq, self.CHANGES_LIMIT,
+            callback=self.apply_changes,
+            key="changes"
+        )
+    
+    def apply_changes(self, changes):
+        """Apply logged inserts, updates and deletes to the listed rows"""
+        if changes is None:
+            # The change log has been pruned past what the list has seen
+            self.load_reservations()
+            return
+        if not changes:
+            return
+        self.change_seq = max(self.change_seq or 0, changes[-1].seq)
+        
+        # Only the latest state of each reservation matters
+        latest = {}
+        inserted = set()
+        for change in changes:
+            latest[change.reservation_id] = change
+            if change.operation == "insert":
+                inserted.add(change.reservation_id)
+        
+        for reservation_id, change in latest.items():
+            iid = str(reservation_id)
+            if change.reservation is None:
+                if self.tree.exists(iid):
+                    self.tree.delete(iid)
+                    self.loaded_count -= 1
+            elif self.tree.exists(iid):
+                self.tree.item(iid, values=change.reservation.as_tuple())
+            elif reservation_id in inserted and not self.search_active:
+                # New bookings are the newest, so they go on top
+                self.tree.insert("", 0, iid=iid, values=change.reservation.as_tuple())
+                self.loaded_count += 1
+        
+        if not self.search_active:
+            self.update_status()
+        if len(changes) == self.CHANGES_LIMIT:
+            self.refresh_changes()
+    
+    def poll_changes(self):
+        """Pick up changes made elsewhere while the page is visible"""
+        self.refresh_changes()
+        self.poll_job = self.frame.after(self.POLL_INTERVAL_MS, self.poll_changes)
     
     def show(self):
         """Show the reservations page"""
         self.frame.pack(fill="both", expand=True)
-        self.load_reservations()
+        if self.change_seq is None:
+            self.load_reservations()
+        self.poll_changes()
     
     def hide(self):
         """Hide the reservations page"""
+        if self.poll_job is not None:
+            self.frame.after_cancel(self.poll_job)
+            self.poll_job = None
         self.frame.pack_forget()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import re
+import threading
+
+# Seat layout used for flights without a row in the flights table
+DEFAULT_LAYOUT = (30, "ABCDEF")
+
+SEAT_PATTERN = re.compile(r"^(\d+)([A-Z])$")
+
+def normalize_seat(seat_number):
+    """Normalize a seat label so '12a' and ' 12 A' both become '12A'"""
+    return "".join(str(seat_number).split()).upper()
+
+class SeatMap:
+    """Occupied seats of one flight on one date.
+    
+    Seats in the layout are tracked as bits of an int, row-major, so a
+    lookup is a shift and a mask. Seat labels outside the layout (free text
+    from older bookings) are kept in a set so they are still counted.
+    """
+    
+    def __init__(self, seat_rows, seat_letters):
+        self.seat_rows = seat_rows
+        self.seat_letters = seat_letters
+        self.occupied = 0
+        self.extra = set()
+    
+    def index(self, seat_number):
+        """Bit position of a seat in the layout, or None if it is not in the layout"""
+        match = SEAT_PATTERN.match(seat_number)
+        if not match:
+            return None
+        row = int(match.group(1))
+        column = self.seat_letters.find(match.group(2))
+        if not 1 <= row <= self.seat_rows or column < 0:
+            return None
+        return (row - 1) * len(self.seat_letters) + column
+    
+    def is_free(self, seat_number):
+        """Check whether a seat is free"""
+        position = self.index(seat_number)
+        if position is None:
+            return seat_number not in self.extra
+        return not (self.occupied >> position) & 1
+    
+    def occupy(self, seat_number):
+        """Mark a seat as taken"""
+        position = self.index(seat_number)
+        if position is None:
+            self.extra.add(seat_number)
+        else:
+            self.occupied |= 1 << position
+    
+    def release(self, seat_number):
+        """Mark a seat as free"""
+        position = self.index(seat_number)
+        if position is None:
+            self.extra.discard(seat_number)
+        else:
+            self.occupied &= ~(1 << position)
+    
+    def free_seats(self):
+        """List the free seats in the layout, front to back"""
+        width = len(self.seat_letters)
+        return [
+            f"{row}{letter}"
+            for row in range(1, self.seat_rows + 1)
+            for column, letter in enumerate(self.seat_letters)
+            if not (self.occupied >> ((row - 1) * width + column)) & 1
+        ]
+
+class SeatInventory:
+    """Cache of SeatMaps keyed by (flight_number, date).
+    
+    `loader(flight_number, date)` must return ((seat_rows, seat_letters),
+    occupied seat labels); it is called once per flight and date, after
+    which the cache is kept current by the Database write path.
+    """
+    
+    def __init__(self, loader):
+        self.loader = loader
+        self.maps = {}
+        self.lock = threading.RLock()
+    
+    def get(self, flight_number, date):
+        """Return the SeatMap for a flight and date, loading it on first use"""
+        key = (flight_number, date)
+        with self.lock:
+            seat_map = self.maps.get(key)
+            if seat_map is None:
+                (seat_rows, seat_letters), seats = self.loader(flight_number, date)
+                seat_map = SeatMap(seat_rows, seat_letters)
+                for seat_number in seats:
+                    seat_map.occupy(seat_number)
+                self.maps[key] = seat_map
+            return seat_map
+    
+    def occupy(self, flight_number, date, seat_number):
+        """Record a booked seat if the flight is cached"""
+        with self.lock:
+            seat_map = self.maps.get((flight_number, date))
+            if seat_map is not None:
+                seat_map.occupy(seat_number)
+    
+    def release(self, flight_number, date, seat_number):
+        """Record a freed seat if the flight is cached"""
+        with self.lock:
+            seat_map = self.maps.get((flight_number, date))
+            if seat_map is not None:
+                seat_map.release(seat_number)
+    
+    def invalidate(self, flight_number=None, date=None):
+        """Drop cached maps for a flight (and date), or all of them"""
+        with self.lock:
+            if flight_number is None:
+                self.maps.clear()
+                return
+            for key in list(self.maps):
+                if key[0] == flight_number and (date is None or key[1] == date):
+                    del self.maps[key]
@@ -0,0 +1,30 @@
+import time
+
+class StartupTimer:
+    """Record named checkpoints during startup and report them against a budget"""
+    
+    def __init__(self, budget_ms=1500, start=None):
+        self.budget_ms = budget_ms
+        self.start = start if start is not None else time.perf_counter()
+        self.marks = []
+    
+    def mark(self, name):
+        """Record a checkpoint at the current time"""
+        self.marks.append((name, time.perf_counter()))
+    
+    def elapsed_ms(self):
+        """Milliseconds from the start to the last checkpoint"""
+        end = self.marks[-1][1] if self.marks else time.perf_counter()
+        return (end - self.start) * 1000
+    
+    def report(self):
+        """Print each phase's duration and whether startup stayed within budget"""
+        print("Startup timing:")
+        previous = self.start
+        for name, at in self.marks:
+            print(f"   {name:<20}{(at - previous) * 1000:>8.1f} ms")
+            previous = at
+        total = self.elapsed_ms()
+        status = "within" if total <= self.budget_ms else "OVER"
+        print(f"   {'total':<20}{total:>8.1f} ms ({status} {self.budget_ms} ms budget)")
+        return total <= self.budget_ms
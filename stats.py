@@ -0,0 +1,143 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from instrumentation import timed
+
+class StatsPage:
+    def __init__(self, parent, show_home_page, worker):
+        self.parent = parent
+        self.show_home_page = show_home_page
+        self.worker = worker
+        self.frame = None
+        self.flight_tree = None
+        self.route_tree = None
+        self.daily_tree = None
+        self.create_widgets()
+    
+    def create_widgets(self):
+        """Create the statistics page widgets"""
+        # Main frame
+        self.frame = ttk.Frame(self.parent, padding="20")
+        
+        # Title
+        title_label = ttk.Label(
+            self.frame,
+            text="📊 Booking Statistics",
+            font=("Helvetica", 20, "bold"),
+            bootstyle="primary"
+        )
+        title_label.pack(pady=(0, 20))
+        
+        # Filter frame
+        filter_frame = ttk.Frame(self.frame)
+        filter_frame.pack(fill="x", pady=(0, 20))
+        
+        ttk.Label(
+            filter_frame, text="Date (YYYY-MM-DD):", font=("Helvetica", 10, "bold")
+        ).pack(side="left", padx=(0, 10))
+        self.date_entry = ttk.Entry(filter_frame, width=15, font=("Helvetica", 10))
+        self.date_entry.pack(side="left", padx=(0, 10))
+        self.date_entry.bind('<Return>', lambda event: self.load_stats())
+        
+        refresh_button = ttk.Button(
+            filter_frame,
+            text="🔄 Refresh",
+            command=self.load_stats,
+            style="info.TButton"
+        )
+        refresh_button.pack(side="left")
+        
+        # One tab per summary
+        notebook = ttk.Notebook(self.frame)
+        notebook.pack(fill="both", expand=True, pady=(0, 20))
+        self.flight_tree = self.create_tree(notebook, "✈️ Flight Load", [
+            ("Flight Number", 120), ("Date", 100), ("Bookings", 100), ("Seats", 100), ("Load", 100),
+        ])
+        self.route_tree = self.create_tree(notebook, "🗺️ Routes", [
+            ("Departure", 150), ("Destination", 150), ("Bookings", 100),
+        ])
+        self.daily_tree = self.create_tree(notebook, "📅 Daily", [
+            ("Date", 150), ("Bookings", 100),
+        ])
+        
+        # Back Button
+        back_button = ttk.Button(
+            self.frame,
+            text="🔙 Back to Home",
+            command=self.show_home_page,
+            style="secondary.TButton",
+            width=15
+        )
+        back_button.pack(pady=10)
+        
+        # Status label
+        self.status_label = ttk.Label(
+            self.frame,
+            text="",
+            font=("Helvetica", 9),
+            bootstyle="secondary"
+        )
+        self.status_label.pack(pady=(10, 0))
+    
+    def create_tree(self, notebook, title, columns):
+        """Add a notebook tab holding a Treeview with the given (heading, width) columns"""
+        tab = ttk.Frame(notebook)
+        notebook.add(tab, text=title)
+        
+        names = [name for name, _ in columns]
+        tree = ttk.Treeview(tab, columns=names, show="headings", height=15)
+        for name, width in columns:
+            tree.heading(name, text=name)
+            tree.column(name, width=width, anchor="center")
+        
+        scrollbar = ttk.Scrollbar(tab, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        return tree
+    
+    @timed("ui.load_stats")
+    def load_stats(self):
+        """Load the summaries from the background worker"""
+        date = self.date_entry.get().strip()
+        self.status_label.config(text="Loading statistics…")
+        self.worker.submit(
+            "get_flight_load", None, date or None,
+            callback=self.show_flight_load,
+            key="stats_flights"
+        )
+        self.worker.submit("get_route_stats", callback=self.show_route_stats, key="stats_routes")
+        self.worker.submit("get_daily_stats", callback=self.show_daily_stats, key="stats_daily")
+    
+    def fill_tree(self, tree, rows):
+        """Replace the contents of a Treeview"""
+        tree.delete(*tree.get_children())
+        for row in rows:
+            tree.insert("", "end", values=row)
+    
+    def show_flight_load(self, rows):
+        """Show bookings against seats for each flight and date"""
+        rows = rows or []
+        self.fill_tree(self.flight_tree, [
+            (flight_number, date, bookings, seats, f"{bookings / seats:.0%}" if seats else "")
+            for flight_number, date, bookings, seats in rows
+        ])
+        self.status_label.config(text=f"{len(rows)} flights with bookings")
+    
+    def show_route_stats(self, rows):
+        """Show routes, busiest first"""
+        self.fill_tree(self.route_tree, sorted(rows or [], key=lambda row: row[2], reverse=True))
+    
+    def show_daily_stats(self, rows):
+        """Show bookings per travel date"""
+        self.fill_tree(self.daily_tree, rows or [])
+    
+    def show(self):
+        """Show the statistics page"""
+        self.frame.pack(fill="both", expand=True)
+        self.load_stats()
+    
+    def hide(self):
+        """Hide the statistics page"""
+        self.frame.pack_forget()
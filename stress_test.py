@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Multi-process stress test for the Flight Reservation System
+Starts several writer processes (like kiosks sharing one flights.db) that
+book at the same time, then checks that every booking reported as made is
+in the database and that no contended seat was sold twice
+
+Usage:
+    python stress_test.py --processes 8 --bookings 500
+    python stress_test.py --processes 16 --bookings 200 --contended 100 --db stress.db
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark import summarize
+
+SEAT_LETTERS = "ABCDEF"
+TRAVEL_DATE = "2030-06-01"
+SHARED_FLIGHT = "ST000"
+REPORT_TIMEOUT_S = 600
+UPDATE_EVERY = 5
+
+def seat_for(index):
+    """Seat number of the index-th seat on a flight (1A, 1B, ... 2A, ...)"""
+    return f"{index // len(SEAT_LETTERS) + 1}{SEAT_LETTERS[index % len(SEAT_LETTERS)]}"
+
+def kiosk_flight(kiosk):
+    """Flight booked only by one kiosk, so each of its bookings must succeed"""
+    return f"ST{kiosk + 1:03d}"
+
+def run_kiosk(db_name, profile, kiosk, bookings, contended, barrier, results):
+    """Book seats from one process and report what it booked"""
+    from database import Database
+    
+    # Losing a contended seat prints a constraint error; keep the output readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        db = Database(db_name, profile=profile, readers=1)
+        booked = []
+        won = []
+        failed_edits = 0
+        latencies = []
+        barrier.wait()
+        started = time.time()
+        for i in range(bookings):
+            start = time.perf_counter()
+            reservation_id = db.add_reservation(
+                f"Kiosk {kiosk} Passenger {i}", kiosk_flight(kiosk), "Cairo", "Dubai", TRAVEL_DATE, seat_for(i)
+            )
+            latencies.append(time.perf_counter() - start)
+            if not reservation_id:
+                continue
+            booked.append(reservation_id)
+            
+            # Edits read before they write, the case plain deferred transactions lose
+            if i % UPDATE_EVERY == 0:
+                start = time.perf_counter()
+                if not db.update_reservation(
+                    reservation_id, 1, f"Kiosk {kiosk} Passenger {i} Jr", kiosk_flight(kiosk), "Cairo", "Dubai",
+                    TRAVEL_DATE, seat_for(i)
+                ):
+                    failed_edits += 1
+                latencies.append(time.perf_counter() - start)
+            
+            # Every kiosk goes after the same shared seats; only one may get each
+            if i < contended:
+                seat = seat_for(i)
+                if db.is_seat_available(SHARED_FLIGHT, TRAVEL_DATE, seat):
+                    reservation_id = db.add_reservation(
+                        f"Kiosk {kiosk} Walk In {i}", SHARED_FLIGHT, "Cairo", "Dubai", TRAVEL_DATE, seat
+                    )
+                    if reservation_id:
+                        won.append((reservation_id, seat))
+        finished = time.time()
+        retries = db.pool.busy_retries
+        db.close_connection()
+    
+    results.put({
+        "kiosk": kiosk, "booked": booked, "won": won, "failed_edits": failed_edits, "latencies": latencies,
+        "retries": retries, "started": started, "finished": finished,
+    })
+
+def run_stress(db_name, processes=8, bookings=200, contended=50, profile=None):
+    """Run the stress test and return a summary dict.
+    
+    "lost" counts bookings and edits that failed, and bookings reported as
+    made but missing from the database; "double_booked" counts shared
+    seats held by more than one reservation. Both must be 0.
+    """
+    from database import Database
+    
+    # Create the schema once, before the writers race to open the file
+    db = Database(db_name, profile=profile)
+    db.close_connection()
+    
+    barrier = multiprocessing.Barrier(processes)
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=run_kiosk, args=(db_name, profile, kiosk, bookings, contended, barrier, results)
+        )
+        for kiosk in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    # A writer that dies without reporting fails the run instead of hanging it
+    reports = [results.get(timeout=REPORT_TIMEOUT_S) for _ in workers]
+    for worker in workers:
+        worker.join()
+    
+    db = Database(db_name, profile=profile)
+    try:
+        with db.pool.reader() as conn:
+            stored = {row[0] for row in conn.execute(
+                'SELECT id FROM reservations WHERE flight_number != ?', (SHARED_FLIGHT,)
+            )}
+            shared = conn.execute(
+                'SELECT seat_number, COUNT(*) FROM reservations WHERE flight_number = ? GROUP BY seat_number',
+                (SHARED_FLIGHT,)
+            ).fetchall()
+    finally:
+        db.close_connection()
+    
+    booked = [reservation_id for report in reports for reservation_id in report["booked"]]
+    won = [seat for report in reports for _, seat in report["won"]]
+    elapsed = max(report["finished"] for report in reports) - min(report["started"] for report in reports)
+    latencies = [sample for report in reports for sample in report["latencies"]]
+    return {
+        "processes": processes,
+        "bookings": len(booked),
+        "lost": processes * bookings - len(stored & set(booked)) + sum(report["failed_edits"] for report in reports),
+        "contended_seats": len(shared),
+        "contended_won": len(won),
+        "double_booked": sum(1 for _, count in shared if count > 1) + len(won) - len(set(won)),
+        "busy_retries": sum(report["retries"] for report in reports),
+        "elapsed_s": round(elapsed, 3),
+        "bookings_per_sec": round((len(booked) + len(won)) / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency": summarize(latencies),
+    }
+
+def main():
+    """Parse command line arguments and run the stress test"""
+    parser = argparse.ArgumentParser(description="Book from several processes at once and check nothing is lost")
+    parser.add_argument("--processes", type=int, default=8, help="concurrent writer processes (default: 8)")
+    parser.add_argument("--bookings", type=int, default=500, help="bookings per process (default: 500)")
+    parser.add_argument("--contended", type=int, default=50,
+                        help="shared seats every process tries to book (default: 50)")
+    parser.add_argument("--profile", help="storage profile from connection_pool.STORAGE_PROFILES")
+    parser.add_argument("--db", help="database file (default: a temporary file)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = args.db or os.path.join(tmp, "stress.db")
+        print(f"🏁 {args.processes} processes x {args.bookings} bookings against {db_name}...")
+        summary = run_stress(db_name, args.processes, args.bookings, args.contended, args.profile)
+    
+    latency = summary["latency"]
+    print(f"   Bookings:       {summary['bookings']:,} in {summary['elapsed_s']} s "
+          f"({summary['bookings_per_sec']:,} per second)")
+    print(f"   Latency:        p50 {latency['p50_ms']} ms, p99 {latency['p99_ms']} ms, max {latency['max_ms']} ms")
+    print(f"   Busy retries:   {summary['busy_retries']:,}")
+    print(f"   Shared seats:   {summary['contended_won']} won of {summary['contended_seats']} booked")
+    print(f"   Lost bookings:  {summary['lost']}")
+    print(f"   Double-booked:  {summary['double_booked']}")
+    if summary["lost"] or summary["double_booked"]:
+        print("❌ Stress test failed")
+        return 1
+    print("✅ No lost or double-booked reservations")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,11 +5,13 @@ Test script for Flight Reservation System
 
 import sys
 import os
+from types import SimpleNamespace
 
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from database import db
+from database import db, Database, LazyDatabase
+from models import Reservation
 
 def test_database_operations():
     """Test basic database operations"""
@@ -33,14 +35,14 @@ def test_database_operations():
     reservations = db.get_all_reservations()
     print(f"✅ Found {len(reservations)} reservations")
     for reservation in reservations:
-        print(f"   - ID: {reservation[0]}, Name: {reservation[1]}, Flight: {reservation[2]}")
+        print(f"   - ID: {reservation.id}, Name: {reservation.name}, Flight: {reservation.flight_number}")
     
     # Test 3: Get specific reservation
     if reservations:
         print("\n3. Testing Get Specific Reservation...")
-        reservation = db.get_reservation_by_id(reservations[0][0])
+        reservation = db.get_reservation_by_id(reservations[0].id)
         if reservation:
-            print(f"✅ Found reservation: {reservation[1]} on flight {reservation[2]}")
+            print(f"✅ Found reservation: {reservation.name} on flight {reservation.flight_number}")
         else:
             print("❌ Failed to get specific reservation")
     
@@ -48,7 +50,8 @@ def test_database_operations():
     if reservations:
         print("\n4. Testing Update Reservation...")
         success = db.update_reservation(
-            reservation_id=reservations[0][0],
+            reservation_id=reservations[0].id,
+            expected_version=reservations[0].version,
             name="John Doe Updated",
             flight_number="AA123",
             departure="New York",
@@ -61,7 +64,7 @@ def test_database_operations():
     # Test 5: Delete reservation
     if reservations:
         print("\n5. Testing Delete Reservation...")
-        success = db.delete_reservation(reservations[0][0])
+        success = db.delete_reservation(reservations[0].id)
         print(f"✅ Delete reservation: {'SUCCESS' if success else 'FAILED'}")
     
     # Final check
@@ -75,5 +78,524 @@ def test_database_operations():
     # Close database connection
     db.close_connection()
 
+def test_search_reservations(tmp_path):
+    """Test prefix search through the full-text index"""
+    test_db = Database(str(tmp_path / "search.db"))
+    test_db.add_reservation("Alice Johnson", "AA123", "New York", "Los Angeles", "2024-12-25", "12A")
+    test_db.add_reservation("Bob Smith", "DL456", "Atlanta", "Seattle", "2024-12-26", "8C")
+    
+    assert [r.name for r in test_db.search_reservations("ali")] == ["Alice Johnson"]
+    assert [r.name for r in test_db.search_reservations("new yo")] == ["Alice Johnson"]
+    assert [r.name for r in test_db.search_reservations("dl4")] == ["Bob Smith"]
+    assert len(test_db.search_reservations("")) == 2
+    
+    # Index follows updates and deletes
+    bob_id = test_db.search_reservations("bob")[0].id
+    test_db.update_reservation(bob_id, 1, "Robert Smith", "DL456", "Atlanta", "Seattle", "2024-12-26", "8C")
+    assert test_db.search_reservations("bob") == []
+    assert len(test_db.search_reservations("rob")) == 1
+    test_db.delete_reservation(bob_id)
+    assert test_db.search_reservations("rob") == []
+    
+    test_db.close_connection()
+
+def test_reservations_pagination(tmp_path):
+    """Test keyset pagination walks every reservation exactly once"""
+    test_db = Database(str(tmp_path / "pages.db"))
+    for i in range(25):
+        test_db.add_reservation(f"Passenger {i}", "AA123", "New York", "Los Angeles", "2024-12-25", f"{i}A")
+    
+    seen = []
+    cursor = None
+    while True:
+        page = test_db.get_reservations_page(10, after=cursor)
+        if not page:
+            break
+        seen.extend(row.id for row in page)
+        cursor = (page[-1].created_at, page[-1].id)
+    
+    # Rows inserted within the same second are ordered by id
+    assert sorted(seen, reverse=True) == seen
+    assert len(set(seen)) == 25
+    
+    # The streaming iterator yields the same records in the same order
+    streamed = test_db.iter_reservations(batch_size=7)
+    assert [r.id for r in streamed] == seen
+    
+    # Records are compact slotted objects with named fields
+    record = test_db.get_reservation_by_id(seen[0])
+    assert isinstance(record, Reservation) and not hasattr(record, "__dict__")
+    assert record.fields() == ("Passenger 24", "AA123", "New York", "Los Angeles", "2024-12-25", "24A")
+    assert record.as_dict()["id"] == seen[0] and tuple(record) == record.as_tuple()
+    
+    test_db.close_connection()
+
+def test_bulk_add_reservations(tmp_path):
+    """Test bulk insert reports invalid rows without aborting the batch"""
+    test_db = Database(str(tmp_path / "bulk.db"))
+    rows = [
+        {"name": "Alice Johnson", "flight_number": "AA123", "departure": "New York",
+         "destination": "Los Angeles", "date": "2024-12-25", "seat_number": "12A"},
+        {"name": "", "flight_number": "DL456", "departure": "Atlanta",
+         "destination": "Seattle", "date": "2024-12-26", "seat_number": "8C"},
+        ("Carol Davis", "UA789", "Chicago", "Miami", "27/12/2024", "15F"),
+        ("David Wilson", "SW321", "Dallas", "Las Vegas", "2024-12-28", "22B"),
+        None,
+        "AA123-",
+        ValueError("Invalid JSON: Expecting value: line 1 column 1 (char 0)"),
+    ]
+    
+    result = test_db.bulk_add_reservations(rows, chunk_size=2)
+    
+    assert result["inserted"] == 2
+    assert [row_number for row_number, _ in result["failed"]] == [2, 3, 5, 6, 7]
+    assert result["failed"][-1][1].startswith("Invalid JSON")
+    assert len(test_db.get_all_reservations()) == 2
+    
+    test_db.close_connection()
+
+def test_storage_profile_and_pool(tmp_path):
+    """Test WAL profile and reads from other threads while the writer is busy"""
+    import threading
+    
+    test_db = Database(str(tmp_path / "pool.db"), readers=2)
+    test_db.add_reservation("Alice Johnson", "AA123", "New York", "Los Angeles", "2024-12-25", "12A")
+    
+    with test_db.pool.reader() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    
+    # Hold an open write transaction; readers must still see committed rows
+    results = []
+    with test_db.pool.writer() as conn:
+        conn.execute("INSERT INTO reservations (name, flight_number, departure, destination, date, seat_number) "
+                     "VALUES ('Bob Smith', 'DL456', 'Atlanta', 'Seattle', '2024-12-26', '8C')")
+        threads = [threading.Thread(target=lambda: results.append(len(test_db.get_all_reservations())))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+    
+    assert results == [1, 1, 1, 1]
+    assert len(test_db.get_all_reservations()) == 2
+    
+    test_db.close_connection()
+
+def test_query_plans_use_indexes(tmp_path):
+    """Test that no Database query falls back to a full scan or temp sort"""
+    from query_plan import check_query_plans
+    
+    test_db = Database(str(tmp_path / "plans.db"))
+    report = check_query_plans(test_db)
+    
+    assert report
+    assert [(sql, flagged) for sql, _, flagged in report if flagged] == []
+    
+    test_db.close_connection()
+
+def test_migrations_are_applied_once(tmp_path):
+    """Test schema migrations record their version and are not re-run"""
+    from migrations import MIGRATIONS, apply_migrations, get_schema_version
+    
+    test_db = Database(str(tmp_path / "migrate.db"))
+    with test_db.pool.writer() as conn:
+        assert get_schema_version(conn) == MIGRATIONS[-1][0]
+        assert apply_migrations(conn) == []
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_reservations_created_at", "idx_reservations_seat", "idx_reservations_date"} <= indexes
+    
+    test_db.close_connection()
+
+def test_migrations_resolve_double_bookings(tmp_path):
+    """Test upgrading a database that holds double-booked and lower-case seats"""
+    import sqlite3
+    
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE reservations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, flight_number TEXT NOT NULL,
+            departure TEXT NOT NULL, destination TEXT NOT NULL, date TEXT NOT NULL,
+            seat_number TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    for name, seat in [("Alice Johnson", "12A"), ("Bob Smith", "12A"), ("Carol Davis", " 12a"), ("Dan Lee", "3b")]:
+        conn.execute(
+            "INSERT INTO reservations (name, flight_number, departure, destination, date, seat_number) "
+            "VALUES (?, 'AA123', 'New York', 'Los Angeles', '2024-12-25', ?)", (name, seat)
+        )
+    conn.commit()
+    conn.close()
+    
+    test_db = Database(path)
+    seats = {r.name: r.seat_number for r in test_db.get_all_reservations()}
+    assert seats == {"Alice Johnson": "12A", "Bob Smith": "12A-DUP2", "Carol Davis": "12A-DUP3", "Dan Lee": "3B"}
+    # Later migrations applied too
+    assert test_db.update_reservation(4, 1, "Dan Lee", "AA123", "New York", "Los Angeles", "2024-12-25", "3C") == 2
+    assert not test_db.is_seat_available("AA123", "2024-12-25", "12A")
+    assert test_db.get_route_stats() == [("New York", "Los Angeles", 4)]
+    
+    test_db.close_connection()
+
+def test_seat_inventory(tmp_path):
+    """Test seat availability tracking and double-booking prevention"""
+    test_db = Database(str(tmp_path / "seats.db"))
+    test_db.define_flight("AA123", 2, "AB")
+    
+    assert test_db.get_free_seats("AA123", "2024-12-25") == ["1A", "1B", "2A", "2B"]
+    assert test_db.add_reservation("Alice Johnson", "AA123", "New York", "Los Angeles", "2024-12-25", "1a")
+    assert not test_db.is_seat_available("AA123", "2024-12-25", "1A")
+    assert test_db.is_seat_available("AA123", "2024-12-26", "1A")
+    
+    # The same seat cannot be booked twice
+    assert not test_db.add_reservation("Bob Smith", "AA123", "New York", "Los Angeles", "2024-12-25", "1A")
+    assert test_db.add_reservation("Bob Smith", "AA123", "New York", "Los Angeles", "2024-12-25", "2B")
+    assert test_db.get_free_seats("AA123", "2024-12-25") == ["1B", "2A"]
+    
+    # Moving and cancelling bookings frees their seats
+    alice_id, bob_id = sorted(r.id for r in test_db.get_all_reservations())
+    assert test_db.is_seat_available("AA123", "2024-12-25", "1A", reservation_id=alice_id)
+    assert test_db.update_reservation(alice_id, 1, "Alice Johnson", "AA123", "New York", "Los Angeles", "2024-12-25", "1B")
+    assert not test_db.update_reservation(bob_id, 1, "Bob Smith", "AA123", "New York", "Los Angeles", "2024-12-25", "1B")
+    assert test_db.delete_reservation(bob_id)
+    assert test_db.get_free_seats("AA123", "2024-12-25") == ["1A", "2A", "2B"]
+    
+    test_db.close_connection()
+
+def test_reservation_cache(tmp_path):
+    """Test get_reservation_by_id caching and invalidation on writes"""
+    test_db = Database(str(tmp_path / "cache.db"), cache_size=2)
+    for seat in ("1A", "1B", "1C"):
+        test_db.add_reservation("Alice Johnson", "AA123", "New York", "Los Angeles", "2024-12-25", seat)
+    
+    assert test_db.get_reservation_by_id(1).seat_number == "1A"
+    assert test_db.get_reservation_by_id(1).seat_number == "1A"
+    stats = test_db.get_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    
+    # Updates and deletes are visible straight away
+    test_db.update_reservation(1, 1, "Alice Johnson", "AA123", "New York", "Los Angeles", "2024-12-25", "2A")
+    assert test_db.get_reservation_by_id(1).seat_number == "2A"
+    test_db.delete_reservation(1)
+    assert test_db.get_reservation_by_id(1) is None
+    assert test_db.get_reservation_by_id("not a number") is None
+    
+    # A row read just before an update commits is not cached over the update
+    query_reservations = test_db._query_reservations
+    def read_then_update(conn, sql, params=()):
+        test_db._query_reservations = query_reservations
+        row = query_reservations(conn, sql, params).fetchone()
+        test_db.update_reservation(2, 1, "Carol Davis", "AA123", "New York", "Los Angeles", "2024-12-25", "1B")
+        return SimpleNamespace(fetchone=lambda: row)
+    test_db._query_reservations = read_then_update
+    assert test_db.get_reservation_by_id(2).name == "Alice Johnson"
+    assert (test_db.get_reservation_by_id(2).name, test_db.get_reservation_by_id(2).version) == ("Carol Davis", 2)
+    
+    # Size limit evicts the least recently used entry
+    test_db.get_reservation_by_id(2)
+    test_db.get_reservation_by_id(3)
+    test_db.add_reservation("Bob Smith", "DL456", "Atlanta", "Seattle", "2024-12-26", "8C")
+    test_db.get_reservation_by_id(4)
+    assert test_db.get_cache_stats()["evictions"] == 1
+    
+    test_db.close_connection()
+
+def test_lazy_database_opens_on_first_use(tmp_path):
+    """Test that the lazy database handle does not touch disk until used"""
+    db_path = tmp_path / "lazy.db"
+    lazy_db = LazyDatabase(str(db_path))
+    
+    assert lazy_db.db_name == str(db_path)
+    assert not lazy_db.is_open() and not db_path.exists()
+    
+    assert lazy_db.get_all_reservations() == []
+    assert lazy_db.is_open() and db_path.exists()
+    
+    lazy_db.close_connection()
+    assert not lazy_db.is_open()
+
+def test_api_service(tmp_path):
+    """Test the HTTP API request handling without opening a socket"""
+    import asyncio
+    import json
+    from api_server import HTTPError, ReservationService
+    
+    test_db = Database(str(tmp_path / "api.db"))
+    booking = {"name": "Alice Johnson", "flight_number": "AA123", "departure": "New York",
+               "destination": "Los Angeles", "date": "2024-12-25", "seat_number": "12a"}
+    
+    async def scenario():
+        service = ReservationService(test_db, readers=2)
+        await service.start()
+        try:
+            status, created = await service.handle("POST", "/reservations", {}, json.dumps(booking).encode())
+            assert status == 201 and created["seat_number"] == "12A"
+            
+            for method, path, query, body, expected in [
+                ("POST", "/reservations", {}, json.dumps(booking).encode(), 409),
+                ("POST", "/reservations", {}, json.dumps({**booking, "date": "25/12/2024"}).encode(), 400),
+                ("GET", "/reservations", {"limit": ["-1"]}, b"", 400),
+                ("GET", "/reservations/" + "9" * 30, {}, b"", 404),
+            ]:
+                try:
+                    await service.handle(method, path, query, body)
+                    assert False, "expected an error response"
+                except HTTPError as e:
+                    assert e.status == expected
+            
+            path = f"/reservations/{created['id']}"
+            status, updated = await service.handle("PUT", path, {}, json.dumps({**booking, "seat_number": "14C"}).encode())
+            assert updated["seat_number"] == "14C" and updated["version"] == 2
+            try:
+                await service.handle("PUT", path, {}, json.dumps({**booking, "version": 1}).encode())
+                assert False, "expected a version conflict"
+            except HTTPError as e:
+                assert e.status == 409
+            status, found = await service.handle("GET", "/reservations", {"q": ["alice"]}, b"")
+            assert [r["id"] for r in found["reservations"]] == [created["id"]]
+            status, stats = await service.handle("GET", "/stats/routes", {}, b"")
+            assert stats["routes"] == [{"departure": "New York", "destination": "Los Angeles", "bookings": 1}]
+            status, _ = await service.handle("DELETE", path, {}, b"")
+            assert status == 200
+        finally:
+            await service.stop()
+    
+    asyncio.run(scenario())
+    test_db.close_connection()
+
+def test_group_commit(tmp_path):
+    """Test writes are coalesced into batches and a failing write is isolated"""
+    test_db = Database(str(tmp_path / "group.db"))
+    test_db.enable_group_commit(max_batch=20, max_delay_ms=50)
+    
+    futures = [
+        test_db.submit_write("add_reservation", f"Passenger {i}", "AA123", "New York", "Los Angeles",
+                             "2024-12-25", f"{i // 6 + 1}{'ABCDEF'[i % 6]}")
+        for i in range(40)
+    ]
+    # Same seat as the first booking, so only this write fails
+    duplicate = test_db.submit_write("add_reservation", "Bob Smith", "AA123", "New York", "Los Angeles",
+                                     "2024-12-25", "1A")
+    
+    assert all(future.result(timeout=5) for future in futures)
+    assert duplicate.result(timeout=5) is False
+    stats = test_db.get_group_commit_stats()
+    assert stats["writes"] == 41 and stats["batches"] < 41
+    assert len(test_db.get_all_reservations()) == 40
+    
+    # A closed committer refuses writes instead of queueing them forever
+    committer = test_db.group_commit
+    test_db.disable_group_commit()
+    try:
+        committer.submit("delete_reservation", 1)
+        assert False, "expected submit() after close() to fail"
+    except RuntimeError:
+        pass
+    
+    test_db.close_connection()
+
+def test_archive_partitions(tmp_path):
+    """Test past reservations move to monthly archives and stay queryable by date"""
+    test_db = Database(str(tmp_path / "partitioned.db"))
+    for date in ("2024-01-15", "2024-02-10", "2024-02-20", "2024-03-05"):
+        test_db.add_reservation("Alice Johnson", "AA123", "New York", "Los Angeles", date, "12A")
+    
+    summary = test_db.archive_reservations("2024-03-01")
+    assert summary == {"archived": 3, "kept": 0, "months": [("2024-01", 1), ("2024-02", 2)]}
+    assert (tmp_path / "partitioned_archive_2024-01.db").exists()
+    assert [r.date for r in test_db.get_all_reservations()] == ["2024-03-05"]
+    assert [r.date for r in test_db.search_reservations("alice")] == ["2024-03-05"]
+    
+    # Date queries span the archives and the active database
+    dates = [r.date for r in test_db.get_reservations_by_date("2024-01-01", "2024-12-31")]
+    assert dates == ["2024-01-15", "2024-02-10", "2024-02-20", "2024-03-05"]
+    assert [r.date for r in test_db.get_reservations_by_date("2024-02-20", flight_number="AA123")] == ["2024-02-20"]
+    
+    # Archived dates take no new bookings or moves: the archive holds their seats
+    assert test_db.is_seat_available("AA123", "2024-01-15", "12A") is False
+    assert test_db.get_free_seats("AA123", "2024-01-15") == []
+    assert test_db.add_reservation("Carol Davis", "AA123", "New York", "Los Angeles", "2024-01-15", "12A") is False
+    assert test_db.add_reservation("Bob Smith", "DL456", "Atlanta", "Seattle", "2024-01-20", "8C") is False
+    assert test_db.bulk_add_reservations([("Bob Smith", "DL456", "Atlanta", "Seattle", "2024-02-01", "8C")])["inserted"] == 0
+    march = test_db.get_all_reservations()[0]
+    assert test_db.update_reservation(march.id, march.version, march.name, "AA123", "New York", "Los Angeles",
+                                      "2024-02-10", "12A") is False
+    assert test_db.archive_reservations("2024-03-01") == {"archived": 0, "kept": 0, "months": []}
+    assert [(m[0], m[2], m[4]) for m in test_db.get_archived_months()] == [
+        ("2024-01", 1, "2024-02-01"), ("2024-02", 2, "2024-03-01")
+    ]
+    
+    # Only dates before the cutoff close; the rest of a partly archived month stays open
+    assert test_db.archive_reservations("2024-03-06")["months"] == [("2024-03", 1)]
+    assert test_db.is_seat_available("AA123", "2024-03-05", "14B") is False
+    assert test_db.add_reservation("Carol Davis", "AA123", "New York", "Los Angeles", "2024-03-20", "12A")
+    
+    # Archived bookings still count in the statistics
+    assert test_db.get_daily_stats("2024-01-01", "2024-03-31") == [
+        ("2024-01-15", 1), ("2024-02-10", 1), ("2024-02-20", 1), ("2024-03-05", 1), ("2024-03-20", 1)
+    ]
+    assert test_db.get_route_stats() == [("New York", "Los Angeles", 5)]
+    
+    test_db.close_connection()
+
+def test_update_version_conflicts(tmp_path):
+    """Test updates based on an outdated version are rejected, not applied"""
+    from models import VersionConflict
+    
+    test_db = Database(str(tmp_path / "versions.db"))
+    reservation_id = test_db.add_reservation("Alice Johnson", "AA123", "New York", "Los Angeles", "2024-12-25", "12A")
+    loaded = test_db.get_reservation_by_id(reservation_id)
+    assert loaded.version == 1
+    
+    # Two agents edit the same copy; the second one loses
+    assert test_db.update_reservation(reservation_id, loaded.version, *loaded.fields()[:5], "14C") == 2
+    conflict = test_db.update_reservation(reservation_id, loaded.version, "Alice Smith", *loaded.fields()[1:])
+    assert isinstance(conflict, VersionConflict) and not conflict
+    assert (conflict.current.version, conflict.current.seat_number) == (2, "14C")
+    assert test_db.get_reservation_by_id(reservation_id).name == "Alice Johnson"
+    
+    # Retrying on top of the current version succeeds
+    assert test_db.update_reservation(reservation_id, 2, "Alice Smith", *loaded.fields()[1:]) == 3
+    assert test_db.delete_reservation(reservation_id)
+    assert test_db.update_reservation(reservation_id, 3, *loaded.fields()).current is None
+    
+    test_db.close_connection()
+
+def test_change_log(tmp_path):
+    """Test writes are logged and changes_since returns them in order"""
+    test_db = Database(str(tmp_path / "changes.db"))
+    start = test_db.get_change_seq()
+    
+    alice_id = test_db.add_reservation("Alice Johnson", "AA123", "New York", "Los Angeles", "2024-12-25", "12A")
+    bob_id = test_db.add_reservation("Bob Smith", "DL456", "Atlanta", "Seattle", "2024-12-26", "8C")
+    test_db.update_reservation(alice_id, 1, "Alice Smith", "AA123", "New York", "Los Angeles", "2024-12-25", "12A")
+    test_db.delete_reservation(bob_id)
+    
+    changes = test_db.changes_since(start)
+    assert [(c.operation, c.reservation_id) for c in changes] == \
+        [("insert", alice_id), ("insert", bob_id), ("update", alice_id), ("delete", bob_id)]
+    # Each change carries the reservation as it is now
+    assert changes[0].reservation.name == "Alice Smith" and changes[3].reservation is None
+    assert test_db.changes_since(changes[1].seq, limit=1)[0].operation == "update"
+    assert test_db.changes_since(test_db.get_change_seq()) == []
+    
+    # Readers that fall behind a pruned log are told to reload
+    assert test_db.prune_changes(keep=1) == 3
+    assert test_db.changes_since(start) is None
+    assert len(test_db.changes_since(changes[2].seq)) == 1
+    
+    # Also once the whole log has been pruned
+    latest = test_db.get_change_seq()
+    assert test_db.prune_changes(keep=0) == 1
+    assert test_db.changes_since(changes[2].seq) is None
+    assert test_db.get_change_seq() == latest and test_db.changes_since(latest) == []
+    
+    test_db.close_connection()
+
+def test_booking_stats(tmp_path):
+    """Test the summary tables follow inserts, updates and deletes"""
+    test_db = Database(str(tmp_path / "stats.db"))
+    test_db.define_flight("AA123", 2, "AB")
+    alice_id = test_db.add_reservation("Alice Johnson", "AA123", "New York", "Los Angeles", "2024-12-25", "1A")
+    test_db.add_reservation("Bob Smith", "AA123", "New York", "Los Angeles", "2024-12-25", "1B")
+    carol_id = test_db.add_reservation("Carol Davis", "DL456", "Atlanta", "Seattle", "2024-12-26", "8C")
+    
+    assert test_db.get_flight_load("AA123") == [("AA123", "2024-12-25", 2, 4)]
+    assert test_db.get_flight_load(date="2024-12-26") == [("DL456", "2024-12-26", 1, 180)]
+    
+    # Moving a booking to another flight and date moves its counts
+    test_db.update_reservation(alice_id, 1, "Alice Johnson", "DL456", "Atlanta", "Seattle", "2024-12-26", "9C")
+    test_db.delete_reservation(carol_id)
+    assert [row[:3] for row in test_db.get_flight_load()] == [("AA123", "2024-12-25", 1), ("DL456", "2024-12-26", 1)]
+    assert test_db.get_route_stats() == [("Atlanta", "Seattle", 1), ("New York", "Los Angeles", 1)]
+    assert test_db.get_daily_stats("2024-12-26") == [("2024-12-26", 1)]
+    
+    # The counts match a full aggregation of the reservations
+    with test_db.pool.writer() as conn:
+        assert conn.execute("SELECT date, COUNT(*) FROM reservations GROUP BY date").fetchall() == \
+            test_db.get_daily_stats()
+    
+    test_db.close_connection()
+
+def test_instrumentation(tmp_path, capsys):
+    """Test Database calls are timed and counted and the metrics export"""
+    from instrumentation import Instrumentation
+    
+    metrics = Instrumentation()
+    metrics.enable(slow_query_ms=0)
+    test_db = Database(str(tmp_path / "metrics.db"), instrumentation=metrics)
+    test_db.add_reservation("Alice Johnson", "AA123", "New York", "Los Angeles", "2024-12-25", "1A")
+    test_db.add_reservation("Bob Smith", "AA123", "New York", "Los Angeles", "2024-12-25", "1B")
+    assert len(test_db.get_all_reservations()) == 2
+    
+    # Errors reported inside a call are counted against it
+    with test_db.pool.writer() as conn:
+        conn.execute("DROP TABLE reservation_changes")
+    test_db.get_change_seq()
+    
+    snapshot = metrics.snapshot()
+    assert snapshot["db.add_reservation"]["calls"] == 2
+    assert snapshot["db.get_all_reservations"]["rows"] == 2
+    assert snapshot["db.get_change_seq"]["errors"] == 1
+    assert snapshot["db.get_all_reservations"]["errors"] == 0
+    
+    # Slow calls are logged with the statements they ran and their plans
+    output = capsys.readouterr().out
+    assert "Slow call db.get_all_reservations" in output
+    assert "SELECT" in output and "SCAN" in output
+    
+    text = metrics.to_prometheus()
+    assert 'flight_call_duration_seconds_count{call="db.add_reservation"} 2' in text
+    assert 'flight_call_duration_seconds_bucket{call="db.add_reservation",le="+Inf"} 2' in text
+    assert 'flight_call_errors_total{call="db.get_change_seq"} 1' in text
+    
+    # Disabled instrumentation records nothing
+    metrics.disable()
+    test_db.get_all_reservations()
+    assert metrics.snapshot()["db.get_all_reservations"]["calls"] == 1
+    
+    test_db.close_connection()
+
+def test_multi_process_writers(tmp_path):
+    """Test concurrent writer processes lose no bookings or edits"""
+    from stress_test import run_stress
+    
+    summary = run_stress(str(tmp_path / "stress.db"), processes=8, bookings=25, contended=10)
+    assert summary["bookings"] == 8 * 25
+    assert summary["lost"] == 0
+    assert summary["double_booked"] == 0
+    assert summary["contended_won"] == summary["contended_seats"] == 10
+
+def test_synthetic_data(tmp_path):
+    """Test generated reservations are seeded, seat-safe and bulk-load consistently"""
+    from demo_data import Workload, generate_reservations, load_reservations
+    
+    rows = list(generate_reservations(2000, seed=1))
+    assert rows == list(generate_reservations(2000, seed=1))
+    assert rows != list(generate_reservations(2000, seed=2))
+    assert len({(row[1], row[4], row[5]) for row in rows}) == 2000
+    
+    test_db = Database(str(tmp_path / "synthetic.db"))
+    result = load_reservations(test_db, 2000, seed=1)
+    assert result["inserted"] == 2000 and result["failed"] == []
+    
+    # The suspended triggers' work is caught up and the triggers are back
+    assert sum(bookings for _, bookings in test_db.get_daily_stats()) == 2000
+    assert test_db.get_change_seq() == 2000
+    surname = rows[0][0].split()[1]
+    found = test_db.search_reservations(surname, limit=5000)
+    assert found and all(surname in reservation.name for reservation in found)
+    
+    # Rows the database rejects are reported, the rest still load
+    result = test_db.bulk_load_reservations([rows[0], ("Extra Passenger",) + rows[0][1:5] + ("99Z",)])
+    assert result["inserted"] == 1 and len(result["failed"]) == 1
+    assert test_db.add_reservation("Late Passenger", rows[0][1], rows[0][2], rows[0][3], rows[0][4], "98Z")
+    assert test_db.get_change_seq() == 2002
+    
+    results = Workload(test_db, seed=1).run(duration=30, operations=50)
+    assert results["total"]["operations"] == 50
+    
+    test_db.close_connection()
+
 if __name__ == "__main__":
     test_database_operations()
\ No newline at end of file
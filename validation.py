@@ -0,0 +1,15 @@
+from datetime import datetime
+
+RESERVATION_FIELDS = ("name", "flight_number", "departure", "destination", "date", "seat_number")
+
+def validate_reservation(name, flight_number, departure, destination, date, seat_number):
+    """Validate reservation fields, returning an error message or None if valid"""
+    if not all([name, flight_number, departure, destination, date, seat_number]):
+        return "Please fill in all fields!"
+    
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        return "Please enter a valid date in YYYY-MM-DD format!"
+    
+    return None